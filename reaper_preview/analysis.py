@@ -0,0 +1,103 @@
+"""Post-render analysis of preview audio: silence and clipping detection.
+
+Works on WAV files only. Samples are memory-mapped and reduced per block
+with vectorized NumPy operations, so a 30-second preview is analysed in a
+few milliseconds.
+"""
+
+import math
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from reaper_preview.wavfile import read_samples, read_wav_info
+
+BLOCK_SECONDS = 0.05
+SILENCE_DB = -60.0
+CLIP_LEVEL = 0.999
+
+# A preview is flagged silent if nearly all blocks are below SILENCE_DB,
+# and clipped if more than this fraction of samples sit at full scale.
+SILENT_BLOCK_FRACTION = 0.99
+CLIPPED_SAMPLE_FRACTION = 0.01
+
+
+def _db(value: float) -> float:
+    return 20.0 * math.log10(value) if value > 0 else -math.inf
+
+
+@dataclass
+class AudioStats:
+    """Level statistics of a rendered preview."""
+
+    duration: float
+    peak_db: float
+    rms_db: float
+    silent_fraction: float
+    clipped_fraction: float
+
+    @property
+    def is_silent(self) -> bool:
+        return self.silent_fraction >= SILENT_BLOCK_FRACTION
+
+    @property
+    def is_clipped(self) -> bool:
+        return self.clipped_fraction > CLIPPED_SAMPLE_FRACTION
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        # JSON has no infinities; report digital silence as None
+        for key in ("peak_db", "rms_db"):
+            if math.isinf(data[key]):
+                data[key] = None
+        data["silent"] = self.is_silent
+        data["clipped"] = self.is_clipped
+        return data
+
+
+def analyze_wav(
+    path: Path,
+    block_seconds: float = BLOCK_SECONDS,
+    silence_db: float = SILENCE_DB,
+    clip_level: float = CLIP_LEVEL,
+) -> AudioStats:
+    """Compute peak, RMS, silent-block fraction and clipped-sample fraction.
+
+    Raises:
+        WavError: If the file is not a readable WAV file
+    """
+    info = read_wav_info(path)
+    samples = read_samples(path, info)
+    frames = samples.shape[0]
+    if frames == 0:
+        return AudioStats(duration=0.0, peak_db=-math.inf, rms_db=-math.inf,
+                          silent_fraction=1.0, clipped_fraction=0.0)
+
+    import numpy as np
+
+    flat = samples.reshape(-1)
+    peak = float(max(flat.max(), -flat.min()))
+    clipped = float(np.count_nonzero(np.abs(flat) >= clip_level)) / flat.size
+
+    # Sum of squares per block in one pass; a partial last block only counts towards the total
+    block = max(1, int(info.sample_rate * block_seconds)) * samples.shape[1]
+    blocks = flat.size // block
+    head = flat[: blocks * block].reshape(blocks, block)
+    block_energy = np.einsum("ij,ij->i", head, head, dtype=np.float64)
+    tail = flat[blocks * block:]
+    total_energy = float(block_energy.sum()) + float(np.dot(tail, tail))
+    rms = math.sqrt(total_energy / flat.size)
+
+    if blocks:
+        threshold = 10.0 ** (silence_db / 20.0)
+        block_rms = np.sqrt(block_energy / block)
+        silent = float(np.count_nonzero(block_rms < threshold)) / blocks
+    else:
+        silent = 1.0 if _db(rms) < silence_db else 0.0
+
+    return AudioStats(
+        duration=info.duration,
+        peak_db=_db(peak),
+        rms_db=_db(rms),
+        silent_fraction=silent,
+        clipped_fraction=clipped,
+    )
@@ -0,0 +1,120 @@
+"""Time budget of a batch run, from the render times of earlier runs.
+
+With a budget, a project is only started if its expected render time
+still fits before the deadline; the render time of each project is kept
+across runs in the state directory, and projects never timed are expected
+to take the median of the others. Projects that did not fit are recorded
+as deferred and are started first by the next run, so a library larger
+than one night's window is still rendered completely over a few nights.
+
+The peak memory of each project's last render is kept alongside, for
+scheduling renders by free memory (see reaper_preview.concurrency).
+"""
+
+import json
+import os
+import statistics
+import threading
+import time
+from pathlib import Path
+
+SCHEDULE_FILE = "schedule.json"
+_SCHEDULE_VERSION = 1
+# Weight of the latest render time in a project's estimate
+_SMOOTHING = 0.5
+
+
+def _resolved(path: Path | str) -> str:
+    return str(Path(path).resolve())
+
+
+class RunBudget:
+    """Render time estimates, the run deadline and deferred projects.
+
+    `seconds` is the time budget of the run, counted from creation; None
+    means no deadline, in which case every project fits. Projects are kept
+    by absolute path, so runs from another directory find them. Safe to use
+    from several threads.
+    """
+
+    def __init__(self, path: Path, seconds: float | None = None, clock=time.monotonic):
+        self.path = path
+        self._clock = clock
+        self.deadline = clock() + seconds if seconds is not None else None
+        self._lock = threading.Lock()
+        self._estimates: dict[str, float] = {}
+        self._rss_kb: dict[str, int] = {}
+        self._previously_deferred: list[str] = []
+        self._deferred: list[str] = []
+        try:
+            data = json.loads(path.read_text())
+            if data.get("version") == _SCHEDULE_VERSION:
+                self._estimates = {key: float(value) for key, value in data["estimates"].items()}
+                self._previously_deferred = list(data["deferred"])
+                self._rss_kb = {key: int(value) for key, value in data.get("rss_kb", {}).items()}
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass
+
+    @property
+    def previously_deferred(self) -> list[Path]:
+        """Projects the previous run deferred, as absolute paths."""
+        return [Path(_resolved(path)) for path in self._previously_deferred]
+
+    def remaining(self) -> float | None:
+        """Seconds left before the deadline (negative once passed), or None."""
+        return self.deadline - self._clock() if self.deadline is not None else None
+
+    def estimate(self, rpp_path: Path) -> float | None:
+        """Expected render seconds of a project, or None if no render was ever timed."""
+        with self._lock:
+            estimate = self._estimates.get(_resolved(rpp_path))
+            if estimate is None and self._estimates:
+                estimate = statistics.median(self._estimates.values())
+        return estimate
+
+    def fits(self, rpp_path: Path) -> bool:
+        """Whether a project can be started and is expected to finish in time."""
+        remaining = self.remaining()
+        if remaining is None:
+            return True
+        return remaining > 0 and (self.estimate(rpp_path) or 0.0) <= remaining
+
+    def expected_rss_kb(self, rpp_path: Path) -> int | None:
+        """Peak memory of the project's last render, or None if never measured."""
+        with self._lock:
+            return self._rss_kb.get(_resolved(rpp_path))
+
+    def record(self, rpp_path: Path, seconds: float, max_rss_kb: int | None = None) -> None:
+        """Fold the wall time of a render into the project's estimate."""
+        key = _resolved(rpp_path)
+        with self._lock:
+            previous = self._estimates.get(key)
+            self._estimates[key] = seconds if previous is None else _SMOOTHING * seconds + (1 - _SMOOTHING) * previous
+            if max_rss_kb:
+                self._rss_kb[key] = max_rss_kb
+
+    def defer(self, rpp_path: Path) -> None:
+        with self._lock:
+            self._deferred.append(_resolved(rpp_path))
+
+    def save(self, known: list[Path] | None = None) -> None:
+        """Write the estimates and this run's deferred projects.
+
+        With `known`, estimates of projects not in it are dropped.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            estimates, rss_kb = self._estimates, self._rss_kb
+            if known is not None:
+                keep = {_resolved(path) for path in known}
+                estimates = {key: value for key, value in estimates.items() if key in keep}
+                rss_kb = {key: value for key, value in rss_kb.items() if key in keep}
+            data = {
+                "version": _SCHEDULE_VERSION,
+                "estimates": estimates,
+                "rss_kb": rss_kb,
+                "deferred": sorted(self._deferred),
+            }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=1))
+        os.replace(tmp, self.path)
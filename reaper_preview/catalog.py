@@ -0,0 +1,154 @@
+"""SQLite catalog of project metadata.
+
+Rows are keyed by .rpp path and carry the content hash of the project, so
+an unchanged project is recognised from its size and mtime alone (one
+stat) or, failing that, from its hash without being parsed again.
+"""
+
+import functools
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from reaper_preview.discover import ProjectInfo
+from reaper_preview.metadata import ProjectMetadata, parse_metadata, rpp_hash
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    rpp_path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    sha1 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    track_count INTEGER,
+    item_count INTEGER,
+    tempo REAL,
+    time_sig_num INTEGER,
+    time_sig_denom INTEGER,
+    length REAL,
+    sample_rate INTEGER,
+    plugins TEXT,
+    media TEXT,
+    updated_at REAL
+)
+"""
+
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class Catalog:
+    """Project metadata catalog backed by an SQLite file.
+
+    Writes are batched in one transaction that is committed on close().
+    The catalog can be shared by render worker threads; calls are
+    serialized.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @_locked
+    def close(self) -> None:
+        self._db.commit()
+        self._db.close()
+
+    @_locked
+    def get(self, rpp_path: Path) -> sqlite3.Row | None:
+        return self._db.execute(
+            "SELECT * FROM projects WHERE rpp_path = ?", (str(rpp_path),)
+        ).fetchone()
+
+    @_locked
+    def is_current(self, rpp_path: Path) -> bool:
+        """Whether the catalog entry matches the file's size and mtime."""
+        row = self.get(rpp_path)
+        if row is None:
+            return False
+        st = rpp_path.stat()
+        return row["size"] == st.st_size and row["mtime"] == st.st_mtime
+
+    @_locked
+    def store(self, project: ProjectInfo, metadata: ProjectMetadata) -> bool:
+        """Record metadata for a project.
+
+        If the stored hash already matches, only the file stat is updated.
+        Returns True if the metadata row was (re)written.
+        """
+        st = project.rpp_path.stat()
+        row = self.get(project.rpp_path)
+        if row is not None and row["sha1"] == metadata.sha1:
+            if row["size"] != st.st_size or row["mtime"] != st.st_mtime:
+                self._db.execute(
+                    "UPDATE projects SET size = ?, mtime = ? WHERE rpp_path = ?",
+                    (st.st_size, st.st_mtime, str(project.rpp_path)),
+                )
+            return False
+
+        num, denom = metadata.time_signature or (None, None)
+        self._db.execute(
+            "INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(project.rpp_path),
+                project.name,
+                metadata.sha1,
+                st.st_size,
+                st.st_mtime,
+                metadata.track_count,
+                metadata.item_count,
+                metadata.tempo,
+                num,
+                denom,
+                metadata.length,
+                metadata.sample_rate,
+                json.dumps([asdict(p) for p in metadata.plugins]),
+                json.dumps(metadata.media),
+                time.time(),
+            ),
+        )
+        return True
+
+    @_locked
+    def refresh(self, project: ProjectInfo) -> bool:
+        """Bring one project up to date, reading it only if it may have changed.
+
+        Returns True if the metadata row was (re)written.
+        """
+        if self.is_current(project.rpp_path):
+            return False
+        text = project.rpp_path.read_text()
+        row = self.get(project.rpp_path)
+        if row is not None and row["sha1"] == rpp_hash(text):
+            return self.store(project, ProjectMetadata(sha1=row["sha1"]))
+        return self.store(project, parse_metadata(text))
+
+    @_locked
+    def prune(self, keep: list[Path]) -> int:
+        """Delete entries for projects not in `keep`. Returns the count removed."""
+        keep_set = {str(p) for p in keep}
+        stale = [
+            row["rpp_path"]
+            for row in self._db.execute("SELECT rpp_path FROM projects")
+            if row["rpp_path"] not in keep_set
+        ]
+        self._db.executemany("DELETE FROM projects WHERE rpp_path = ?", [(p,) for p in stale])
+        return len(stale)
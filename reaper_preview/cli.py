@@ -1,14 +1,59 @@
 """CLI entry point for reaper-preview."""
 
+import glob
+import re
 import shutil
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 import click
 
-from reaper_preview.discover import discover_projects
-from reaper_preview.render import RenderError, render_project
+from reaper_preview.analysis import analyze_wav
+from reaper_preview.budget import SCHEDULE_FILE, RunBudget
+from reaper_preview.catalog import Catalog
+from reaper_preview.concurrency import ConcurrencyController
+from reaper_preview.discover import ProjectInfo, discover_projects, iter_projects
+from reaper_preview.encode import ENCODERS, OUTPUT_FORMATS, RENDER_FORMATS, EncodeError, get_encoder
+from reaper_preview.fx import FxFilter, load_fx_categories
+from reaper_preview.gallery import update_gallery
+from reaper_preview.logs import start_run_logs
+from reaper_preview.media import INDEX_FILE, MediaIndex
+from reaper_preview.metadata import ProjectMetadata
+from reaper_preview.peaks import DEFAULT_BINS_PER_SECOND, PEAK_FORMATS, is_current, peaks_path_for, sparkline_path_for
+from reaper_preview.postprocess import PostProcessJob, PostProcessPool
+from reaper_preview.priority import (
+    DEFAULT_IONICE,
+    DEFAULT_NICE,
+    IOPRIO_CLASSES,
+    CoreSets,
+    available_cpus,
+    partition_cpus,
+    set_io_priority,
+    set_nice,
+)
+from reaper_preview.profile import ensure_profile
+from reaper_preview.quarantine import HISTORY_FILE, QUARANTINE_AFTER, FailureHistory, rpp_file_hash
+from reaper_preview.plugins import default_resource_dir, find_missing, load_inventory
+from reaper_preview.render import (
+    DEFAULT_TIMEOUT,
+    RenderError,
+    RenderStats,
+    RenderTimeoutError,
+    render_project,
+    render_segments,
+)
+from reaper_preview.report import DEFERRED, FAILED, RENDERED, SKIPPED, ProjectResult, summarize, write_report
+from reaper_preview.render_cfg import QUALITY_PRESETS
 from reaper_preview.rpp_modify import prepare_rpp_for_preview
+from reaper_preview.segments import Segment, SegmentError, parse_segments, resolve_segments
+from reaper_preview.serve import PreviewCache, make_server
+from reaper_preview.staging import StagingCache, stage_project
+from reaper_preview.trace import NullTracer, Tracer
+from reaper_preview.tracks import TrackSelectionError, parse_track_selectors
+from reaper_preview.verify import OutputError, verify_output
 
 # Common install locations per platform
 _LINUX_PATHS = [
@@ -48,36 +93,314 @@ def find_reaper_bin() -> str | None:
     return None
 
 
-@click.command()
+def _state_dir(output_path: Path) -> Path:
+    """Directory for caches and state kept between runs."""
+    return output_path / ".reaper-preview"
+
+
+def _parse_formats(ctx, param, value) -> list[str]:
+    """Parse a comma-separated list of output formats."""
+    formats = []
+    for fmt in value.split(","):
+        fmt = fmt.strip().lower()
+        if fmt not in OUTPUT_FORMATS:
+            raise click.BadParameter(f"{fmt!r} is not one of {', '.join(OUTPUT_FORMATS)}.")
+        if fmt not in formats:
+            formats.append(fmt)
+    return formats
+
+
+def _parse_list(ctx, param, value: tuple[str, ...]) -> list[str]:
+    """Flatten a repeatable option whose values may also be comma-separated."""
+    return [item.strip() for entry in value for item in entry.split(",") if item.strip()]
+
+
+def _parse_tracks(ctx, param, value: tuple[str, ...]) -> list:
+    try:
+        return parse_track_selectors(list(value))
+    except TrackSelectionError as e:
+        raise click.BadParameter(str(e))
+
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def _parse_size(ctx, param, value: str) -> int:
+    """Parse a size such as 500M or 20G (binary units)."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", value, re.IGNORECASE)
+    if not match:
+        raise click.BadParameter(f"{value!r} is not a size like 500M or 20G.")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def _parse_ionice(ctx, param, value: str) -> tuple[str, int] | None:
+    """Parse an I/O priority: none, idle, or best-effort/realtime with an optional level (0-7)."""
+    io_class, _, level = value.lower().partition(":")
+    if io_class == "none" and not level:
+        return None
+    if io_class not in IOPRIO_CLASSES or (level and not (level.isdigit() and int(level) <= 7)):
+        raise click.BadParameter(f"{value!r} is not none, idle, best-effort[:0-7] or realtime[:0-7].")
+    return io_class, int(level or 0)
+
+
+_DURATION_UNITS = {"h": 3600, "m": 60, "s": 1}
+
+
+def _parse_time_budget(ctx, param, value: str | None) -> float | None:
+    """Parse a duration such as 6h, 90m, 1h30m or a number of seconds."""
+    if value is None:
+        return None
+    text = value.strip().lower()
+    if re.fullmatch(r"\d+(?:\.\d+)?", text):
+        return float(text)
+    parts = re.findall(r"(\d+(?:\.\d+)?)([hms])", text)
+    if not parts or "".join(number + unit for number, unit in parts) != text:
+        raise click.BadParameter(f"{value!r} is not a duration like 6h, 90m or 1h30m.")
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _parse_segments(ctx, param, value) -> list[Segment] | str | None:
+    if value is None:
+        return None
+    try:
+        return parse_segments(value)
+    except SegmentError as e:
+        raise click.BadParameter(str(e))
+
+
+def _has_content(path: Path) -> bool:
+    """Whether a file exists and is not empty (an interrupted render can leave 0 bytes)."""
+    try:
+        return path.stat().st_size > 0
+    except OSError:
+        return False
+
+
+def _is_complete(path: Path) -> bool:
+    """Whether a preview is a complete file, judged from its headers where they can be read."""
+    if path.suffix.lower() not in (".wav", ".mp3"):
+        return _has_content(path)
+    try:
+        verify_output(path)
+    except OutputError:
+        return False
+    return True
+
+
+def _preview_files(output_path: Path, name: str, formats: list[str],
+                   segments: list[Segment] | str | None) -> dict[str, dict[str, Path]]:
+    """Expected preview files of a project, by output name and format.
+
+    Segments taken from regions or markers are only known once the project
+    is read, so the segment files found on disk stand in for them.
+    """
+    if segments is None:
+        stems = [name]
+    elif isinstance(segments, list):
+        stems = [f"{name}-{segment.name}" for segment in segments]
+    else:
+        # Segment names are NN or NN-<slug>; other projects' previews such
+        # as "<name>-2019" must not be taken for segments
+        segment_stem = re.compile(rf"{re.escape(name)}-\d{{2}}(?:-[\w-]+)?")
+        pattern = f"{glob.escape(name)}-[0-9][0-9]*.{formats[0]}"
+        stems = sorted(path.stem for path in output_path.glob(pattern) if segment_stem.fullmatch(path.stem))
+        stems = stems or [name]
+    return {stem: {fmt: output_path / f"{stem}.{fmt}" for fmt in formats} for stem in stems}
+
+
+def _thumbnail_paths(preview: Path, peak_format: str | None, sparklines: bool) -> tuple[Path | None, Path | None]:
+    """Peak file and sparkline to keep next to a preview, None where not wanted."""
+    peaks_path = peaks_path_for(preview, peak_format) if peak_format else None
+    sparkline_path = sparkline_path_for(preview) if sparklines else None
+    return peaks_path, sparkline_path
+
+
+class _ProjectOutput:
+    """Echo the progress lines of one project.
+
+    With several render workers the lines are held until the project is
+    done, so they come out together instead of interleaved.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, buffered: bool):
+        self.buffered = buffered
+        self._lines: list[tuple[str, bool]] = []
+
+    def __call__(self, message: str = "", err: bool = False) -> None:
+        if self.buffered:
+            self._lines.append((message, err))
+        else:
+            click.echo(message, err=err)
+
+    def flush(self) -> None:
+        with self._lock:
+            for message, err in self._lines:
+                click.echo(message, err=err)
+        self._lines.clear()
+
+
+def _trace_launch(tracer, stats: RenderStats, launched_ns: int, ended_ns: int) -> None:
+    """Record a Reaper launch as spawn, render and verify spans."""
+    if stats.spawned_ns is None or stats.exited_ns is None:
+        # Reaper did not start, or the launch recorded no times
+        tracer.complete("render", launched_ns, ended_ns)
+        return
+    tracer.complete("spawn", launched_ns, stats.spawned_ns)
+    tracer.complete("render", stats.spawned_ns, stats.exited_ns, args={
+        "cpu_seconds": stats.cpu_seconds, "max_rss_kb": stats.max_rss_kb,
+    })
+    tracer.complete("verify", stats.exited_ns, ended_ns)
+
+
+def _mtime_or_none(path: Path) -> float | None:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+@click.group(invoke_without_command=True)
 @click.option("--input-dir", type=click.Path(exists=True), default=".", help="Root directory containing Reaper projects.")
 @click.option("--output-dir", type=click.Path(), default="./previews", help="Directory for rendered preview files.")
-@click.option("--format", "audio_format", type=click.Choice(["mp3", "wav"]), default="mp3", help="Output audio format.")
+@click.option("--format", "formats", default="mp3", callback=_parse_formats,
+              help=f"Output audio format(s), comma-separated ({', '.join(OUTPUT_FORMATS)}).")
+@click.option("--quality", type=click.Choice(list(QUALITY_PRESETS)), default="default",
+              help="Encoder preset: Reaper's defaults, or 'preview' for 96 kbps mono at 32 kHz.")
 @click.option("--duration", type=float, default=30.0, help="Preview duration in seconds.")
 @click.option("--start", type=float, default=0.0, help="Start time in seconds.")
 @click.option("--reaper-bin", type=click.Path(), default=None, help="Path to Reaper executable.")
 @click.option("--dry-run", is_flag=True, help="List projects without rendering.")
 @click.option("--force", is_flag=True, help="Re-render even if preview already exists.")
-def main(input_dir, output_dir, audio_format, duration, start, reaper_bin, dry_run, force):
+@click.option("--report", type=click.Path(), default=None, help="Write a JSON report of the run to this file.")
+@click.option("--gallery", type=click.Path(), default=None, help="Update an HTML gallery in this directory after the run.")
+@click.option("--catalog", "catalog_file", type=click.Path(), default=None, help="Keep project metadata in this SQLite catalog.")
+@click.option("--resource-dir", type=click.Path(), default=None, help="Reaper resource directory (auto-detected by default).")
+@click.option("--missing-plugins", type=click.Choice(["warn", "skip", "ignore"]), default="warn",
+              help="What to do with projects whose instruments are not installed.")
+@click.option("--check-audio", is_flag=True, help="Analyse rendered WAV previews for silence and clipping (needs NumPy).")
+@click.option("--on-silent", type=click.Choice(["flag", "retry"]), default="flag",
+              help="Flag silent previews, or render them once more before flagging.")
+@click.option("--normalize", "target_lufs", type=float, default=None, metavar="LUFS",
+              help="Normalize WAV previews to this integrated loudness (needs NumPy).")
+@click.option("--true-peak", "true_peak_db", type=float, default=-1.0, help="True-peak ceiling in dBTP for --normalize.")
+@click.option("--post-jobs", type=click.IntRange(min=1), default=2, help="Worker processes for post-processing.")
+@click.option("--encoder", type=click.Choice(["auto", *ENCODERS]), default="auto",
+              help="Encoder backend for formats produced from the master WAV.")
+@click.option("--segments", default=None, callback=_parse_segments,
+              help="Render several snippets per project: START:END ranges in seconds (0:30,60:90), "
+                   "'regions' or 'markers'.")
+@click.option("--peaks", "peak_format", type=click.Choice(PEAK_FORMATS), default=None,
+              help="Write waveform peaks of each preview in audiowaveform format (needs NumPy).")
+@click.option("--peaks-per-second", type=click.IntRange(min=1), default=DEFAULT_BINS_PER_SECOND,
+              help="Min/max pairs per second of audio in peak files and sparklines.")
+@click.option("--sparklines", is_flag=True, help="Draw a PNG waveform thumbnail of each preview (needs NumPy).")
+@click.option("--isolated-profile", is_flag=True,
+              help="Render with a managed Reaper configuration tuned for fast offline renders.")
+@click.option("--relocate-media", is_flag=True,
+              help="Index the library's media files and point missing references at moved files.")
+@click.option("--bypass-fx", "bypass_names", multiple=True, callback=_parse_list, metavar="NAME",
+              help="Bypass plugins whose name contains NAME (or matches a * glob) in previews; repeatable.")
+@click.option("--bypass-category", "bypass_categories", multiple=True, callback=_parse_list, metavar="CATEGORY",
+              help="Bypass plugins of this Reaper FX category (from reaper-fxtags.ini); repeatable.")
+@click.option("--drop-master-fx", is_flag=True, help="Render previews without the master FX chain.")
+@click.option("--jobs", type=click.IntRange(min=1), default=1,
+              help="Reaper instances rendering at the same time (more than one implies --isolated-profile).")
+@click.option("--max-jobs", type=click.IntRange(min=1), default=None,
+              help="Adapt the number of Reaper instances to CPU load and free memory, up to this many "
+                   "(instead of --jobs).")
+@click.option("--min-jobs", type=click.IntRange(min=1), default=1, help="Fewest Reaper instances with --max-jobs.")
+@click.option("--pin-cpus/--no-pin-cpus", default=True,
+              help="With a fixed --jobs above 1, pin each Reaper instance to its own set of cores.")
+@click.option("--nice", type=click.IntRange(0, 19), default=DEFAULT_NICE,
+              help="Nice value of this process, Reaper and post-processing workers (0 leaves it unchanged).")
+@click.option("--ionice", default=":".join(map(str, DEFAULT_IONICE)), callback=_parse_ionice, metavar="CLASS[:LEVEL]",
+              help="I/O priority on Linux: idle, best-effort[:0-7], realtime[:0-7] or none.")
+@click.option("--pipeline", is_flag=True,
+              help="Start rendering as soon as the first projects are found instead of after the full scan.")
+@click.option("--stage-dir", type=click.Path(file_okay=False), default=None,
+              help="Copy each project's media to this local cache ahead of its render.")
+@click.option("--stage-size", default="20G", callback=_parse_size, help="Size limit of the staging cache.")
+@click.option("--quarantine-after", type=click.IntRange(min=0), default=QUARANTINE_AFTER,
+              help="Skip projects that failed this many runs in a row without being changed (0 disables).")
+@click.option("--time-budget", default=None, callback=_parse_time_budget, metavar="DURATION",
+              help="Stop starting renders that are not expected to finish within this time (6h, 90m, 1h30m).")
+@click.option("--on-deadline", type=click.Choice(["finish", "kill"]), default="finish",
+              help="Let renders running at the end of --time-budget finish, or stop them and defer their projects.")
+@click.option("--tracks", "track_selectors", multiple=True, callback=_parse_tracks, metavar="SELECTOR",
+              help="Render only these tracks: a 1-based track number or a regex matched in track names; "
+                   "repeatable.")
+@click.option("--trace", type=click.Path(dir_okay=False), default=None, metavar="FILE.json",
+              help="Write a timeline of the run for Perfetto or chrome://tracing.")
+@click.pass_context
+def main(ctx, input_dir, output_dir, formats, quality, duration, start, reaper_bin, dry_run, force, report, gallery,
+         catalog_file, resource_dir, missing_plugins, check_audio, on_silent, target_lufs, true_peak_db, post_jobs,
+         encoder, segments, peak_format, peaks_per_second, sparklines, isolated_profile,
+         relocate_media, bypass_names, bypass_categories, drop_master_fx, jobs, max_jobs, min_jobs, pin_cpus,
+         nice, ionice, pipeline, stage_dir, stage_size,
+         quarantine_after, time_budget, on_deadline, track_selectors, trace):
     """Generate short audio previews from Reaper DAW projects."""
+    if ctx.invoked_subcommand is not None:
+        return
+
     input_path = Path(input_dir)
     output_path = Path(output_dir)
+    if max_jobs is not None and min_jobs > max_jobs:
+        click.echo("Error: --min-jobs cannot be more than --max-jobs.", err=True)
+        raise SystemExit(1)
+
+    # The budget counts from here, discovery included
+    budget = RunBudget(_state_dir(output_path) / SCHEDULE_FILE, time_budget)
 
     # Discover projects
+    scan_started = time.monotonic_ns()
     click.echo(f"Scanning for .rpp files in {input_path}...")
-    projects = discover_projects(input_path)
+    if pipeline and (dry_run or relocate_media):
+        # Relocation needs the media of the whole library before the first
+        # project is prepared
+        pipeline = False
+    media_index = None
+    if relocate_media:
+        # Indexed on the same walk; unchanged files keep their saved entries
+        media_index = MediaIndex.load(_state_dir(output_path) / INDEX_FILE)
+        projects = discover_projects(input_path, media_index=media_index, skip_dirs=[output_path])
+        media_index.save()
+        click.echo(f"Indexed {len(media_index)} media file{'s' if len(media_index) != 1 else ''}.")
+    elif pipeline:
+        # Found while rendering
+        projects = None
+    else:
+        projects = discover_projects(input_path)
+    scan_ended = time.monotonic_ns()
 
-    if not projects:
-        click.echo("No projects found.")
-        return
+    if projects is not None:
+        if not projects:
+            click.echo("No projects found.")
+            return
+        click.echo(f"Found {len(projects)} project{'s' if len(projects) != 1 else ''}:")
+        for project in projects:
+            click.echo(f"  - {project.name} ({project.project_dir})")
 
-    click.echo(f"Found {len(projects)} project{'s' if len(projects) != 1 else ''}:")
-    for project in projects:
-        click.echo(f"  - {project.name} ({project.project_dir})")
+    catalog = Catalog(Path(catalog_file)) if catalog_file else None
 
     if dry_run:
+        if catalog is not None:
+            with catalog:
+                updated = sum(catalog.refresh(project) for project in projects)
+                catalog.prune([project.rpp_path for project in projects])
+            click.echo(f"\nCatalog: {updated} project{'s' if updated != 1 else ''} updated.")
         click.echo("\nDry run mode - no rendering performed.")
         return
 
+    # Lowered only once there is rendering to do (not for --dry-run or the
+    # serve command), and before any worker starts, so threads, Reaper and
+    # the post-processing processes all inherit it
+    if nice:
+        set_nice(nice)
+    if ionice is not None:
+        set_io_priority(*ionice)
+
     # Create output directory
     output_path.mkdir(parents=True, exist_ok=True)
     click.echo(f"\nOutput directory: {output_path}")
@@ -90,54 +413,434 @@ def main(input_dir, output_dir, audio_format, duration, start, reaper_bin, dry_r
             raise SystemExit(1)
         click.echo(f"Using Reaper: {reaper_bin}")
 
+    # Reaper renders each project once: straight to the requested format
+    # when that is all we need, otherwise to a master WAV from which the
+    # post-processing stage normalizes and encodes the other formats.
+    # The MP3 settings of a quality preset are applied by the encoder, as
+    # Reaper's own MP3 settings record is not written (see render_cfg).
+    render_quality = QUALITY_PRESETS[quality]
+    needs_wav = check_audio or target_lufs is not None or peak_format is not None or sparklines
+    if (len(formats) == 1 and formats[0] in RENDER_FORMATS
+            and (formats[0] == "wav" or not (needs_wav or render_quality is not None))):
+        render_format = formats[0]
+    else:
+        render_format = "wav"
+    encode_formats = [fmt for fmt in formats if fmt != render_format]
+    # Resolved here so post-processing workers run the same program
+    encoder_name, encoder_executable = encoder, None
+    if encode_formats:
+        try:
+            resolved = get_encoder(encoder, encode_formats)
+        except EncodeError as e:
+            if formats != ["mp3"] or needs_wav:
+                click.echo(f"Error: {e}", err=True)
+                raise SystemExit(1)
+            # Only the quality preset asked for a master: Reaper can still
+            # render the MP3 itself, at the preset's sample rate and channels
+            click.echo(f"Warning: {e}; rendering MP3 with Reaper's own MP3 settings", err=True)
+            render_format, encode_formats = "mp3", []
+        else:
+            encoder_name, encoder_executable = resolved.name, resolved.executable
+            click.echo(f"Rendering WAV masters; encoding {', '.join(encode_formats)} with {encoder_name}")
+    render_dir = output_path if render_format in formats else _state_dir(output_path) / "masters"
+    render_dir.mkdir(parents=True, exist_ok=True)
+
+    # Reaper's output goes to one log file per project; earlier runs are rotated
+    log_dir = start_run_logs(_state_dir(output_path))
+
+    # Timeline of the run: a lane per worker, a span per step of each project
+    tracer = Tracer(Path(trace), origin_ns=scan_started) if trace else NullTracer()
+    if projects is not None:
+        tracer.complete("discover", scan_started, scan_ended, lane="discovery", args={"projects": len(projects)})
+
+    # Post-processing runs in worker processes alongside the renders
+    post_pool = None
+    if target_lufs is not None or encode_formats or peak_format is not None or sparklines:
+        post_pool = PostProcessPool(max_workers=post_jobs, tracer=tracer if trace else None)
+
+    resource_path = Path(resource_dir) if resource_dir else default_resource_dir()
+    if resource_path is not None and not resource_path.is_dir():
+        resource_path = None
+
+    # Load the installed plugin inventory once for the whole run
+    inventory = None
+    if missing_plugins != "ignore":
+        if resource_path is not None:
+            inventory = load_inventory(resource_path, _state_dir(output_path) / "plugin-inventory.json")
+        else:
+            click.echo("Reaper resource directory not found; plugin check disabled.")
+
+    fx_filter = FxFilter(names=bypass_names, categories=bypass_categories, drop_master_fx=drop_master_fx)
+    if bypass_categories:
+        if resource_path is not None:
+            fx_filter.fx_categories = load_fx_categories(resource_path)
+        else:
+            click.echo("Reaper resource directory not found; FX categories unknown.")
+
+    # With --max-jobs, workers wait for the controller before each launch
+    controller = None
+    if max_jobs is not None:
+        jobs = max_jobs
+        controller = ConcurrencyController(min_jobs, max_jobs)
+        click.echo(f"Adapting concurrent renders to load and memory: {min_jobs} to {max_jobs}")
+
+    # Disjoint core sets, one per concurrent render. Only with a fixed
+    # --jobs: with --max-jobs a fixed split would keep a lone render on a
+    # fraction of the cores whenever the limit is low
+    core_sets = None
+    cpus = available_cpus()
+    if pin_cpus and jobs > 1 and controller is None and cpus:
+        core_sets = CoreSets(partition_cpus(cpus, jobs))
+
+    # The managed profile is generated once and reused by every launch
+    cfgfile = None
+    if jobs > 1 and not isolated_profile:
+        click.echo("Several render jobs need separate Reaper instances; using --isolated-profile.")
+        isolated_profile = True
+    if isolated_profile:
+        cfgfile = ensure_profile(_state_dir(output_path), resource_path)
+        click.echo(f"Using render profile: {cfgfile.parent}")
+
+    # Projects that keep failing unchanged are not started again
+    history = None
+    if quarantine_after:
+        history = FailureHistory(_state_dir(output_path) / HISTORY_FILE, quarantine_after)
+
     # Render each project
-    click.echo(f"\nRendering {len(projects)} project{'s' if len(projects) != 1 else ''}...\n")
-    successful = 0
-    failed = 0
-    skipped = 0
-
-    for idx, project in enumerate(projects, start=1):
-        click.echo(f"[{idx}/{len(projects)}] {project.name}...")
-
-        # Check if preview already exists and is up to date
-        preview_path = output_path / f"{project.name}.{audio_format}"
-        if not force and preview_path.exists():
-            if preview_path.stat().st_mtime > project.rpp_path.stat().st_mtime:
-                click.echo(f"  Skipping (preview is up to date)")
-                skipped += 1
-                continue
+    if projects is not None:
+        click.echo(f"\nRendering {len(projects)} project{'s' if len(projects) != 1 else ''}...\n")
+    else:
+        click.echo("\nRendering projects as they are found...\n")
+    discovery_done = threading.Event()
+    if projects is not None:
+        discovery_done.set()
+    results: list[ProjectResult] = []
+    launch_seconds: list[float] = []
+    launch_stats: list[RenderStats] = []
+
+    # Media is staged one project ahead of each render worker
+    staging = StagingCache(Path(stage_dir), stage_size) if stage_dir else None
+    lookahead = threading.Semaphore(jobs + 1)
+
+    def stage(project: ProjectInfo) -> dict[str, Path]:
+        lookahead.acquire()
+        with tracer.span("stage", project=project.name):
+            previews = [p for outputs in _preview_files(output_path, project.name, formats, segments).values()
+                        for p in outputs.values()]
+            if not force and all(_is_complete(p) and p.stat().st_mtime > project.rpp_path.stat().st_mtime
+                                 for p in previews):
+                return {}
+            return stage_project(staging, project.rpp_path)
+
+    def process(project: ProjectInfo, idx: int, staged: Future | None = None) -> None:
+        """Render one project and collect its results."""
+        say = _ProjectOutput(buffered=jobs > 1)
+        total = f"{len(found)}" if discovery_done.is_set() else f"{len(found)}+"
+        say(f"[{idx}/{total}] {project.name}...")
+        staged_media = {}
+        try:
+            with tracer.span(project.name, rpp_path=str(project.rpp_path)):
+                if staged is not None:
+                    try:
+                        staged_media = staged.result()
+                    except OSError:
+                        pass
+                _process(project, say, staged_media)
+        finally:
+            say.flush()
+            if staged is not None:
+                staging.release(list(staged_media.values()))
+                lookahead.release()
+
+    def _process(project: ProjectInfo, say: "_ProjectOutput", staged_media: dict[str, Path]) -> None:
+        # Check if all previews already exist and are up to date
+        existing = _preview_files(output_path, project.name, formats, segments)
+        paths = [path for outputs in existing.values() for path in outputs.values()]
+        if not force and all(_is_complete(path) for path in paths):
+            preview_mtime = min(path.stat().st_mtime for path in paths)
+            # Thumbnails are redrawn only when their preview changed; that
+            # needs the PCM of a WAV preview, or else a new render
+            thumbnails = {
+                stem: _thumbnail_paths(outputs[formats[0]], peak_format, sparklines)
+                for stem, outputs in existing.items()
+            }
+            stale = {
+                stem: any(path is not None and not is_current(path, existing[stem][formats[0]]) for path in files)
+                for stem, files in thumbnails.items()
+            }
+            if preview_mtime > project.rpp_path.stat().st_mtime and ("wav" in formats or not any(stale.values())):
+                say(f"  Skipping (preview is up to date)")
+                if catalog is not None:
+                    catalog.refresh(project)
+                for stem, outputs in existing.items():
+                    peaks_file, sparkline_file = thumbnails[stem]
+                    result = ProjectResult(
+                        name=stem,
+                        rpp_path=project.rpp_path,
+                        status=SKIPPED,
+                        output_path=outputs[formats[0]],
+                        output_mtime=_mtime_or_none(outputs[formats[0]]),
+                        outputs={fmt: str(path) for fmt, path in outputs.items()},
+                    )
+                    results.append(result)
+                    if stale[stem]:
+                        post_pool.submit(
+                            PostProcessJob(
+                                wav_path=outputs["wav"],
+                                peaks_path=peaks_file,
+                                sparkline_path=sparkline_file,
+                                bins_per_second=peaks_per_second,
+                            ),
+                            result,
+                        )
+                    else:
+                        result.peaks = str(peaks_file) if peaks_file else None
+                        result.sparkline = str(sparkline_file) if sparkline_file else None
+                return
+
+        rpp_key = None
+        if history is not None:
+            try:
+                rpp_key = rpp_file_hash(project.rpp_path)
+            except OSError:
+                pass
+        if rpp_key is not None:
+            record = history.quarantined(rpp_key)
+            if record is not None:
+                say(f"  Skipping (quarantined after {record.failures} failures: {record.last_error})")
+                results.append(ProjectResult(
+                    name=project.name,
+                    rpp_path=project.rpp_path,
+                    status=SKIPPED,
+                    error=record.last_error,
+                    quarantined=True,
+                ))
+                return
+
+        if not budget.fits(project.rpp_path):
+            say("  Deferred (not expected to finish within the time budget)")
+            budget.defer(project.rpp_path)
+            results.append(ProjectResult(name=project.name, rpp_path=project.rpp_path, status=DEFERRED))
+            return
 
         temp_rpp = None
+        log_path = log_dir / f"{project.name}.log"
+        launch = {}
         try:
             # Prepare modified RPP
             end_time = start + duration
-            temp_rpp = prepare_rpp_for_preview(
-                rpp_path=project.rpp_path,
-                output_dir=output_path,
-                filename=project.name,
-                start=start,
-                end=end_time,
-                audio_format=audio_format,
-            )
+            metadata = None
+            if (catalog is not None or inventory is not None or segments is not None or media_index is not None
+                    or fx_filter or track_selectors):
+                metadata = ProjectMetadata()
+            with tracer.span("prepare"):
+                temp_rpp = prepare_rpp_for_preview(
+                    rpp_path=project.rpp_path,
+                    output_dir=render_dir,
+                    filename=project.name,
+                    start=start,
+                    end=end_time,
+                    audio_format=render_format,
+                    metadata=metadata,
+                    segments=segments,
+                    media_index=media_index,
+                    staged_media=staged_media or None,
+                    quality=render_quality,
+                    fx_filter=fx_filter,
+                    tracks=track_selectors,
+                )
+            if catalog is not None:
+                catalog.store(project, metadata)
+            project_segments = resolve_segments(segments, metadata, duration) if segments is not None else []
 
-            # Render
-            output_file = render_project(
-                rpp_path=temp_rpp,
-                output_dir=output_path,
-                filename=project.name,
-                audio_format=audio_format,
-                reaper_bin=reaper_bin,
-            )
+            if staged_media:
+                count = len(staged_media)
+                say(f"  Staged {count} media file{'s' if count != 1 else ''} locally")
+            if track_selectors:
+                dropped = len(metadata.dropped_tracks)
+                say(f"  Tracks: {', '.join(metadata.selected_tracks)}"
+                           f"{f' ({dropped} dropped)' if dropped else ''}")
+            if fx_filter and metadata.bypassed_fx:
+                say(f"  Bypassed {len(metadata.bypassed_fx)} FX: {', '.join(metadata.bypassed_fx)}")
+
+            warnings = []
+            if media_index is not None:
+                if metadata.relocated_media:
+                    count = len(metadata.relocated_media)
+                    say(f"  Relocated {count} missing media file{'s' if count != 1 else ''}")
+                if metadata.ambiguous_media:
+                    warnings.append(f"Ambiguous media, used the nearest match: {', '.join(metadata.ambiguous_media)}")
+                if metadata.missing_media:
+                    warnings.append(f"Missing media: {', '.join(metadata.missing_media)}")
+
+            # Check plugins before paying for a Reaper launch
+            if inventory is not None:
+                missing = find_missing(metadata.plugins, inventory)
+                instruments = [p.name for p in missing if p.is_instrument]
+                effects = [p.name for p in missing if not p.is_instrument]
+                if instruments:
+                    warnings.append(f"Missing instruments: {', '.join(instruments)}")
+                if effects:
+                    warnings.append(f"Missing effects: {', '.join(effects)}")
+            for warning in warnings:
+                say(f"  ! {warning}")
+            if inventory is not None and instruments and missing_plugins == "skip":
+                say("  Skipping (preview would be silent)")
+                results.append(ProjectResult(
+                    name=project.name,
+                    rpp_path=project.rpp_path,
+                    status=SKIPPED,
+                    error=f"Missing instruments: {', '.join(instruments)}",
+                    warnings=warnings,
+                ))
+                return
+
+            # Render; all segments come out of the same Reaper launch
+            def render():
+                render_args = dict(
+                    rpp_path=temp_rpp,
+                    output_dir=render_dir,
+                    filename=project.name,
+                    audio_format=render_format,
+                    reaper_bin=reaper_bin,
+                    stats=RenderStats(),
+                    log_path=log_path,
+                )
+                if cfgfile is not None:
+                    render_args["cfgfile"] = cfgfile
+                waiting = time.monotonic_ns()
+                token = None
+                if controller is not None:
+                    token = controller.acquire(budget.expected_rss_kb(project.rpp_path))
+                if core_sets is not None:
+                    render_args["cpus"] = core_sets.acquire()
+                remaining = budget.remaining()
+                if on_deadline == "kill" and remaining is not None and remaining < DEFAULT_TIMEOUT:
+                    # Stopped like a timed-out render at the deadline
+                    render_args["timeout"] = max(1.0, remaining)
+                    launch["deadline"] = True
+                launched = time.monotonic_ns()
+                if controller is not None or core_sets is not None:
+                    tracer.complete("wait", waiting, launched)
+                started = time.perf_counter()
+                stopped = False
+                try:
+                    if project_segments:
+                        return render_segments(
+                            segment_names=[s.name for s in project_segments],
+                            expected_durations=[s.end - s.start for s in project_segments],
+                            **render_args,
+                        )
+                    return [render_project(expected_duration=duration, **render_args)]
+                except RenderTimeoutError:
+                    # Cut short by the deadline, so its time is no estimate
+                    stopped = bool(launch.get("deadline"))
+                    raise
+                finally:
+                    launch["seconds"] = time.perf_counter() - started
+                    launch["stats"] = render_args["stats"]
+                    _trace_launch(tracer, launch["stats"], launched, time.monotonic_ns())
+                    launch_seconds.append(launch["seconds"])
+                    launch_stats.append(launch["stats"])
+                    if not stopped:
+                        budget.record(project.rpp_path, launch["seconds"], launch["stats"].max_rss_kb)
+                    if controller is not None:
+                        controller.release(token, launch["stats"].max_rss_kb)
+                    if core_sets is not None:
+                        core_sets.release(render_args["cpus"])
+
+            output_files = render()
+            if history is not None:
+                history.record_success(project.rpp_path)
 
-            click.echo(f"  ✓ Rendered: {output_file.name}")
-            successful += 1
+            # Verify the audio itself, not just that a file exists
+            audio_stats = [None] * len(output_files)
+            if check_audio and output_files[0].suffix == ".wav":
+                with tracer.span("check audio"):
+                    audio_stats = [analyze_wav(path) for path in output_files]
+                if on_silent == "retry" and any(stats.is_silent for stats in audio_stats):
+                    say("  ! Preview is silent, rendering again")
+                    output_files = render()
+                    with tracer.span("check audio"):
+                        audio_stats = [analyze_wav(path) for path in output_files]
 
-        except RenderError as e:
-            click.echo(f"  ✗ Failed: {e}", err=True)
-            failed += 1
+            for index, output_file in enumerate(output_files):
+                stats = audio_stats[index]
+                segment = project_segments[index] if project_segments else None
+                file_warnings = list(warnings)
+                if stats is not None:
+                    audio_warnings = []
+                    if stats.is_silent:
+                        audio_warnings.append("Preview is silent")
+                    if stats.is_clipped:
+                        audio_warnings.append(f"Preview is clipped ({stats.clipped_fraction:.1%} of samples)")
+                    for warning in audio_warnings:
+                        say(f"  ! {f'{segment.name}: ' if segment else ''}{warning}")
+                    file_warnings.extend(audio_warnings)
+
+                say(f"  ✓ Rendered: {output_file.name}")
+                stem = output_file.stem
+                outputs = {fmt: output_path / f"{stem}.{fmt}" for fmt in formats}
+                primary = output_file if render_format == formats[0] else outputs[formats[0]]
+                result = ProjectResult(
+                    name=stem,
+                    rpp_path=project.rpp_path,
+                    status=RENDERED,
+                    output_path=primary,
+                    output_mtime=_mtime_or_none(primary),
+                    warnings=file_warnings,
+                    audio=stats.to_dict() if stats else None,
+                    outputs={fmt: str(path) for fmt, path in outputs.items()},
+                    segment=segment.to_dict() if segment else None,
+                    render_seconds=round(launch["seconds"], 3),
+                    render_cpu_seconds=launch["stats"].cpu_seconds,
+                    render_max_rss_kb=launch["stats"].max_rss_kb,
+                    bypassed_fx=list(metadata.bypassed_fx) if metadata is not None else [],
+                    tracks=list(metadata.selected_tracks) if metadata is not None else [],
+                )
+                results.append(result)
+
+                if post_pool is not None:
+                    peaks_file, sparkline_file = _thumbnail_paths(outputs[formats[0]], peak_format, sparklines)
+                    post_pool.submit(
+                        PostProcessJob(
+                            wav_path=output_file,
+                            target_lufs=target_lufs,
+                            true_peak_db=true_peak_db,
+                            encoder=encoder_name,
+                            encoder_executable=encoder_executable,
+                            mp3=render_quality.mp3 if render_quality is not None else None,
+                            encodes=[(fmt, outputs[fmt]) for fmt in encode_formats],
+                            peaks_path=peaks_file,
+                            sparkline_path=sparkline_file,
+                            bins_per_second=peaks_per_second,
+                            delete_wav=render_format not in formats,
+                        ),
+                        result,
+                    )
+
+        except (RenderError, TrackSelectionError) as e:
+            if isinstance(e, RenderTimeoutError) and launch.get("deadline"):
+                say("  Deferred (stopped at the end of the time budget)")
+                budget.defer(project.rpp_path)
+                results.append(ProjectResult(name=project.name, rpp_path=project.rpp_path, status=DEFERRED))
+                return
+            say(f"  ✗ Failed: {e}", err=True)
+            if rpp_key is not None and isinstance(e, RenderError):
+                record = history.record_failure(rpp_key, project.rpp_path, str(e))
+                if record.quarantined_at == record.last_failure:
+                    say(f"  ! Quarantined after {record.failures} failures in a row; "
+                        f"saving the project or 'reaper-preview quarantine clear' releases it")
+            results.append(ProjectResult(
+                name=project.name,
+                rpp_path=project.rpp_path,
+                status=FAILED,
+                error=str(e),
+                log=str(log_path) if log_path.exists() else None,
+            ))
         except Exception as e:
-            click.echo(f"  ✗ Unexpected error: {e}", err=True)
-            failed += 1
+            say(f"  ✗ Unexpected error: {e}", err=True)
+            results.append(ProjectResult(name=project.name, rpp_path=project.rpp_path, status=FAILED, error=str(e)))
         finally:
             if temp_rpp is not None:
                 try:
@@ -145,13 +848,199 @@ def main(input_dir, output_dir, audio_format, duration, start, reaper_bin, dry_r
                 except OSError:
                     pass
 
+    # Renders start on worker threads while discovery may still be walking
+    found: list[ProjectInfo] = list(projects) if projects is not None else []
+    stager = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stage") if staging is not None else None
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="render") as executor:
+        futures = []
+
+        def submit(project: ProjectInfo, idx: int) -> None:
+            staged = stager.submit(stage, project) if stager is not None else None
+            futures.append(executor.submit(process, project, idx, staged))
+
+        # Projects the last run had no time for go first
+        deferred = set(budget.previously_deferred)
+        if projects is not None:
+            start_order = [p for p in projects if p.rpp_path.resolve() in deferred]
+            start_order += [p for p in projects if p.rpp_path.resolve() not in deferred]
+            for idx, project in enumerate(start_order, start=1):
+                submit(project, idx)
+        else:
+            root = input_path.resolve()
+            deferred = {path for path in deferred if path.is_file() and path.is_relative_to(root)}
+            for path in sorted(deferred):
+                found.append(ProjectInfo(name=path.stem, rpp_path=path, project_dir=path.parent))
+                submit(found[-1], len(found))
+            for project in iter_projects(input_path, skip_dirs=[output_path]):
+                if project.rpp_path.resolve() in deferred:
+                    continue
+                found.append(project)
+                tracer.instant("found", lane="discovery", args={"project": project.name})
+                submit(project, len(found))
+            discovery_done.set()
+            tracer.complete("discover", scan_started, time.monotonic_ns(), lane="discovery",
+                            args={"projects": len(found)})
+            click.echo(f"Discovery finished: {len(found)} project{'s' if len(found) != 1 else ''} found.")
+        for future in futures:
+            # Failures are results; anything raised here is a bug worth seeing
+            future.result()
+    if stager is not None:
+        stager.shutdown()
+        staging.save()
+        click.echo(f"\nStaging cache: {staging.total_bytes / 1024 ** 3:.1f} GB in {stage_dir}")
+    projects = sorted(found, key=lambda p: p.name)
+    order = {project.rpp_path: position for position, project in enumerate(projects)}
+    results.sort(key=lambda r: order[r.rpp_path])
+
+    if catalog is not None:
+        catalog.prune([project.rpp_path for project in projects])
+        catalog.close()
+
+    if media_index is not None:
+        # Keeps the content hashes computed for ambiguous lookups
+        media_index.save()
+
+    if history is not None:
+        history.save()
+
+    budget.save(known=[project.rpp_path for project in projects])
+
+    if post_pool is not None:
+        click.echo("\nWaiting for post-processing...")
+        for result in post_pool.finish():
+            click.echo(f"  ✗ {result.name}: {result.error}", err=True)
+
     # Summary
-    parts = [f"{successful} successful"]
-    if skipped:
-        parts.append(f"{skipped} skipped")
-    if failed:
-        parts.append(f"{failed} failed")
+    counts = summarize(results)
+    parts = [f"{counts[RENDERED]} successful"]
+    if counts[SKIPPED]:
+        parts.append(f"{counts[SKIPPED]} skipped")
+    if counts[FAILED]:
+        parts.append(f"{counts[FAILED]} failed")
+    if counts.get(DEFERRED):
+        parts.append(f"{counts[DEFERRED]} deferred")
     click.echo(f"\nCompleted: {', '.join(parts)}")
+    if launch_seconds:
+        total = sum(launch_seconds)
+        click.echo(
+            f"Reaper: {len(launch_seconds)} launch{'es' if len(launch_seconds) != 1 else ''}, "
+            f"{total:.1f} s total, {total / len(launch_seconds):.2f} s per launch"
+        )
+        peak_rss = max((stats.max_rss_kb or 0 for stats in launch_stats), default=0)
+        if peak_rss:
+            cpu = sum(stats.cpu_seconds or 0.0 for stats in launch_stats)
+            click.echo(f"Reaper: {cpu:.1f} s CPU, peak memory {peak_rss / 1024:.0f} MB")
+        if controller is not None:
+            held = controller.held_back
+            click.echo(
+                f"Concurrency: {controller.lowest} to {controller.highest} renders allowed, "
+                f"{controller.peak_running} at most at once"
+                f"{f'; {held} held back for memory' if held else ''}"
+            )
+        leftovers = sum(stats.leftover_processes for stats in launch_stats)
+        if leftovers:
+            click.echo(f"Stopped {leftovers} process{'es' if leftovers != 1 else ''} left running by renders")
+
+    missing_instruments = [r.name for r in results if any(w.startswith("Missing instruments") for w in r.warnings)]
+    if missing_instruments:
+        click.echo(f"Projects with missing instruments: {', '.join(missing_instruments)}")
+
+    if counts.get(DEFERRED):
+        click.echo("Time budget reached; deferred projects are rendered first next run.")
+
+    quarantined = [r.name for r in results if r.quarantined]
+    if quarantined:
+        click.echo(f"Quarantined (not rendered): {', '.join(quarantined)}")
+
+    silent = [r.name for r in results if r.audio and r.audio["silent"]]
+    if silent:
+        click.echo(f"Silent previews: {', '.join(silent)}")
+
+    if report:
+        write_report(Path(report), results)
+        click.echo(f"Report written to {report}")
+
+    if gallery:
+        written = update_gallery(Path(gallery), results)
+        click.echo(f"Gallery updated: {len(written)} page{'s' if len(written) != 1 else ''} written to {gallery}")
+
+    tracer.close()
+    if trace:
+        click.echo(f"Trace written to {trace}")
+
+
+@main.command()
+@click.option("--input-dir", type=click.Path(exists=True), default=".", help="Root directory containing Reaper projects.")
+@click.option("--cache-dir", type=click.Path(), default="./previews", help="Directory for cached preview files.")
+@click.option("--format", "audio_format", type=click.Choice(["mp3", "wav"]), default="mp3", help="Output audio format.")
+@click.option("--duration", type=float, default=30.0, help="Preview duration in seconds.")
+@click.option("--start", type=float, default=0.0, help="Start time in seconds.")
+@click.option("--reaper-bin", type=click.Path(), default=None, help="Path to Reaper executable.")
+@click.option("--host", default="127.0.0.1", help="Address to listen on.")
+@click.option("--port", type=int, default=8000, help="Port to listen on.")
+def serve(input_dir, cache_dir, audio_format, duration, start, reaper_bin, host, port):
+    """Serve previews over HTTP, rendering each one on first request."""
+    input_path = Path(input_dir)
+
+    click.echo(f"Scanning for .rpp files in {input_path}...")
+    projects = discover_projects(input_path)
+    click.echo(f"Found {len(projects)} project{'s' if len(projects) != 1 else ''}.")
+
+    if reaper_bin is None:
+        reaper_bin = find_reaper_bin()
+        if reaper_bin is None:
+            click.echo("Error: Could not find Reaper. Use --reaper-bin to specify the path.", err=True)
+            raise SystemExit(1)
+        click.echo(f"Using Reaper: {reaper_bin}")
+
+    cache = PreviewCache(
+        cache_dir=Path(cache_dir),
+        reaper_bin=reaper_bin,
+        audio_format=audio_format,
+        start=start,
+        duration=duration,
+    )
+    server = make_server(projects, cache, host=host, port=port)
+    click.echo(f"Serving previews at http://{host}:{server.server_port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("\nStopping server.")
+    finally:
+        server.server_close()
+
+
+@main.group()
+def quarantine():
+    """List or release projects skipped after failing repeatedly."""
+
+
+@quarantine.command("list")
+@click.option("--output-dir", type=click.Path(), default="./previews", help="Directory for rendered preview files.")
+def quarantine_list(output_dir):
+    """List quarantined projects and why they failed."""
+    history = FailureHistory(_state_dir(Path(output_dir)) / HISTORY_FILE)
+    entries = history.quarantined_projects()
+    if not entries:
+        click.echo("No projects are quarantined.")
+        return
+    for _, record in entries:
+        since = time.strftime("%Y-%m-%d %H:%M", time.localtime(record.quarantined_at))
+        click.echo(record.path)
+        click.echo(f"    {record.failures} failures, quarantined since {since}: {record.last_error}")
+
+
+@quarantine.command("clear")
+@click.argument("projects", nargs=-1)
+@click.option("--output-dir", type=click.Path(), default="./previews", help="Directory for rendered preview files.")
+def quarantine_clear(projects, output_dir):
+    """Release quarantined projects (by name or RPP path; all without arguments)."""
+    history = FailureHistory(_state_dir(Path(output_dir)) / HISTORY_FILE)
+    released = history.clear(list(projects))
+    history.save()
+    click.echo(f"Released {len(released)} project{'s' if len(released) != 1 else ''}.")
+    for path in released:
+        click.echo(f"  - {path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+"""Adaptive number of concurrent Reaper renders.
+
+The right number of renders at once depends on the projects: a few heavy
+sample-library projects fill the RAM long before the CPU is busy, while
+many small projects leave cores idle at any fixed setting. The controller
+starts at the minimum and re-evaluates the limit every few seconds from
+the load average (``/proc/loadavg``) and the available memory
+(``MemAvailable`` in ``/proc/meminfo``): it adds a render while the CPU
+has headroom and the memory a typical render uses (peak RSS of earlier
+renders) is free, and removes one when the load or the memory runs high.
+
+Each render also asks for its own expected peak RSS. A project that would
+not fit in the available memory, after what renders started moments ago
+are still about to allocate, is held back while smaller projects go ahead,
+until enough memory is free or nothing else is running. Where ``/proc``
+is not available the limit grows to the maximum.
+"""
+
+import os
+import statistics
+import threading
+import time
+from pathlib import Path
+
+# Load average per core above which a render is removed, and below which
+# one may be added
+OVERLOAD_PER_CPU = 1.2
+UNDERLOAD_PER_CPU = 0.8
+# Share of the total memory kept free for the system and the desktop
+MEMORY_RESERVE_FRACTION = 0.1
+# Seconds between changes of the limit; the load average reacts slowly
+ADJUST_SECONDS = 10.0
+# Seconds a new render is assumed not to have allocated its memory yet
+RAMP_SECONDS = 30.0
+_POLL_SECONDS = 1.0
+
+
+def read_loadavg(path: Path = Path("/proc/loadavg")) -> float | None:
+    """One-minute load average, or None where it cannot be read."""
+    try:
+        return float(path.read_text().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_meminfo(path: Path = Path("/proc/meminfo")) -> tuple[int, int] | None:
+    """``(MemAvailable, MemTotal)`` in KiB, or None where they cannot be read."""
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("MemAvailable", "MemTotal"):
+                    values[key] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    if len(values) < 2:
+        return None
+    return values["MemAvailable"], values["MemTotal"]
+
+
+class ConcurrencyController:
+    """Admit renders up to a limit that follows the CPU load and free memory.
+
+    Call acquire() with the expected peak RSS of a render before starting
+    it, and release() with its measured peak RSS when it is done.
+    """
+
+    def __init__(
+        self,
+        min_jobs: int,
+        max_jobs: int,
+        cpus: int | None = None,
+        read_load=read_loadavg,
+        read_memory=read_meminfo,
+        clock=time.monotonic,
+    ):
+        self.min_jobs = min_jobs
+        self.max_jobs = max_jobs
+        self.limit = min_jobs
+        self.cpus = cpus or os.cpu_count() or 1
+        self._read_load = read_load
+        self._read_memory = read_memory
+        self._clock = clock
+        self._condition = threading.Condition()
+        # Expected peak RSS of running renders, with their start times
+        self._running: dict[int, tuple[float, int]] = {}
+        self._next_id = 0
+        self._rss_seen: list[int] = []
+        self._adjusted = clock()
+        self.lowest = self.highest = min_jobs
+        self.peak_running = 0
+        self.held_back = 0
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def _typical_rss(self) -> int:
+        return int(statistics.median(self._rss_seen)) if self._rss_seen else 0
+
+    def _adjust(self, memory: tuple[int, int] | None) -> None:
+        """Move the limit by one step, at most every ADJUST_SECONDS."""
+        now = self._clock()
+        if now - self._adjusted < ADJUST_SECONDS:
+            return
+        load = self._read_load()
+        limit = self.limit
+        reserve = memory[1] * MEMORY_RESERVE_FRACTION if memory else 0
+        if memory is not None and memory[0] < reserve:
+            limit -= 1
+        elif load is not None and load > self.cpus * OVERLOAD_PER_CPU:
+            limit -= 1
+        elif (
+            self.running >= self.limit
+            and (load is None or load < self.cpus * UNDERLOAD_PER_CPU)
+            and (memory is None or memory[0] - self._ramping_kb(now) - self._typical_rss() > reserve)
+        ):
+            limit += 1
+        limit = max(self.min_jobs, min(self.max_jobs, limit))
+        if limit != self.limit:
+            self.limit = limit
+            self._adjusted = now
+            self.lowest = min(self.lowest, limit)
+            self.highest = max(self.highest, limit)
+
+    def _ramping_kb(self, now: float) -> int:
+        """Memory renders started moments ago are still expected to take."""
+        return sum(rss for started, rss in self._running.values() if now - started < RAMP_SECONDS)
+
+    def _admits(self, expected_rss_kb: int, memory: tuple[int, int] | None) -> bool:
+        if self.running >= self.limit:
+            return False
+        if memory is None or not self._running:
+            return True
+        available, total = memory
+        free = available - self._ramping_kb(self._clock()) - total * MEMORY_RESERVE_FRACTION
+        return expected_rss_kb <= free
+
+    def acquire(self, expected_rss_kb: int | None = None) -> int:
+        """Wait until a render expected to peak at `expected_rss_kb` may start.
+
+        Returns a token for release().
+        """
+        expected = expected_rss_kb or self._typical_rss()
+        held = False
+        with self._condition:
+            while True:
+                memory = self._read_memory()
+                self._adjust(memory)
+                if self._admits(expected, memory):
+                    break
+                if not held and self.running < self.limit:
+                    # Waiting for memory, not for a slot
+                    held = True
+                    self.held_back += 1
+                self._condition.wait(_POLL_SECONDS)
+            token = self._next_id
+            self._next_id += 1
+            self._running[token] = (self._clock(), expected)
+            self.peak_running = max(self.peak_running, self.running)
+            return token
+
+    def release(self, token: int, rss_kb: int | None = None) -> None:
+        """Mark a render as finished, with the peak RSS it reached."""
+        with self._condition:
+            self._running.pop(token, None)
+            if rss_kb:
+                self._rss_seen.append(rss_kb)
+            self._condition.notify_all()
@@ -1,8 +1,12 @@
 """Discover Reaper project files in a directory tree."""
 
+import os
+from collections.abc import Iterator
 from dataclasses import dataclass
 from pathlib import Path
 
+from reaper_preview.media import MEDIA_EXTENSIONS, MediaIndex
+
 
 @dataclass
 class ProjectInfo:
@@ -13,22 +17,49 @@ class ProjectInfo:
     project_dir: Path
 
 
-def discover_projects(root_dir: Path) -> list[ProjectInfo]:
+def _project(rpp_path: Path) -> ProjectInfo:
+    return ProjectInfo(name=rpp_path.stem, rpp_path=rpp_path, project_dir=rpp_path.parent)
+
+
+def iter_projects(
+    root_dir: Path,
+    media_index: MediaIndex | None = None,
+    skip_dirs: list[Path] = (),
+) -> Iterator[ProjectInfo]:
+    """Yield .rpp files under root_dir as the walk finds them, skipping backups.
+
+    Skips .rpp-bak and .rpp-undo files. Projects come in walk order, so
+    rendering can start before a large tree has been walked completely.
+
+    If `media_index` is given, media files met on the same walk are added
+    to it; directories in `skip_dirs` (such as the preview output) are not
+    walked.
+    """
+    skip = {os.path.abspath(path) for path in skip_dirs}
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        if skip:
+            dirnames[:] = [d for d in dirnames if os.path.abspath(os.path.join(dirpath, d)) not in skip]
+        for filename in filenames:
+            if filename.endswith(".rpp"):
+                yield _project(Path(dirpath) / filename)
+            elif media_index is not None and os.path.splitext(filename)[1].lower() in MEDIA_EXTENSIONS:
+                path = Path(dirpath) / filename
+                try:
+                    media_index.add(path, path.stat())
+                except OSError:
+                    continue
+
+
+def discover_projects(
+    root_dir: Path,
+    media_index: MediaIndex | None = None,
+    skip_dirs: list[Path] = (),
+) -> list[ProjectInfo]:
     """Recursively find .rpp files under root_dir, skipping backups.
 
     Skips .rpp-bak and .rpp-undo files. Returns results sorted by name.
+    See iter_projects for `media_index` and `skip_dirs`.
     """
-    projects = []
-    for rpp_path in root_dir.rglob("*.rpp"):
-        if rpp_path.suffix != ".rpp":
-            # rglob("*.rpp") also matches .rpp-bak, .rpp-undo etc.
-            continue
-        projects.append(
-            ProjectInfo(
-                name=rpp_path.stem,
-                rpp_path=rpp_path,
-                project_dir=rpp_path.parent,
-            )
-        )
+    projects = list(iter_projects(root_dir, media_index, skip_dirs))
     projects.sort(key=lambda p: p.name)
     return projects
@@ -0,0 +1,155 @@
+"""Encode master WAV renders into other output formats.
+
+Reaper renders one WAV per project; every other requested format is
+produced from it by an encoder backend. Backends are small classes
+registered by name, so new encoders can be plugged in with
+register_encoder(). MP3 bitrate, VBR quality and channel mode come from
+the Mp3Settings of the quality preset, if there is one.
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+from reaper_preview.render_cfg import Mp3Settings
+
+# Formats Reaper can render directly via RENDER_CFG
+RENDER_FORMATS = ("wav", "mp3")
+# Every format a preview can be delivered in
+OUTPUT_FORMATS = ("wav", "mp3", "flac", "opus")
+
+
+class EncodeError(Exception):
+    """Raised when an encoder fails or is not available."""
+
+
+class Encoder:
+    """Base class for encoder backends."""
+
+    name = ""
+    executable = ""
+    formats: tuple[str, ...] = ()
+
+    def __init__(self, executable: str | None = None, mp3: Mp3Settings | None = None):
+        self.executable = executable or shutil.which(self.executable) or self.executable
+        # None keeps the backend's default MP3 settings
+        self.mp3 = mp3
+
+    @classmethod
+    def available(cls) -> bool:
+        return shutil.which(cls.executable) is not None
+
+    def command(self, source: Path, dest: Path, audio_format: str) -> list[str]:
+        raise NotImplementedError
+
+    def encode(self, source: Path, dest: Path, audio_format: str, timeout: int = 300) -> Path:
+        """Encode `source` into `dest`, replacing it atomically.
+
+        Raises:
+            EncodeError: If the format is unsupported or the encoder fails
+        """
+        if audio_format not in self.formats:
+            raise EncodeError(f"{self.name} cannot encode {audio_format}")
+        tmp = dest.with_name(f"{dest.stem}.tmp{dest.suffix}")
+        cmd = self.command(source, tmp, audio_format)
+        try:
+            result = subprocess.run(cmd, timeout=timeout, capture_output=True)
+        except subprocess.TimeoutExpired as e:
+            tmp.unlink(missing_ok=True)
+            raise EncodeError(f"{self.name} timed out after {timeout} seconds") from e
+        except OSError as e:
+            raise EncodeError(f"Could not run {self.name}: {e}") from e
+        if result.returncode != 0 or not tmp.exists():
+            tmp.unlink(missing_ok=True)
+            stderr = result.stderr.decode(errors="replace").strip()[-500:] if result.stderr else "(none)"
+            raise EncodeError(f"{self.name} exited with code {result.returncode}. stderr: {stderr}")
+        tmp.replace(dest)
+        return dest
+
+
+class FfmpegEncoder(Encoder):
+    name = "ffmpeg"
+    executable = "ffmpeg"
+    formats = ("mp3", "flac", "opus", "wav")
+
+    _CODEC_ARGS = {
+        "mp3": ["-codec:a", "libmp3lame", "-q:a", "4"],
+        "flac": ["-codec:a", "flac"],
+        "opus": ["-codec:a", "libopus", "-b:a", "96k"],
+        "wav": ["-codec:a", "pcm_s16le"],
+    }
+
+    def _codec_args(self, audio_format: str) -> list[str]:
+        if audio_format != "mp3" or self.mp3 is None:
+            return self._CODEC_ARGS[audio_format]
+        mp3 = self.mp3
+        args = ["-codec:a", "libmp3lame", "-compression_level", str(mp3.quality)]
+        if mp3.vbr_quality is None:
+            args += ["-b:a", f"{mp3.bitrate}k"]
+        else:
+            args += ["-q:a", str(mp3.vbr_quality)]
+        if mp3.mono:
+            args += ["-ac", "1"]
+        return args
+
+    def command(self, source, dest, audio_format):
+        return [
+            self.executable, "-nostdin", "-hide_banner", "-loglevel", "error", "-y",
+            "-i", str(source), *self._codec_args(audio_format), "-f", audio_format, str(dest),
+        ]
+
+
+class LameEncoder(Encoder):
+    name = "lame"
+    executable = "lame"
+    formats = ("mp3",)
+
+    def command(self, source, dest, audio_format):
+        mp3 = self.mp3
+        if mp3 is None:
+            args = ["-V", "4"]
+        else:
+            args = ["-q", str(mp3.quality)]
+            args += ["-b", str(mp3.bitrate), "--cbr"] if mp3.vbr_quality is None else ["-V", str(mp3.vbr_quality)]
+            if mp3.mono:
+                args += ["-a", "-m", "m"]
+        return [self.executable, "--quiet", *args, str(source), str(dest)]
+
+
+ENCODERS: dict[str, type[Encoder]] = {}
+
+
+def register_encoder(cls: type[Encoder]) -> type[Encoder]:
+    """Register an encoder backend under its name. Usable as a class decorator."""
+    ENCODERS[cls.name] = cls
+    return cls
+
+
+register_encoder(FfmpegEncoder)
+register_encoder(LameEncoder)
+
+
+def get_encoder(
+    name: str, formats: list[str], mp3: Mp3Settings | None = None, executable: str | None = None
+) -> Encoder:
+    """Return an encoder instance by backend name, or pick one with "auto".
+
+    `mp3` sets the MP3 encoding settings of the instance; `executable`
+    overrides the program a named backend runs.
+
+    Raises:
+        EncodeError: If no suitable backend is registered or installed
+    """
+    if name != "auto":
+        if name not in ENCODERS:
+            raise EncodeError(f"Unknown encoder: {name}")
+        cls = ENCODERS[name]
+        unsupported = [f for f in formats if f not in cls.formats]
+        if unsupported:
+            raise EncodeError(f"{name} cannot encode {', '.join(unsupported)}")
+        return cls(executable=executable, mp3=mp3)
+
+    for cls in ENCODERS.values():
+        if all(f in cls.formats for f in formats) and cls.available():
+            return cls(mp3=mp3)
+    raise EncodeError(f"No installed encoder can produce {', '.join(formats)}; install ffmpeg")
@@ -0,0 +1,149 @@
+"""Bypass expensive effects in preview renders.
+
+Reverbs, convolution, linear-phase EQs and mastering chains can dominate
+render time while adding little to a short preview. The filter below
+selects plugins by name or by the categories Reaper assigns them in
+reaper-fxtags.ini, and bypass_fx() sets them bypassed and offline in the
+temporary project: in an FX chain, the ``BYPASS <bypass> <offline> <wet>``
+line precedes each plugin block. Offline plugins are not even loaded, so
+they cost nothing at all. The master FX chain can be dropped as a whole.
+"""
+
+import fnmatch
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from reaper_preview.metadata import PLUGIN_TAGS, PluginRef, split_tokens
+from reaper_preview.plugins import normalize_name, read_ini
+
+FX_TAGS_FILE = "reaper-fxtags.ini"
+MASTER_FX_TAG = "MASTERFXLIST"
+
+
+def load_fx_categories(resource_dir: Path) -> dict[str, set[str]]:
+    """Read the plugin categories from Reaper's reaper-fxtags.ini.
+
+    Keys are plugin files or names as Reaper lists them, lower-cased;
+    values are the lower-cased categories ("Reverb|Delay" gives two).
+    """
+    path = resource_dir / FX_TAGS_FILE
+    if not path.is_file():
+        return {}
+    parser = read_ini(path)
+    if not parser.has_section("category"):
+        return {}
+    return {
+        normalize_name(key): {normalize_name(category) for category in value.split("|") if category.strip()}
+        for key, value in parser.items("category")
+    }
+
+
+def fx_display_name(plugin: PluginRef) -> str:
+    """Plugin name without the "VST3: " style prefix."""
+    prefix, sep, rest = plugin.name.partition(": ")
+    return rest if sep and " " not in prefix else plugin.name
+
+
+@dataclass
+class FxFilter:
+    """Which effects to bypass in preview renders."""
+
+    # Name patterns: plain text matches anywhere in the name, case-insensitive;
+    # patterns with * ? or [ are shell-style globs over the whole name
+    names: list[str] = field(default_factory=list)
+    categories: list[str] = field(default_factory=list)
+    # Categories by plugin file or name, from load_fx_categories()
+    fx_categories: dict[str, set[str]] = field(default_factory=dict)
+    drop_master_fx: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.names or self.categories or self.drop_master_fx)
+
+    def _keys(self, plugin: PluginRef) -> list[str]:
+        keys = [normalize_name(fx_display_name(plugin)), normalize_name(plugin.name)]
+        if plugin.ident:
+            keys.append(normalize_name(plugin.ident.replace("\\", "/").rsplit("/", 1)[-1]))
+        return keys
+
+    def matches(self, plugin: PluginRef) -> bool:
+        keys = self._keys(plugin)
+        for pattern in self.names:
+            pattern = normalize_name(pattern)
+            if any(c in pattern for c in "*?["):
+                if any(fnmatch.fnmatchcase(key, pattern) for key in keys):
+                    return True
+            elif any(pattern in key for key in keys):
+                return True
+        if self.categories:
+            wanted = {normalize_name(category) for category in self.categories}
+            for key in keys:
+                if wanted & self.fx_categories.get(key, set()):
+                    return True
+        return False
+
+
+def _plugin_ref(line: str) -> PluginRef | None:
+    tokens = split_tokens(line)
+    kind = tokens[0][1:] if tokens else ""
+    if kind not in PLUGIN_TAGS:
+        return None
+    return PluginRef(
+        kind=kind,
+        name=tokens[1] if len(tokens) > 1 else "",
+        ident=tokens[2] if len(tokens) > 2 else "",
+    )
+
+
+def bypass_fx(text: str, fx_filter: FxFilter, bypassed: list[str] | None = None) -> str:
+    """Bypass and take offline the plugins `fx_filter` matches, in one pass.
+
+    Covers track, take, input and master FX chains. With drop_master_fx the
+    top-level <MASTERFXLIST> block is removed instead. The names of the
+    plugins switched off (master ones as "Master: <name>") are appended to
+    `bypassed`; plugins that were already bypassed are left alone.
+    """
+    return "\n".join(bypass_fx_lines(text.split("\n"), fx_filter, bypassed))
+
+
+def bypass_fx_lines(lines: Iterable[str], fx_filter: FxFilter, bypassed: list[str] | None = None) -> list[str]:
+    """bypass_fx() over RPP lines, such as those select_track_lines() yields."""
+    if bypassed is None:
+        bypassed = []
+    out: list[str] = []
+    # Index in `out` of the BYPASS line of the plugin that follows it
+    bypass_line = None
+    # Nesting depth inside a dropped master FX chain
+    dropped_depth = 0
+    for line in lines:
+        stripped = line.strip()
+        if dropped_depth:
+            if stripped.startswith("<"):
+                dropped_depth += 1
+                plugin = _plugin_ref(stripped)
+                if plugin is not None:
+                    bypassed.append(f"Master: {fx_display_name(plugin)}")
+            elif stripped == ">":
+                dropped_depth -= 1
+            continue
+        if fx_filter.drop_master_fx and (line == f"  <{MASTER_FX_TAG}" or line.startswith(f"  <{MASTER_FX_TAG} ")):
+            dropped_depth = 1
+            continue
+
+        if stripped.startswith("BYPASS "):
+            bypass_line = len(out)
+        elif stripped.startswith("<"):
+            plugin = _plugin_ref(stripped)
+            if plugin is not None and bypass_line is not None and fx_filter.matches(plugin):
+                indent = out[bypass_line][: len(out[bypass_line]) - len(out[bypass_line].lstrip())]
+                fields = out[bypass_line].split()
+                # BYPASS <bypass> <offline> [<wet> ...]
+                fields += ["0"] * (4 - len(fields))
+                if fields[1] == "0" and fields[2] == "0":
+                    fields[1] = fields[2] = "1"
+                    out[bypass_line] = indent + " ".join(fields)
+                    bypassed.append(fx_display_name(plugin))
+            if plugin is not None:
+                bypass_line = None
+        out.append(line)
+    return out
@@ -0,0 +1,200 @@
+"""Incremental, sharded HTML gallery of rendered previews.
+
+Projects are spread over a fixed number of shard pages by a stable hash of
+their .rpp path (and segment name, for segment previews), so adding or
+removing a project only touches its own shard. A JSON state file records
+what each page currently shows; on every run the gallery is compared
+against the run results and only the shards whose entries changed are
+rewritten. Output files are never read.
+"""
+
+import html
+import json
+import math
+import os
+import zlib
+from pathlib import Path
+from urllib.parse import quote
+
+from reaper_preview.report import FAILED, RENDERED, ProjectResult
+
+STATE_FILE = "gallery.json"
+INDEX_FILE = "index.html"
+DEFAULT_PAGE_SIZE = 200
+
+_STATE_VERSION = 2
+
+_PAGE_STYLE = (
+    "body{font-family:sans-serif;margin:2em}"
+    "li{margin:.4em 0}"
+    ".name{display:inline-block;min-width:20em}"
+    ".failed{color:#b00}"
+)
+
+
+def _entry_key(result: ProjectResult) -> str:
+    """Key of a result's gallery entry: its .rpp path, plus the preview name for segments."""
+    key = str(result.rpp_path)
+    if result.name != result.rpp_path.stem:
+        key += f"#{result.name}"
+    return key
+
+
+def _shard_of(key: str, shard_count: int) -> int:
+    return zlib.crc32(key.encode("utf-8")) % shard_count
+
+
+def _page_name(shard: int) -> str:
+    return f"page-{shard:04d}.html"
+
+
+def _shard_count_for(total: int, page_size: int, current: int) -> int:
+    """Pick a shard count, growing by doubling so reshards stay rare."""
+    shards = max(current, 1, math.ceil(total / page_size))
+    while total > shards * page_size * 2:
+        shards *= 2
+    return shards
+
+
+def _entry_for(result: ProjectResult, gallery_dir: Path, previous: dict | None) -> dict:
+    # Only what the page shows, so a run that changes nothing visible (a
+    # preview rendered last run and skipped this one) leaves the page alone
+    failed = result.status == FAILED
+    entry = {"name": result.name, "failed": failed, "error": result.error if failed else None}
+    if result.output_path is not None:
+        rel = os.path.relpath(result.output_path, gallery_dir).replace("\\", "/")
+        entry["src"] = rel
+        entry["mtime"] = int(result.output_mtime) if result.output_mtime is not None else None
+    elif result.status != RENDERED and previous and previous.get("src"):
+        # Keep showing the last good preview of a project that failed or was
+        # not rendered this run (deferred, quarantined, missing instruments)
+        entry["src"] = previous["src"]
+        entry["mtime"] = previous.get("mtime")
+    else:
+        entry["src"] = None
+        entry["mtime"] = None
+    return entry
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _render_page(shard: int, shard_count: int, entries: list[dict]) -> str:
+    rows = []
+    for entry in sorted(entries, key=lambda e: e["name"].lower()):
+        name = html.escape(entry["name"])
+        css = ' class="failed"' if entry["failed"] else ""
+        row = f'<li{css}><span class="name">{name}</span> '
+        if entry["src"]:
+            src = quote(entry["src"])
+            if entry["mtime"] is not None:
+                src += f"?v={entry['mtime']}"
+            row += f'<audio controls preload="none" src="{src}"></audio>'
+        if entry["error"]:
+            row += f' <small>{html.escape(entry["error"])}</small>'
+        rows.append(row + "</li>")
+
+    nav = []
+    if shard > 0:
+        nav.append(f'<a href="{_page_name(shard - 1)}">&larr; prev</a>')
+    nav.append(f'<a href="{INDEX_FILE}">index</a>')
+    if shard < shard_count - 1:
+        nav.append(f'<a href="{_page_name(shard + 1)}">next &rarr;</a>')
+
+    return (
+        "<!DOCTYPE html>\n"
+        '<html><head><meta charset="utf-8">'
+        f"<title>Reaper previews — page {shard + 1} of {shard_count}</title>"
+        f"<style>{_PAGE_STYLE}</style></head>\n"
+        f"<body><nav>{' | '.join(nav)}</nav>\n"
+        f"<h1>Page {shard + 1} of {shard_count}</h1>\n"
+        "<ul>\n" + "\n".join(rows) + "\n</ul></body></html>\n"
+    )
+
+
+def _render_index(shard_count: int, shards: list[list[dict]]) -> str:
+    total = sum(len(entries) for entries in shards)
+    rows = []
+    for shard, entries in enumerate(shards):
+        names = sorted(e["name"] for e in entries)
+        span = f"{html.escape(names[0])} … {html.escape(names[-1])}" if names else "(empty)"
+        rows.append(
+            f'<li><a href="{_page_name(shard)}">Page {shard + 1}</a> '
+            f"({len(entries)}): {span}</li>"
+        )
+    return (
+        "<!DOCTYPE html>\n"
+        '<html><head><meta charset="utf-8"><title>Reaper previews</title>'
+        f"<style>{_PAGE_STYLE}</style></head>\n"
+        f"<body><h1>Reaper previews ({total})</h1>\n"
+        "<ul>\n" + "\n".join(rows) + "\n</ul></body></html>\n"
+    )
+
+
+def _load_state(gallery_dir: Path) -> dict:
+    try:
+        state = json.loads((gallery_dir / STATE_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return {"version": _STATE_VERSION, "shards": 0, "entries": {}}
+    if state.get("version") != _STATE_VERSION:
+        return {"version": _STATE_VERSION, "shards": 0, "entries": {}}
+    return state
+
+
+def update_gallery(
+    gallery_dir: Path,
+    results: list[ProjectResult],
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> list[Path]:
+    """Bring the gallery in line with the results of a run.
+
+    `results` must cover every project in the library (as produced by a
+    full batch run); projects missing from it are removed from the gallery.
+
+    Returns the list of page files that were (re)written.
+    """
+    gallery_dir.mkdir(parents=True, exist_ok=True)
+    state = _load_state(gallery_dir)
+    old_entries: dict[str, dict] = state["entries"]
+    old_shards = state["shards"]
+
+    new_entries = {
+        _entry_key(result): _entry_for(result, gallery_dir, old_entries.get(_entry_key(result)))
+        for result in results
+    }
+    shard_count = _shard_count_for(len(new_entries), page_size, old_shards)
+
+    if shard_count != old_shards:
+        dirty = set(range(shard_count))
+    else:
+        dirty = set()
+        for key in old_entries.keys() | new_entries.keys():
+            if old_entries.get(key) != new_entries.get(key):
+                dirty.add(_shard_of(key, shard_count))
+
+    shards: list[list[dict]] = [[] for _ in range(shard_count)]
+    for key, entry in new_entries.items():
+        shards[_shard_of(key, shard_count)].append(entry)
+
+    written = []
+    for shard in sorted(dirty):
+        path = gallery_dir / _page_name(shard)
+        _write_atomic(path, _render_page(shard, shard_count, shards[shard]))
+        written.append(path)
+
+    index_path = gallery_dir / INDEX_FILE
+    if dirty or not index_path.exists():
+        _write_atomic(index_path, _render_index(shard_count, shards))
+        written.append(index_path)
+
+    # Pages left over from a larger shard count in an older state
+    for shard in range(shard_count, old_shards):
+        (gallery_dir / _page_name(shard)).unlink(missing_ok=True)
+
+    if dirty or shard_count != old_shards:
+        state = {"version": _STATE_VERSION, "shards": shard_count, "entries": new_entries}
+        _write_atomic(gallery_dir / STATE_FILE, json.dumps(state))
+    return written
@@ -0,0 +1,61 @@
+"""Per-run directories of Reaper render logs.
+
+Reaper's output goes straight from the child process to one log file per
+project, so nothing accumulates in memory however much a plugin prints.
+Each run gets its own directory under the state directory. When a new run
+starts, the logs of earlier runs are gzip-compressed and all but the
+latest few runs are deleted, so log space stays bounded as well.
+"""
+
+import gzip
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import BinaryIO
+
+LOG_DIR = "logs"
+# Runs whose logs are kept, including the current one
+KEEP_RUNS = 5
+# Bytes of the end of a log quoted in error messages
+TAIL_BYTES = 2048
+
+
+def start_run_logs(state_dir: Path, keep: int = KEEP_RUNS) -> Path:
+    """Create the log directory of a new run and rotate those of earlier runs."""
+    root = state_dir / LOG_DIR
+    root.mkdir(parents=True, exist_ok=True)
+    previous = sorted(path for path in root.iterdir() if path.is_dir())
+    for stale in previous[: max(0, len(previous) - (keep - 1))]:
+        shutil.rmtree(stale, ignore_errors=True)
+    for run_dir in previous[-(keep - 1):] if keep > 1 else []:
+        if run_dir.exists():
+            compress_logs(run_dir)
+
+    name = time.strftime("%Y%m%d-%H%M%S")
+    run_dir = root / name
+    suffix = 1
+    while run_dir.exists():
+        suffix += 1
+        run_dir = root / f"{name}-{suffix}"
+    run_dir.mkdir()
+    return run_dir
+
+
+def compress_logs(run_dir: Path) -> None:
+    """Gzip the plain .log files of a run directory."""
+    for log in run_dir.glob("*.log"):
+        with open(log, "rb") as src, gzip.open(log.with_name(log.name + ".gz"), "wb") as dest:
+            shutil.copyfileobj(src, dest)
+        log.unlink()
+
+
+def read_tail(f: BinaryIO, limit: int = TAIL_BYTES) -> str:
+    """The last `limit` bytes of a binary file as text, starting at a line boundary."""
+    size = f.seek(0, os.SEEK_END)
+    f.seek(max(0, size - limit))
+    data = f.read()
+    if size > limit:
+        # Drop the partial first line
+        data = data.split(b"\n", 1)[-1]
+    return data.decode(errors="replace").strip()
@@ -0,0 +1,144 @@
+"""Library-wide index of media files for relocating moved audio.
+
+When a project folder is moved or renamed, its FILE references point to
+paths that no longer exist. The index maps each media filename to the
+places it exists in the library, so a missing reference is found again
+with one dictionary lookup. Entries carry size and mtime, which keep the
+index valid across runs without re-reading files, and a partial content
+hash that tells identical copies from different files of the same name.
+Hashes are computed lazily, only when a name has several candidates.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+# Extensions of files a project can reference as item sources
+MEDIA_EXTENSIONS = frozenset({
+    ".wav", ".w64", ".aif", ".aiff", ".flac", ".mp3", ".ogg", ".opus", ".m4a", ".wv",
+    ".caf", ".rx2", ".mid", ".midi", ".mp4", ".mov", ".avi", ".webm",
+})
+
+INDEX_FILE = "media-index.json"
+_INDEX_VERSION = 1
+# Bytes hashed from the start and from the end of a file
+_HASH_CHUNK = 64 * 1024
+
+
+def partial_hash(path: Path, size: int) -> str:
+    """Hash the size and the first and last 64 KiB of a file."""
+    digest = hashlib.sha1(str(size).encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(_HASH_CHUNK))
+        if size > 2 * _HASH_CHUNK:
+            f.seek(-_HASH_CHUNK, os.SEEK_END)
+            digest.update(f.read(_HASH_CHUNK))
+    return digest.hexdigest()
+
+
+def media_name(reference: str) -> str:
+    """Filename of a FILE reference, whichever separator the project was saved with."""
+    return reference.replace("\\", "/").rsplit("/", 1)[-1]
+
+
+@dataclass
+class MediaEntry:
+    """A media file found in the library."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    hash: str | None = None
+
+    def content_key(self) -> tuple[int, str]:
+        if self.hash is None:
+            self.hash = partial_hash(Path(self.path), self.size)
+        return (self.size, self.hash)
+
+
+@dataclass
+class Relocation:
+    """Where a missing reference was found, and whether other files also matched."""
+
+    path: Path
+    ambiguous: bool = False
+
+
+class MediaIndex:
+    """Media files of a library by lower-cased filename.
+
+    Fill it with add() while walking the library, then save() it; entries
+    of files that were not added again are dropped on save.
+    """
+
+    def __init__(self, cache_path: Path | None = None):
+        self.cache_path = cache_path
+        self._previous: dict[str, MediaEntry] = {}
+        self._entries: dict[str, MediaEntry] = {}
+        self._by_name: dict[str, list[MediaEntry]] = {}
+
+    @classmethod
+    def load(cls, cache_path: Path) -> "MediaIndex":
+        """Create an index that reuses what is still valid from a saved one."""
+        index = cls(cache_path)
+        try:
+            data = json.loads(cache_path.read_text())
+            if data.get("version") == _INDEX_VERSION:
+                index._previous = {
+                    path: MediaEntry(path, size, mtime_ns, digest)
+                    for path, (size, mtime_ns, digest) in data["files"].items()
+                }
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, path: Path, stat: os.stat_result) -> None:
+        key = str(path)
+        entry = self._previous.get(key)
+        if entry is None or entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+            entry = MediaEntry(key, stat.st_size, stat.st_mtime_ns)
+        self._entries[key] = entry
+        self._by_name.setdefault(path.name.lower(), []).append(entry)
+
+    def locate(self, name: str, near: Path | None = None) -> Relocation | None:
+        """Find a media file by name, preferring the copy closest to `near`.
+
+        The result is ambiguous if files with different content share the name.
+        """
+        candidates = self._by_name.get(name.lower())
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return Relocation(Path(candidates[0].path))
+
+        def closeness(entry: MediaEntry) -> int:
+            if near is None:
+                return 0
+            try:
+                return len(Path(os.path.commonpath([entry.path, str(near)])).parts)
+            except ValueError:
+                return 0
+
+        best = max(candidates, key=closeness)
+        try:
+            ambiguous = len({entry.content_key() for entry in candidates}) > 1
+        except OSError:
+            ambiguous = True
+        return Relocation(Path(best.path), ambiguous=ambiguous)
+
+    def save(self) -> None:
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": _INDEX_VERSION,
+            "files": {e.path: [e.size, e.mtime_ns, e.hash] for e in self._entries.values()},
+        }
+        tmp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, self.cache_path)
@@ -0,0 +1,141 @@
+"""Extract project metadata from RPP text.
+
+Everything is collected in a single scan over the lines of the project,
+so it can piggyback on the read that preview preparation already does.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+
+# Plugin block tags as they appear in FX chains: <VST, <AU, <JS, <CLAP, ...
+PLUGIN_TAGS = ("VST", "AU", "JS", "CLAP", "DX", "LV2")
+
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+@dataclass
+class PluginRef:
+    """A plugin instance referenced by a project."""
+
+    kind: str
+    name: str
+    ident: str = ""
+
+    @property
+    def is_instrument(self) -> bool:
+        # Reaper labels instruments "VSTi:", "VST3i:", "AUi:", "CLAPi:" etc.
+        prefix, sep, _ = self.name.partition(":")
+        return bool(sep) and prefix.endswith("i")
+
+
+@dataclass
+class ProjectMetadata:
+    """Facts about a project gathered while preparing it for preview."""
+
+    sha1: str = ""
+    track_count: int = 0
+    item_count: int = 0
+    tempo: float | None = None
+    time_signature: tuple[int, int] | None = None
+    length: float = 0.0
+    sample_rate: int | None = None
+    plugins: list[PluginRef] = field(default_factory=list)
+    media: list[str] = field(default_factory=list)
+    # (name, position) of markers and (name, start, end) of regions, by position
+    markers: list[tuple[str, float]] = field(default_factory=list)
+    regions: list[tuple[str, float, float]] = field(default_factory=list)
+    # Missing media references moved to where the media index found them
+    # (ambiguous ones had several different candidates), and those that
+    # could not be found
+    relocated_media: dict[str, str] = field(default_factory=dict)
+    ambiguous_media: list[str] = field(default_factory=list)
+    missing_media: list[str] = field(default_factory=list)
+    # Plugins bypassed in the preview render (see fx.bypass_fx)
+    bypassed_fx: list[str] = field(default_factory=list)
+    # Tracks heard in a track-subset preview, and tracks removed for it
+    # (see tracks.select_tracks)
+    selected_tracks: list[str] = field(default_factory=list)
+    dropped_tracks: list[str] = field(default_factory=list)
+
+
+def split_tokens(line: str) -> list[str]:
+    """Split an RPP line into tokens, honouring double-quoted strings."""
+    return [m.group(1) if m.group(1) is not None else m.group(2) for m in _TOKEN_RE.finditer(line)]
+
+
+def rpp_hash(text: str) -> str:
+    """Content hash used to detect changes to a project."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def scan_metadata(text: str, metadata: ProjectMetadata) -> ProjectMetadata:
+    """Fill `metadata` from RPP text in a single pass over its lines."""
+    metadata.sha1 = rpp_hash(text)
+    media_seen = set()
+
+    item_pos = None
+    open_regions = {}
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+
+        if line.startswith("<"):
+            tag = line[1:].split(None, 1)[0] if len(line) > 1 else ""
+            if tag == "TRACK":
+                metadata.track_count += 1
+            elif tag == "ITEM":
+                metadata.item_count += 1
+                item_pos = 0.0
+            elif tag in PLUGIN_TAGS:
+                tokens = split_tokens(line)
+                name = tokens[1] if len(tokens) > 1 else ""
+                ident = tokens[2] if len(tokens) > 2 else ""
+                metadata.plugins.append(PluginRef(kind=tag, name=name, ident=ident))
+            continue
+
+        try:
+            if item_pos is not None:
+                if line.startswith("POSITION "):
+                    item_pos = float(line.split()[1])
+                elif line.startswith("LENGTH "):
+                    item_len = float(line.split()[1])
+                    metadata.length = max(metadata.length, item_pos + item_len)
+
+            if line.startswith("FILE "):
+                tokens = split_tokens(line)
+                if len(tokens) > 1 and tokens[1] and tokens[1] not in media_seen:
+                    media_seen.add(tokens[1])
+                    metadata.media.append(tokens[1])
+            elif line.startswith("TEMPO ") and metadata.tempo is None:
+                parts = line.split()
+                metadata.tempo = float(parts[1])
+                if len(parts) >= 4:
+                    metadata.time_signature = (int(parts[2]), int(parts[3]))
+            elif line.startswith("SAMPLERATE ") and metadata.sample_rate is None:
+                metadata.sample_rate = int(line.split()[1])
+            elif line.startswith("MARKER "):
+                # MARKER <index> <position> <name> <flags> ...; a region is a
+                # pair of lines with the same index and flag bit 1 set
+                tokens = split_tokens(line)
+                index, pos, name, flags = tokens[1], float(tokens[2]), tokens[3], int(tokens[4])
+                if not flags & 1:
+                    metadata.markers.append((name, pos))
+                elif index in open_regions:
+                    region_name, start = open_regions.pop(index)
+                    metadata.regions.append((region_name, start, pos))
+                else:
+                    open_regions[index] = (name, pos)
+        except (IndexError, ValueError):
+            # Malformed values are ignored; metadata is best effort
+            continue
+
+    metadata.markers.sort(key=lambda marker: marker[1])
+    metadata.regions.sort(key=lambda region: region[1])
+    return metadata
+
+
+def parse_metadata(text: str) -> ProjectMetadata:
+    """Return the metadata of a project from its RPP text."""
+    return scan_metadata(text, ProjectMetadata())
@@ -0,0 +1,182 @@
+"""Waveform peaks and sparkline thumbnails of rendered previews.
+
+Peaks are min/max pairs over fixed-size bins, computed from the
+memory-mapped PCM data with vectorized reductions. They are written in the
+formats of BBC's audiowaveform tool, so existing players such as peaks.js
+can load them: the binary ``.dat`` format (version 1) or its JSON
+equivalent. Sparklines are small PNG images drawn from the same peaks.
+"""
+
+import json
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from reaper_preview.wavfile import _numpy, map_samples, read_wav_info
+
+DEFAULT_BINS_PER_SECOND = 50
+PEAK_FORMATS = ("dat", "json")
+
+SPARKLINE_WIDTH = 400
+SPARKLINE_HEIGHT = 48
+SPARKLINE_COLOR = (70, 130, 180, 255)
+
+_DAT_VERSION = 1
+_DAT_FLAG_8BIT = 0x1
+
+
+@dataclass
+class Peaks:
+    """Min/max pairs of a preview, one per bin, as int8 NumPy arrays."""
+
+    sample_rate: int
+    samples_per_bin: int
+    mins: "numpy.ndarray"
+    maxs: "numpy.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.mins)
+
+
+def peaks_path_for(preview: Path, peak_format: str) -> Path:
+    return preview.with_name(f"{preview.stem}.peaks.{peak_format}")
+
+
+def sparkline_path_for(preview: Path) -> Path:
+    return preview.with_name(f"{preview.stem}.png")
+
+
+def is_current(path: Path, preview: Path) -> bool:
+    """True if a file derived from `preview` exists and is not older than it."""
+    try:
+        return path.stat().st_mtime >= preview.stat().st_mtime
+    except OSError:
+        return False
+
+
+def compute_peaks(wav_path: Path, bins_per_second: int = DEFAULT_BINS_PER_SECOND) -> Peaks:
+    """Compute min/max peaks over all channels of a WAV file.
+
+    Raises:
+        WavError: If the file is not a readable WAV file
+    """
+    np = _numpy()
+    info = read_wav_info(wav_path)
+    raw, offset, scale = map_samples(wav_path, info)
+    samples_per_bin = max(1, info.sample_rate // bins_per_second)
+
+    frames, channels = raw.shape
+    full = frames // samples_per_bin
+    # Whole bins in one reduction each; the partial last bin separately
+    head = raw[: full * samples_per_bin].reshape(full, samples_per_bin * channels)
+    mins, maxs = head.min(axis=1), head.max(axis=1)
+    if full * samples_per_bin < frames:
+        tail = raw[full * samples_per_bin:]
+        mins = np.append(mins, tail.min())
+        maxs = np.append(maxs, tail.max())
+
+    def quantize(values):
+        scaled = (values.astype(np.float64) - offset) * (scale * 128.0)
+        return np.clip(np.rint(scaled), -128, 127).astype(np.int8)
+
+    return Peaks(
+        sample_rate=info.sample_rate,
+        samples_per_bin=samples_per_bin,
+        mins=quantize(mins),
+        maxs=quantize(maxs),
+    )
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def write_peaks(path: Path, peaks: Peaks) -> Path:
+    """Write peaks as audiowaveform data; the format follows the suffix (.dat or .json)."""
+    np = _numpy()
+    if path.suffix == ".json":
+        data = {
+            "version": 2,
+            "channels": 1,
+            "sample_rate": peaks.sample_rate,
+            "samples_per_pixel": peaks.samples_per_bin,
+            "bits": 8,
+            "length": len(peaks),
+            "data": np.column_stack([peaks.mins, peaks.maxs]).reshape(-1).tolist(),
+        }
+        _write_atomic(path, json.dumps(data, separators=(",", ":")).encode())
+    else:
+        header = struct.pack("<iIiiI", _DAT_VERSION, _DAT_FLAG_8BIT, peaks.sample_rate,
+                             peaks.samples_per_bin, len(peaks))
+        body = np.column_stack([peaks.mins, peaks.maxs]).astype(np.int8).tobytes()
+        _write_atomic(path, header + body)
+    return path
+
+
+def read_peaks(path: Path) -> Peaks:
+    """Read peaks written by write_peaks (or audiowaveform, 8-bit only)."""
+    np = _numpy()
+    if path.suffix == ".json":
+        data = json.loads(path.read_text())
+        pairs = np.array(data["data"], dtype=np.int8).reshape(-1, 2)
+        return Peaks(data["sample_rate"], data["samples_per_pixel"], pairs[:, 0], pairs[:, 1])
+    raw = path.read_bytes()
+    version, flags, sample_rate, samples_per_bin, length = struct.unpack("<iIiiI", raw[:20])
+    if version != _DAT_VERSION or not flags & _DAT_FLAG_8BIT:
+        raise ValueError(f"Unsupported peak file: version {version}, flags {flags:#x}")
+    pairs = np.frombuffer(raw, dtype=np.int8, count=length * 2, offset=20).reshape(-1, 2)
+    return Peaks(sample_rate, samples_per_bin, pairs[:, 0], pairs[:, 1])
+
+
+def _png(pixels) -> bytes:
+    """Encode an RGBA uint8 array of shape (height, width, 4) as PNG."""
+    np = _numpy()
+    height, width, _ = pixels.shape
+    # Each scanline starts with filter type 0 (none)
+    rows = np.concatenate([np.zeros((height, 1), dtype=np.uint8), pixels.reshape(height, -1)], axis=1)
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows.tobytes(), 9))
+        + chunk(b"IEND", b"")
+    )
+
+
+def write_sparkline(
+    path: Path,
+    peaks: Peaks,
+    width: int = SPARKLINE_WIDTH,
+    height: int = SPARKLINE_HEIGHT,
+    color: tuple[int, int, int, int] = SPARKLINE_COLOR,
+) -> Path:
+    """Draw peaks as a PNG waveform on a transparent background."""
+    np = _numpy()
+    if len(peaks):
+        # Merge bins into columns: min of mins and max of maxs
+        width = min(width, len(peaks))
+        edges = (np.arange(width) * len(peaks)) // width
+        lows = np.minimum.reduceat(peaks.mins, edges).astype(np.float64)
+        highs = np.maximum.reduceat(peaks.maxs, edges).astype(np.float64)
+    else:
+        width = 1
+        lows = highs = np.zeros(1)
+
+    # Row 0 is the top (+128); draw each column from its max down to its min
+    half = (height - 1) / 2.0
+    top = np.floor(half - highs / 128.0 * half)
+    bottom = np.ceil(half - lows / 128.0 * half)
+    rows = np.arange(height)[:, None]
+    mask = (rows >= top[None, :]) & (rows <= bottom[None, :])
+
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    pixels[mask] = color
+    _write_atomic(path, _png(pixels))
+    return path
@@ -0,0 +1,193 @@
+"""Check project plugins against the plugins installed for Reaper.
+
+Reaper keeps its plugin scan results in cache files in its resource
+directory (reaper-vstplugins64.ini, reaper-auplugins64.ini,
+reaper-clap-*.ini). The inventory is read from those once, optionally
+cached as JSON, and held as sets so each project check is a handful of
+set lookups.
+"""
+
+import configparser
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from reaper_preview.metadata import PluginRef
+
+_VST_CACHE_GLOBS = ("reaper-vstplugins*.ini",)
+_AU_CACHE_GLOBS = ("reaper-auplugins*.ini",)
+_CLAP_CACHE_GLOBS = ("reaper-clap-*.ini",)
+_JS_DIR = "Effects"
+
+_CACHE_VERSION = 1
+
+
+def default_resource_dir() -> Path | None:
+    """Return Reaper's default resource directory for this platform, if present."""
+    if sys.platform == "darwin":
+        path = Path.home() / "Library" / "Application Support" / "REAPER"
+    elif sys.platform == "win32":
+        appdata = os.environ.get("APPDATA")
+        if not appdata:
+            return None
+        path = Path(appdata) / "REAPER"
+    else:
+        path = Path.home() / ".config" / "REAPER"
+    return path if path.is_dir() else None
+
+
+def normalize_name(name: str) -> str:
+    """Plugin name or file as compared against Reaper's lists: trimmed and lower-cased."""
+    return name.strip().lower()
+
+
+def _display_name(name: str) -> str:
+    """Strip the "VSTi: " style prefix from a plugin name as saved in an RPP."""
+    prefix, sep, rest = name.partition(": ")
+    return normalize_name(rest if sep and " " not in prefix else name)
+
+
+def read_ini(path: Path) -> configparser.RawConfigParser:
+    """Read one of Reaper's .ini files leniently, keeping key case; unparsable files read as empty."""
+    parser = configparser.RawConfigParser(strict=False, delimiters=("=",), interpolation=None)
+    parser.optionxform = str
+    try:
+        parser.read_string(path.read_text(errors="replace"), source=str(path))
+    except configparser.Error:
+        pass
+    return parser
+
+
+@dataclass
+class PluginInventory:
+    """Installed plugins, keyed the way RPP files refer to them."""
+
+    vst_files: set[str] = field(default_factory=set)
+    vst_names: set[str] = field(default_factory=set)
+    au_names: set[str] = field(default_factory=set)
+    clap_ids: set[str] = field(default_factory=set)
+    js_effects: set[str] = field(default_factory=set)
+
+    def has(self, plugin: PluginRef) -> bool:
+        """Whether a plugin referenced by a project is installed.
+
+        Plugin kinds without a cache file (DX, LV2) are assumed present.
+        """
+        if plugin.kind == "VST":
+            ident = normalize_name(Path(plugin.ident.replace("\\", "/")).name)
+            return ident in self.vst_files or _display_name(plugin.name) in self.vst_names
+        if plugin.kind == "AU":
+            return normalize_name(plugin.ident) in self.au_names or _display_name(plugin.name) in self.au_names
+        if plugin.kind == "CLAP":
+            return normalize_name(plugin.ident) in self.clap_ids
+        if plugin.kind == "JS":
+            name = normalize_name(plugin.name.replace("\\", "/"))
+            return name in self.js_effects or f"{name}.jsfx" in self.js_effects
+        return True
+
+    def to_dict(self) -> dict:
+        return {key: sorted(value) for key, value in vars(self).items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PluginInventory":
+        return cls(**{key: set(value) for key, value in data.items()})
+
+
+def _source_files(resource_dir: Path) -> list[Path]:
+    files = []
+    for pattern in _VST_CACHE_GLOBS + _AU_CACHE_GLOBS + _CLAP_CACHE_GLOBS:
+        files.extend(sorted(resource_dir.glob(pattern)))
+    return files
+
+
+def _signature(resource_dir: Path) -> dict[str, float]:
+    sig = {}
+    for path in _source_files(resource_dir) + [resource_dir / _JS_DIR]:
+        try:
+            sig[path.name] = path.stat().st_mtime
+        except OSError:
+            pass
+    return sig
+
+
+def scan_inventory(resource_dir: Path) -> PluginInventory:
+    """Build the plugin inventory from Reaper's plugin cache files."""
+    inventory = PluginInventory()
+
+    for pattern in _VST_CACHE_GLOBS:
+        for path in resource_dir.glob(pattern):
+            parser = read_ini(path)
+            for section in parser.sections():
+                for key, value in parser.items(section):
+                    inventory.vst_files.add(normalize_name(key))
+                    # value: <id>,<uid>,<Name (Vendor)>[!!!VSTi]
+                    parts = value.split(",", 2)
+                    if len(parts) == 3 and parts[2]:
+                        inventory.vst_names.add(normalize_name(parts[2].split("!!!", 1)[0]))
+
+    for pattern in _AU_CACHE_GLOBS:
+        for path in resource_dir.glob(pattern):
+            parser = read_ini(path)
+            for section in parser.sections():
+                for key, _ in parser.items(section):
+                    inventory.au_names.add(normalize_name(key))
+
+    for pattern in _CLAP_CACHE_GLOBS:
+        for path in resource_dir.glob(pattern):
+            parser = read_ini(path)
+            for section in parser.sections():
+                for key, _ in parser.items(section):
+                    if key != "_":
+                        inventory.clap_ids.add(normalize_name(key))
+
+    js_root = resource_dir / _JS_DIR
+    if js_root.is_dir():
+        for dirpath, _, filenames in os.walk(js_root):
+            rel_dir = os.path.relpath(dirpath, js_root).replace("\\", "/")
+            for filename in filenames:
+                rel = filename if rel_dir == "." else f"{rel_dir}/{filename}"
+                inventory.js_effects.add(normalize_name(rel))
+
+    return inventory
+
+
+def load_inventory(resource_dir: Path, cache_path: Path | None = None) -> PluginInventory:
+    """Return the plugin inventory, reusing a JSON cache while it is current.
+
+    The cache is invalidated when any plugin cache file, or the top-level
+    Effects directory, changes mtime.
+    """
+    signature = _signature(resource_dir)
+    if cache_path is not None:
+        try:
+            cached = json.loads(cache_path.read_text())
+            if cached.get("version") == _CACHE_VERSION and cached.get("signature") == signature:
+                return PluginInventory.from_dict(cached["inventory"])
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass
+
+    inventory = scan_inventory(resource_dir)
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({
+            "version": _CACHE_VERSION,
+            "signature": signature,
+            "inventory": inventory.to_dict(),
+        }))
+    return inventory
+
+
+def find_missing(plugins: list[PluginRef], inventory: PluginInventory) -> list[PluginRef]:
+    """Return the plugins that are not installed, without duplicates."""
+    missing = []
+    seen = set()
+    for plugin in plugins:
+        key = (plugin.kind, plugin.name, plugin.ident)
+        if key in seen:
+            continue
+        seen.add(key)
+        if not inventory.has(plugin):
+            missing.append(plugin)
+    return missing
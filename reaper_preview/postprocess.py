@@ -0,0 +1,143 @@
+"""Post-render processing of previews in a worker process pool.
+
+Work that only needs the rendered audio (loudness normalization,
+encoding into further formats, waveform peaks and the like) is handed to a process pool
+as soon as Reaper finishes, so the next render can start immediately.
+Jobs are plain dataclasses so they can be pickled to the workers; encoder
+backends are referred to by their registered name.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+
+from reaper_preview.encode import get_encoder
+from reaper_preview.loudness import normalize_wav
+from reaper_preview.peaks import DEFAULT_BINS_PER_SECOND, compute_peaks, write_peaks, write_sparkline
+from reaper_preview.render_cfg import Mp3Settings
+from reaper_preview.report import FAILED, ProjectResult
+
+
+@dataclass
+class PostProcessJob:
+    """Post-processing steps for one rendered preview."""
+
+    wav_path: Path
+    target_lufs: float | None = None
+    true_peak_db: float = -1.0
+    encoder: str = "auto"
+    # Program the encoder runs, resolved by the parent; workers may not share its PATH
+    encoder_executable: str | None = None
+    # MP3 settings of the quality preset; None keeps the encoder's defaults
+    mp3: Mp3Settings | None = None
+    # (format, destination) pairs to encode from the WAV
+    encodes: list[tuple[str, Path]] = field(default_factory=list)
+    # Waveform peaks and PNG sparkline to draw from the final WAV
+    peaks_path: Path | None = None
+    sparkline_path: Path | None = None
+    bins_per_second: int = DEFAULT_BINS_PER_SECOND
+    # Remove the WAV once done (it was only rendered as a master)
+    delete_wav: bool = False
+
+
+def run_job(job: PostProcessJob) -> dict:
+    """Run a job in a worker process. Returns report fields to merge into the result."""
+    outcome = {}
+    try:
+        if job.target_lufs is not None:
+            outcome["loudness"] = normalize_wav(job.wav_path, job.target_lufs, job.true_peak_db).to_dict()
+        if job.encodes:
+            encoder = get_encoder(
+                job.encoder, [fmt for fmt, _ in job.encodes], mp3=job.mp3, executable=job.encoder_executable
+            )
+            for fmt, dest in job.encodes:
+                encoder.encode(job.wav_path, dest, fmt)
+        # Last, so the peak files are never older than the previews they describe
+        if job.peaks_path is not None or job.sparkline_path is not None:
+            peaks = compute_peaks(job.wav_path, job.bins_per_second)
+            if job.peaks_path is not None:
+                outcome["peaks"] = str(write_peaks(job.peaks_path, peaks))
+            if job.sparkline_path is not None:
+                outcome["sparkline"] = str(write_sparkline(job.sparkline_path, peaks))
+    finally:
+        if job.delete_wav:
+            job.wav_path.unlink(missing_ok=True)
+    return outcome
+
+
+def _run_timed(job: PostProcessJob) -> tuple[int, int, int, dict]:
+    """run_job, also returning the worker's pid and when the job started and ended."""
+    started = time.monotonic_ns()
+    outcome = run_job(job)
+    return os.getpid(), started, time.monotonic_ns(), outcome
+
+
+def _start_context():
+    """Start method for workers that is safe with threads running.
+
+    Workers start on the first submit, from a render thread while other
+    threads may hold locks; a plain fork would copy those locks held.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class PostProcessPool:
+    """Run post-processing jobs in worker processes and fold their outcomes into results.
+
+    With a `tracer` (see reaper_preview.trace), each job is recorded as a
+    span on a lane of its worker process.
+    """
+
+    def __init__(self, max_workers: int | None = None, tracer=None):
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=_start_context())
+        self._pending: list[tuple[Future, ProjectResult]] = []
+        self._tracer = tracer
+
+    def submit(self, job: PostProcessJob, result: ProjectResult) -> None:
+        if self._tracer is None:
+            future = self._executor.submit(run_job, job)
+        else:
+            future = self._executor.submit(_run_timed, job)
+            future.add_done_callback(partial(self._trace, result.name))
+        self._pending.append((future, result))
+
+    def _trace(self, name: str, future: Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        pid, started, ended, _ = future.result()
+        self._tracer.complete("post-process", started, ended, lane=f"post-process {pid}", args={"project": name})
+
+    def finish(self) -> list[ProjectResult]:
+        """Wait for all jobs and update their results.
+
+        A failed job marks its project as failed. Returns the results whose
+        job failed.
+        """
+        failed = []
+        try:
+            for future, result in self._pending:
+                try:
+                    outcome = future.result()
+                    if self._tracer is not None:
+                        outcome = outcome[3]
+                except Exception as e:
+                    result.status = FAILED
+                    result.error = f"Post-processing failed: {e}"
+                    failed.append(result)
+                    continue
+                for key, value in outcome.items():
+                    setattr(result, key, value)
+                if result.output_path is not None:
+                    try:
+                        result.output_mtime = result.output_path.stat().st_mtime
+                    except OSError:
+                        pass
+        finally:
+            self._pending.clear()
+            self._executor.shutdown()
+        return failed
@@ -0,0 +1,127 @@
+"""CPU and I/O priority, and CPU affinity of renders.
+
+Batches run on workstations people are using, so by default the whole
+process is lowered to nice 10 and the lowest best-effort I/O priority at
+startup. Reaper instances and post-processing workers inherit both from
+the process that starts them. I/O priority is set with the Linux
+``ioprio_set`` system call through ctypes, as the standard library has
+no wrapper for it.
+
+With several renders at once, each Reaper instance is pinned to its own
+set of cores (``os.sched_setaffinity``) so the scheduler does not move
+its threads between the cores of other instances. The available cores
+are split into one disjoint, contiguous set per worker.
+
+Everything here is best effort: where a setting is not supported or not
+permitted it is skipped, and the functions report whether it was applied.
+"""
+
+import ctypes
+import os
+import platform
+import threading
+
+# I/O scheduling classes of ioprio_set
+IOPRIO_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+_IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_WHO_PROCESS = 1
+# ioprio_set system call numbers by machine
+_IOPRIO_SET = {
+    "x86_64": 251, "amd64": 251, "i386": 289, "i686": 289,
+    "aarch64": 30, "arm64": 30, "riscv64": 30, "armv7l": 314, "ppc64le": 273, "s390x": 282,
+}
+
+DEFAULT_NICE = 10
+DEFAULT_IONICE = ("best-effort", 7)
+
+
+def set_nice(nice: int, pid: int = 0) -> bool:
+    """Raise the nice value of a process (0: this one) to `nice`.
+
+    A process that already runs at a higher nice value is left alone, as
+    lowering it needs privileges.
+    """
+    try:
+        if os.getpriority(os.PRIO_PROCESS, pid) < nice:
+            os.setpriority(os.PRIO_PROCESS, pid, nice)
+    except (AttributeError, OSError):
+        return False
+    return True
+
+
+def set_io_priority(io_class: str, level: int = 0, pid: int = 0) -> bool:
+    """Set the I/O scheduling class and level (0-7) of a process, on Linux."""
+    number = _IOPRIO_SET.get(platform.machine().lower())
+    if number is None or platform.system() != "Linux":
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        value = (IOPRIO_CLASSES[io_class] << _IOPRIO_CLASS_SHIFT) | level
+        return libc.syscall(number, _IOPRIO_WHO_PROCESS, pid, value) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def available_cpus() -> list[int] | None:
+    """Cores this process may run on, or None where affinity is not supported."""
+    if not hasattr(os, "sched_getaffinity"):
+        return None
+    return sorted(os.sched_getaffinity(0))
+
+
+def set_affinity(cpus: set[int], pid: int = 0) -> bool:
+    """Restrict a process to a set of cores, where supported.
+
+    Affinity is per thread on Linux, so threads the process has already
+    started are pinned as well; later ones inherit it.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        threads = [int(tid) for tid in os.listdir(f"/proc/{pid}/task")] if pid else [0]
+    except OSError:
+        threads = [pid]
+    for tid in threads:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except ProcessLookupError:
+            # The thread has exited meanwhile
+            continue
+        except OSError:
+            return False
+    return True
+
+
+def partition_cpus(cpus: list[int], workers: int) -> list[set[int]]:
+    """Split cores into `workers` disjoint sets of (nearly) equal size.
+
+    With fewer cores than workers, each core goes to several workers.
+    """
+    if len(cpus) < workers:
+        return [{cpus[index % len(cpus)]} for index in range(workers)]
+    size, extra = divmod(len(cpus), workers)
+    sets, start = [], 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        sets.append(set(cpus[start:end]))
+        start = end
+    return sets
+
+
+class CoreSets:
+    """Core sets handed to renders as they start and returned when they end."""
+
+    def __init__(self, sets: list[set[int]]):
+        self._free = list(sets)
+        self._condition = threading.Condition()
+
+    def acquire(self) -> set[int]:
+        with self._condition:
+            while not self._free:
+                self._condition.wait()
+            return self._free.pop(0)
+
+    def release(self, cores: set[int]) -> None:
+        with self._condition:
+            self._free.append(cores)
+            self._condition.notify()
@@ -0,0 +1,139 @@
+"""Managed Reaper configuration for preview renders.
+
+By default every render launches Reaper with the user's own configuration:
+it may rescan plugins, open the live audio device, keep undo history and
+auto-save. The render profile is a separate resource directory, generated
+once in the state directory and passed to Reaper with ``-cfgfile``. Its
+reaper.ini is the user's, with the overrides below applied, so plugin
+paths and preferences still match; the plugin caches are copied and the
+Effects and UserPlugins folders linked, so no plugin scan is needed.
+
+The override keys are the ones Reaper writes for the corresponding
+preferences. Reaper ignores keys it does not know, so the profile is safe
+across versions.
+"""
+
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+PROFILE_DIR = "reaper-profile"
+INI_FILE = "reaper.ini"
+_STAMP_FILE = "profile.json"
+# Bump when PROFILE_OVERRIDES change, so existing profiles are regenerated
+PROFILE_VERSION = 1
+
+PROFILE_OVERRIDES = {
+    "REAPER": {
+        # Do not rescan plugin folders on startup; the copied caches are used
+        "vstscanonstartup": "0",
+        # Keep the audio device closed while not playing; offline renders
+        # never need it
+        "audioclosestop": "1",
+        "audiocloseinactive": "1",
+        # No auto-save and no undo history
+        "autosavemode": "0",
+        "autosaveint": "0",
+        "undomaxmem": "0",
+        "saveundostatesproj": "0",
+        # Close the render window when done and never load other projects
+        "renderclosewhendone": "1",
+        "loadlastproj": "0",
+        "splashscreen": "0",
+    },
+}
+
+_COPIED_GLOBS = ("reaper-vstplugins*.ini", "reaper-auplugins*.ini", "reaper-clap-*.ini")
+_LINKED_DIRS = ("Effects", "UserPlugins")
+
+
+def apply_overrides(text: str, overrides: dict[str, dict[str, str]]) -> str:
+    """Set keys in ini text, keeping everything else as it is.
+
+    Keys are replaced where they occur and appended to their section
+    otherwise; missing sections are added at the end.
+    """
+    lines = text.splitlines()
+    section = None
+    seen: dict[str, set[str]] = {name: set() for name in overrides}
+    section_end: dict[str, int] = {}
+    for i, line in enumerate(lines):
+        header = re.match(r"\s*\[(.+)\]\s*$", line)
+        if header:
+            section = header.group(1)
+            section_end.setdefault(section, i + 1)
+            continue
+        if section in overrides:
+            key = line.split("=", 1)[0].strip()
+            if "=" in line and key in overrides[section]:
+                lines[i] = f"{key}={overrides[section][key]}"
+                seen[section].add(key)
+            section_end[section] = i + 1
+
+    # Insert missing keys from the bottom up so earlier indexes stay valid
+    for name in sorted(overrides, key=lambda n: section_end.get(n, len(lines) + 1), reverse=True):
+        missing = [f"{key}={value}" for key, value in overrides[name].items() if key not in seen[name]]
+        if name in section_end:
+            lines[section_end[name]:section_end[name]] = missing
+        else:
+            lines.extend([f"[{name}]", *missing])
+    return "\n".join(lines) + "\n"
+
+
+def _sources(resource_dir: Path | None) -> list[Path]:
+    if resource_dir is None:
+        return []
+    files = [resource_dir / INI_FILE]
+    for pattern in _COPIED_GLOBS:
+        files.extend(sorted(resource_dir.glob(pattern)))
+    return [path for path in files if path.is_file()]
+
+
+def _stamp(resource_dir: Path | None) -> dict:
+    return {
+        "version": PROFILE_VERSION,
+        "resource_dir": str(resource_dir) if resource_dir else None,
+        "sources": {path.name: path.stat().st_mtime for path in _sources(resource_dir)},
+    }
+
+
+def ensure_profile(state_dir: Path, resource_dir: Path | None) -> Path:
+    """Create or refresh the render profile and return its reaper.ini.
+
+    The profile is rebuilt only when the user's reaper.ini or plugin caches
+    changed since it was generated.
+    """
+    profile = state_dir / PROFILE_DIR
+    ini_path = profile / INI_FILE
+    stamp_path = profile / _STAMP_FILE
+    stamp = _stamp(resource_dir)
+    try:
+        if ini_path.exists() and json.loads(stamp_path.read_text()) == stamp:
+            return ini_path
+    except (FileNotFoundError, ValueError):
+        pass
+
+    profile.mkdir(parents=True, exist_ok=True)
+    base = ""
+    for source in _sources(resource_dir):
+        if source.name == INI_FILE:
+            base = source.read_text(errors="replace")
+        else:
+            shutil.copy2(source, profile / source.name)
+    ini_path.write_text(apply_overrides(base, PROFILE_OVERRIDES))
+
+    if resource_dir is not None:
+        for name in _LINKED_DIRS:
+            target, link = resource_dir / name, profile / name
+            if target.is_dir() and not os.path.lexists(link):
+                try:
+                    link.symlink_to(target, target_is_directory=True)
+                except OSError:
+                    # Symlinks may need extra privileges on Windows; JS
+                    # effects and extensions are then unavailable in renders
+                    pass
+
+    stamp_path.write_text(json.dumps(stamp))
+    return ini_path
@@ -0,0 +1,142 @@
+"""Failure history of projects, and quarantine of those that keep failing.
+
+Some projects fail on every run, often only after the full render timeout.
+Failures are counted per project in a small JSON file in the state
+directory, keyed by a hash of the RPP file's content. A project that
+failed a number of times in a row without being changed is quarantined:
+later runs skip it instead of starting Reaper. Saving the project changes
+its hash, which releases it; a successful render clears its history.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+HISTORY_FILE = "failure-history.json"
+_HISTORY_VERSION = 1
+# Consecutive failures of an unchanged project before it is quarantined
+QUARANTINE_AFTER = 3
+
+
+def rpp_file_hash(rpp_path: Path) -> str:
+    """Hash of the content of an RPP file, read in chunks.
+
+    Not the same as reaper_preview.metadata.rpp_hash, which hashes the
+    decoded text of a project that was already read.
+    """
+    digest = hashlib.sha1()
+    with open(rpp_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class FailureRecord:
+    """Consecutive failures of one version of a project."""
+
+    path: str
+    failures: int = 0
+    last_error: str = ""
+    last_failure: float = 0.0
+    # Time the project was quarantined, or None while it is still tried
+    quarantined_at: float | None = None
+
+
+def _resolved(path: Path | str) -> str:
+    return str(Path(path).resolve())
+
+
+class FailureHistory:
+    """Failure records by RPP hash, safe to use from several threads.
+
+    Records of a project's earlier versions are dropped when it fails or
+    succeeds under a new hash, so the file only grows with broken projects.
+    Projects are recorded by absolute path, whatever --input-dir they were
+    found under.
+    """
+
+    def __init__(self, path: Path, quarantine_after: int = QUARANTINE_AFTER):
+        self.path = path
+        self.quarantine_after = quarantine_after
+        self._lock = threading.Lock()
+        self._records: dict[str, FailureRecord] = {}
+        try:
+            data = json.loads(path.read_text())
+            if data.get("version") == _HISTORY_VERSION:
+                self._records = {key: FailureRecord(**record) for key, record in data["projects"].items()}
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass
+
+    def quarantined(self, key: str) -> FailureRecord | None:
+        """The record of a quarantined project version, or None."""
+        with self._lock:
+            record = self._records.get(key)
+        return record if record is not None and record.quarantined_at is not None else None
+
+    def _forget_path(self, path: str) -> None:
+        for key in [key for key, record in self._records.items() if record.path == path]:
+            del self._records[key]
+
+    def record_failure(self, key: str, rpp_path: Path, error: str) -> FailureRecord:
+        """Count a failure; returns the record, quarantined once the limit is reached."""
+        path = _resolved(rpp_path)
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                self._forget_path(path)
+                record = self._records[key] = FailureRecord(path)
+            record.failures += 1
+            record.last_error = error
+            record.last_failure = time.time()
+            if self.quarantine_after and record.failures >= self.quarantine_after and record.quarantined_at is None:
+                record.quarantined_at = record.last_failure
+            return record
+
+    def record_success(self, rpp_path: Path) -> None:
+        path = _resolved(rpp_path)
+        with self._lock:
+            self._forget_path(path)
+
+    def quarantined_projects(self) -> list[tuple[str, FailureRecord]]:
+        """Quarantined project versions, by path."""
+        with self._lock:
+            return sorted(
+                ((key, record) for key, record in self._records.items() if record.quarantined_at is not None),
+                key=lambda item: item[1].path,
+            )
+
+    def clear(self, names: list[str] | None = None) -> list[str]:
+        """Release quarantined projects and reset their failure counts.
+
+        `names` are project names (RPP file stems) or RPP paths; all
+        quarantined projects are released without them. Returns the paths
+        of the released projects.
+        """
+        paths = {_resolved(name) for name in names or []}
+        released = []
+        with self._lock:
+            for key, record in list(self._records.items()):
+                if record.quarantined_at is None:
+                    continue
+                # Paths are resolved on both sides for records of older versions
+                if names and Path(record.path).stem not in names and _resolved(record.path) not in paths:
+                    continue
+                del self._records[key]
+                released.append(record.path)
+        return released
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                "version": _HISTORY_VERSION,
+                "projects": {key: asdict(record) for key, record in self._records.items()},
+            }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=1))
+        os.replace(tmp, self.path)
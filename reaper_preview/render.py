@@ -1,8 +1,39 @@
-"""Invoke Reaper command-line renders."""
+"""Invoke Reaper command-line renders.
 
+Each render runs in its own session (process group), so everything it
+starts can be found and stopped afterwards: plugin bridge hosts such as
+reaper_host64 and crash reporters otherwise outlive a timed-out or even a
+finished render. Children that start a session of their own are still
+found through an environment marker inherited from the render. Leftovers
+get SIGTERM, then SIGKILL if they do not exit within a grace period.
+
+A render only succeeds if its output files pass the structural checks of
+reaper_preview.verify; files that do not are deleted, so a truncated file
+is never mistaken for a finished preview.
+"""
+
+import os
+import signal
 import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
 from pathlib import Path
 
+from reaper_preview.logs import read_tail
+from reaper_preview.priority import set_affinity
+from reaper_preview.verify import OutputError, verify_output
+
+# Environment variable marking every process started by one render
+RENDER_MARKER_ENV = "REAPER_PREVIEW_RENDER"
+# Seconds a render may take unless the caller says otherwise
+DEFAULT_TIMEOUT = 300
+# Seconds between SIGTERM and SIGKILL
+TERMINATE_GRACE_SECONDS = 5.0
+_POLL_SECONDS = 0.05
+
 
 class RenderError(Exception):
     """Base exception for rendering errors."""
@@ -12,17 +43,222 @@ class RenderTimeoutError(RenderError):
     """Raised when rendering times out."""
 
 
+@dataclass
+class RenderStats:
+    """Resources used by one Reaper launch."""
+
+    # Peak resident set size and user + system CPU time of Reaper itself
+    max_rss_kb: int | None = None
+    cpu_seconds: float | None = None
+    # Processes still running after Reaper exited (or was stopped), killed
+    leftover_processes: int = 0
+    # time.monotonic_ns when Reaper was started and when it had exited
+    spawned_ns: int | None = None
+    exited_ns: int | None = None
+
+
+def _spawn_kwargs() -> dict:
+    if os.name == "posix":
+        return {"start_new_session": True}
+    return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+
+
+def _wait(proc: subprocess.Popen, timeout: float | None):
+    """Wait for Reaper to exit and return its resource usage (None without os.wait4).
+
+    Raises:
+        subprocess.TimeoutExpired: If it is still running after `timeout` seconds
+    """
+    if not hasattr(os, "wait4"):
+        proc.wait(timeout)
+        return None
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        pid, status, usage = os.wait4(proc.pid, 0 if deadline is None else os.WNOHANG)
+        if pid:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            return usage
+        if time.monotonic() >= deadline:
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+        time.sleep(_POLL_SECONDS)
+
+
+def _render_pids(pgid: int, marker: str) -> set[int] | None:
+    """Live processes in the render's group or carrying its marker; None without /proc."""
+    proc_root = Path("/proc")
+    if not proc_root.is_dir():
+        return None
+    needle = f"{RENDER_MARKER_ENV}={marker}".encode()
+    found = set()
+    for entry in os.scandir(proc_root):
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = Path(entry.path, "stat").read_bytes()
+            # Fields after the command name: state, ppid, pgrp, ...
+            state, _, pgrp = stat[stat.rindex(b")") + 2:].split()[:3]
+            if state == b"Z":
+                continue
+            if int(pgrp) == pgid or needle in Path(entry.path, "environ").read_bytes().split(b"\0"):
+                found.add(int(entry.name))
+        except (OSError, ValueError):
+            continue
+    found.discard(os.getpid())
+    return found
+
+
+def _signal(pgid: int, pids: set[int], sig: int) -> None:
+    for send, target in [(os.killpg, pgid)] + [(os.kill, pid) for pid in pids]:
+        try:
+            send(target, sig)
+        except OSError:
+            pass
+
+
+def _stop_render_processes(pgid: int, marker: str, grace: float = TERMINATE_GRACE_SECONDS) -> set[int]:
+    """SIGTERM what is left of a render, then SIGKILL it after `grace` seconds.
+
+    Returns the processes that were found running.
+    """
+    def running() -> set[int]:
+        pids = _render_pids(pgid, marker)
+        if pids is not None:
+            return pids
+        # No /proc: all that can be seen is whether the group still exists
+        try:
+            os.killpg(pgid, 0)
+            return {pgid}
+        except OSError:
+            return set()
+
+    found = pids = running()
+    if not pids:
+        return found
+    _signal(pgid, pids, signal.SIGTERM)
+    deadline = time.monotonic() + grace
+    while pids and time.monotonic() < deadline:
+        time.sleep(_POLL_SECONDS)
+        pids = running()
+    if pids:
+        _signal(pgid, pids, signal.SIGKILL)
+    return found
+
+
+def _run_reaper(
+    rpp_path: Path,
+    reaper_bin: str,
+    timeout: int,
+    cfgfile: Path | None = None,
+    stats: RenderStats | None = None,
+    log_path: Path | None = None,
+    cpus: set[int] | None = None,
+) -> None:
+    """Run `reaper -renderproject` and wait for it to exit successfully.
+
+    With a `cfgfile`, Reaper runs as a new instance with that configuration.
+    With `cpus`, it is pinned to those cores (and so are the processes it
+    starts).
+    Processes the render leaves behind are stopped, and its resource usage
+    is recorded in `stats`.
+
+    Reaper's stdout and stderr are written by the child directly to
+    `log_path` (appended to), or to a temporary file; only the end of the
+    output is read back, for the error message.
+    """
+    cmd = [reaper_bin]
+    if cfgfile is not None:
+        cmd += ["-newinst", "-cfgfile", str(cfgfile)]
+    cmd += [
+        "-nosplash",
+        "-noactivate",
+        "-renderproject",
+        str(rpp_path),
+    ]
+
+    marker = uuid.uuid4().hex
+    env = dict(os.environ, **{RENDER_MARKER_ENV: marker})
+    if log_path is not None:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "a+b") if log_path is not None else tempfile.TemporaryFile() as log_file:
+        proc = subprocess.Popen(cmd, stdout=log_file, stderr=subprocess.STDOUT, env=env, **_spawn_kwargs())
+        if cpus:
+            set_affinity(cpus, proc.pid)
+        if stats is not None:
+            stats.spawned_ns = time.monotonic_ns()
+        timed_out = False
+        try:
+            usage = _wait(proc, timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+        finally:
+            # Also runs on KeyboardInterrupt, so an interrupted batch leaves nothing behind
+            if os.name == "posix":
+                leftovers = _stop_render_processes(proc.pid, marker) - {proc.pid}
+            else:
+                leftovers = set()
+                if proc.poll() is None:
+                    proc.kill()
+        if timed_out:
+            usage = _wait(proc, None)
+
+        if stats is not None:
+            stats.exited_ns = time.monotonic_ns()
+            stats.leftover_processes = len(leftovers)
+            if usage is not None:
+                # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+                stats.max_rss_kb = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+                stats.cpu_seconds = usage.ru_utime + usage.ru_stime
+
+        if timed_out:
+            raise RenderTimeoutError(f"Rendering timed out after {timeout} seconds")
+        if proc.returncode != 0:
+            output = read_tail(log_file)
+            where = f" (log: {log_path})" if log_path is not None else ""
+            raise RenderError(f"Reaper exited with code {proc.returncode}. output: {output or '(none)'}{where}")
+
+
+def _check_output(path: Path, expected_duration: float | None) -> None:
+    """Delete and report a rendered file that is incomplete or malformed."""
+    try:
+        verify_output(path, expected_duration)
+    except OutputError as e:
+        path.unlink(missing_ok=True)
+        raise RenderError(f"Render produced an invalid file {path.name}: {e}") from e
+
+
+def _stat_or_none(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _discard_partial(outputs: list[Path], before: list[tuple[int, int] | None]) -> None:
+    """Delete the outputs a failed render wrote to, leaving untouched ones alone."""
+    for path, previous in zip(outputs, before):
+        current = _stat_or_none(path)
+        if current is not None and current != previous:
+            path.unlink(missing_ok=True)
+
+
 def render_project(
     rpp_path: Path,
     output_dir: Path,
     filename: str,
     audio_format: str,
     reaper_bin: str = "reaper",
-    timeout: int = 300,
+    timeout: float = DEFAULT_TIMEOUT,
+    cfgfile: Path | None = None,
+    stats: RenderStats | None = None,
+    log_path: Path | None = None,
+    expected_duration: float | None = None,
+    cpus: set[int] | None = None,
 ) -> Path:
     """Render a Reaper project to an audio file.
 
     Invokes `reaper -renderproject` as a subprocess and waits for completion.
+    If the render fails, whatever it wrote to the output path is deleted.
 
     Args:
         rpp_path: Path to the RPP file to render
@@ -31,39 +267,85 @@ def render_project(
         audio_format: 'mp3' or 'wav'
         reaper_bin: Path to the Reaper executable
         timeout: Maximum time to wait in seconds (default: 300)
+        cfgfile: Reaper configuration to render with (see profile.ensure_profile)
+        stats: Filled with the resources the launch used
+        log_path: File to append Reaper's output to
+        expected_duration: Length in seconds the output should have
+        cpus: Cores to pin Reaper to
 
     Returns:
         Path to the rendered audio file
 
     Raises:
         RenderTimeoutError: If rendering takes longer than timeout
-        RenderError: If rendering fails (non-zero exit) or output file is not created
+        RenderError: If rendering fails (non-zero exit) or output file is not
+            created or fails verification (see reaper_preview.verify)
     """
-    cmd = [
-        reaper_bin,
-        "-nosplash",
-        "-noactivate",
-        "-renderproject",
-        str(rpp_path),
-    ]
-
+    extension = f".{audio_format}"
+    expected_output = output_dir / f"{filename}{extension}"
+    before = [_stat_or_none(expected_output)]
     try:
-        result = subprocess.run(cmd, timeout=timeout, capture_output=True, text=True)
-    except subprocess.TimeoutExpired as e:
-        raise RenderTimeoutError(f"Rendering timed out after {timeout} seconds") from e
-
-    if result.returncode != 0:
-        raise RenderError(
-            f"Reaper exited with code {result.returncode}. "
-            f"stderr: {result.stderr.strip() if result.stderr else '(none)'}"
-        )
+        _run_reaper(rpp_path, reaper_bin, timeout, cfgfile, stats, log_path, cpus)
+    except BaseException:
+        # A timed-out, crashed or interrupted render may have written part of the file
+        _discard_partial([expected_output], before)
+        raise
 
     # Verify output file was created
-    extension = f".{audio_format}"
-    expected_output = output_dir / f"{filename}{extension}"
     if not expected_output.exists():
         raise RenderError(
             f"Render completed but output file was not created: {expected_output}"
         )
+    _check_output(expected_output, expected_duration)
 
     return expected_output
+
+
+def render_segments(
+    rpp_path: Path,
+    output_dir: Path,
+    filename: str,
+    segment_names: list[str],
+    audio_format: str,
+    reaper_bin: str = "reaper",
+    timeout: float = DEFAULT_TIMEOUT,
+    cfgfile: Path | None = None,
+    stats: RenderStats | None = None,
+    log_path: Path | None = None,
+    expected_durations: list[float] | None = None,
+    cpus: set[int] | None = None,
+) -> list[Path]:
+    """Render all segment regions of a prepared project in one Reaper launch.
+
+    The project must render its regions to "<filename>-$region" (see
+    prepare_rpp_for_preview). Returns the rendered files in segment order.
+    If the render fails, whatever it wrote to the segment files is deleted.
+
+    Raises:
+        RenderTimeoutError: If rendering takes longer than timeout
+        RenderError: If rendering fails or any segment file is not created
+            or fails verification
+    """
+    outputs = [output_dir / f"{filename}-{name}.{audio_format}" for name in segment_names]
+    before = [_stat_or_none(path) for path in outputs]
+    try:
+        _run_reaper(rpp_path, reaper_bin, timeout, cfgfile, stats, log_path, cpus)
+    except BaseException:
+        _discard_partial(outputs, before)
+        raise
+
+    missing = [path.name for path in outputs if not path.exists()]
+    if missing:
+        raise RenderError(f"Render completed but segment files were not created: {', '.join(missing)}")
+    errors = []
+    for index, path in enumerate(outputs):
+        try:
+            _check_output(path, expected_durations[index] if expected_durations else None)
+        except RenderError as e:
+            errors.append(str(e))
+    if errors:
+        # Keep a project's segments consistent: all of them or none
+        for path in outputs:
+            path.unlink(missing_ok=True)
+        raise RenderError("; ".join(errors))
+    return outputs
@@ -0,0 +1,121 @@
+"""Build RENDER_CFG blobs from structured encoder settings.
+
+A RENDER_CFG block holds a base64-encoded, little-endian binary record:
+a reversed FourCC naming the format followed by format-specific fields.
+A bare FourCC makes Reaper use its default settings for the format.
+
+Only the WAV record (``evaw``) is built: bits per sample (uint8),
+large-file mode (uint8, 0 = automatic), flags (uint8, bit 0 = write a BWF
+chunk). This matches the blob Reaper saves for 24-bit WAV with BWF,
+``ZXZhdxgAAQ==``.
+
+Reaper's MP3 record (``l3pm``) is longer and its fields have not been
+matched against Reaper saves, and a wrong record is silently misread. MP3
+settings are therefore not written into the project: with a quality
+preset, Reaper renders a WAV master and the encoder stage produces the
+MP3 from Mp3Settings (see reaper_preview.encode).
+"""
+
+import base64
+from dataclasses import dataclass, field
+
+WAV_FOURCC = b"evaw"
+MP3_FOURCC = b"l3pm"
+
+_WAV_BITS = (8, 16, 24, 32, 64)
+_MP3_BITRATES = (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+
+
+class RenderCfgError(ValueError):
+    """Raised for settings or blobs that cannot be encoded or decoded."""
+
+
+@dataclass(frozen=True)
+class WavSettings:
+    bits: int = 24
+    bwf: bool = True
+
+    def encode(self) -> bytes:
+        if self.bits not in _WAV_BITS:
+            raise RenderCfgError(f"Unsupported WAV bit depth: {self.bits}")
+        return WAV_FOURCC + bytes([self.bits, 0, 1 if self.bwf else 0])
+
+
+@dataclass(frozen=True)
+class Mp3Settings:
+    """LAME settings of MP3 previews, applied by the encoder stage."""
+
+    bitrate: int = 128
+    # None for constant bitrate, else the LAME VBR quality (0 best - 9)
+    vbr_quality: int | None = None
+    mono: bool = False
+    # LAME algorithm quality (0 best - 9)
+    quality: int = 2
+
+    def __post_init__(self):
+        if self.bitrate not in _MP3_BITRATES:
+            raise RenderCfgError(f"Unsupported MP3 bitrate: {self.bitrate} kbps")
+        if self.vbr_quality is not None and not 0 <= self.vbr_quality <= 9:
+            raise RenderCfgError(f"MP3 VBR quality must be 0-9, not {self.vbr_quality}")
+        if not 0 <= self.quality <= 9:
+            raise RenderCfgError(f"MP3 encoder quality must be 0-9, not {self.quality}")
+
+
+def build_render_cfg(settings: WavSettings) -> str:
+    """Return the base64 RENDER_CFG blob for WAV settings."""
+    return base64.b64encode(settings.encode()).decode("ascii")
+
+
+def parse_render_cfg(blob: str) -> WavSettings | Mp3Settings:
+    """Decode a RENDER_CFG blob; a bare FourCC gives the default settings.
+
+    Raises:
+        RenderCfgError: If the blob is not a WAV configuration or a bare
+            MP3 FourCC
+    """
+    try:
+        data = base64.b64decode(blob.strip(), validate=True)
+    except ValueError as e:
+        raise RenderCfgError(f"Invalid RENDER_CFG blob: {e}") from e
+    fourcc, body = data[:4], data[4:]
+    if fourcc == WAV_FOURCC:
+        if not body:
+            return WavSettings()
+        return WavSettings(bits=body[0], bwf=len(body) > 2 and bool(body[2] & 1))
+    if fourcc == MP3_FOURCC:
+        if body:
+            raise RenderCfgError("MP3 settings records are not decoded")
+        return Mp3Settings()
+    raise RenderCfgError(f"Unsupported render format {fourcc!r}")
+
+
+@dataclass(frozen=True)
+class RenderQuality:
+    """Encoder settings and output sample rate/channels for preview renders."""
+
+    # None keeps the project sample rate
+    sample_rate: int | None = None
+    channels: int = 2
+    wav: WavSettings = field(default_factory=WavSettings)
+    mp3: Mp3Settings = field(default_factory=Mp3Settings)
+
+    def render_cfg(self, audio_format: str) -> str:
+        """RENDER_CFG blob for a render; MP3 keeps Reaper's own settings (see above)."""
+        if audio_format == "wav":
+            return build_render_cfg(self.wav)
+        return base64.b64encode(MP3_FOURCC).decode("ascii")
+
+
+# Small, fast previews: 96 kbps mono MP3 (16-bit mono WAV masters) at 32 kHz
+PREVIEW_QUALITY = RenderQuality(
+    sample_rate=32000,
+    channels=1,
+    wav=WavSettings(bits=16, bwf=False),
+    mp3=Mp3Settings(bitrate=96, mono=True),
+)
+
+# "default" keeps Reaper's own settings for the format
+QUALITY_PRESETS: dict[str, RenderQuality | None] = {
+    "default": None,
+    "preview": PREVIEW_QUALITY,
+}
@@ -0,0 +1,79 @@
+"""Per-project results of a batch run and the JSON run report."""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+RENDERED = "rendered"
+SKIPPED = "skipped"
+FAILED = "failed"
+# Not started because the run's time budget would have been exceeded
+DEFERRED = "deferred"
+
+
+@dataclass
+class ProjectResult:
+    """Outcome of processing one project in a batch run."""
+
+    name: str
+    rpp_path: Path
+    status: str
+    output_path: Path | None = None
+    output_mtime: float | None = None
+    error: str | None = None
+    warnings: list[str] = field(default_factory=list)
+    audio: dict | None = None
+    loudness: dict | None = None
+    # Every output file of the project by format
+    outputs: dict[str, str] = field(default_factory=dict)
+    # Waveform peak file and PNG sparkline of the preview
+    peaks: str | None = None
+    sparkline: str | None = None
+    # Name and time range when the preview is one segment of the project
+    segment: dict | None = None
+    # Wall time of the Reaper launch that rendered the preview
+    render_seconds: float | None = None
+    # CPU time and peak memory of that launch, where the platform reports them
+    render_cpu_seconds: float | None = None
+    render_max_rss_kb: int | None = None
+    # Reaper's output for the project, when a render failed
+    log: str | None = None
+    # Plugins bypassed in the render, so the preview may sound different
+    bypassed_fx: list[str] = field(default_factory=list)
+    # Tracks heard in the preview when only some were rendered
+    tracks: list[str] = field(default_factory=list)
+    # Skipped because it failed repeatedly without changing (see quarantine)
+    quarantined: bool = False
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        for key, value in data.items():
+            if isinstance(value, Path):
+                data[key] = str(value)
+        return data
+
+
+def summarize(results: list[ProjectResult]) -> dict[str, int]:
+    """Count results per status."""
+    counts = {RENDERED: 0, SKIPPED: 0, FAILED: 0}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    return counts
+
+
+def write_report(path: Path, results: list[ProjectResult]) -> None:
+    """Write a JSON report of a batch run.
+
+    The file is written atomically so a reader never sees a partial report.
+    """
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "summary": summarize(results),
+        "projects": [result.to_dict() for result in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(report, indent=2))
+    os.replace(tmp, path)
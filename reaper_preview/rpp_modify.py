@@ -8,6 +8,13 @@ import re
 import tempfile
 from pathlib import Path
 
+from reaper_preview.fx import FxFilter, bypass_fx, bypass_fx_lines
+from reaper_preview.media import MediaIndex, media_name
+from reaper_preview.metadata import ProjectMetadata, scan_metadata
+from reaper_preview.render_cfg import RenderQuality
+from reaper_preview.segments import Segment, resolve_segments
+from reaper_preview.tracks import select_track_lines
+
 # Base64-encoded RENDER_CFG blobs. The first 4 bytes are a reversed FourCC:
 #   evaw = WAV, l3pm = MP3 (LAME).
 # Using the simple 4-byte FourCC gives Reaper's default settings for that format.
@@ -19,6 +26,23 @@ _RENDER_CFG_BY_FORMAT = {
     "mp3": RENDER_CFG_MP3,
 }
 
+# Top-level render settings forced on every preview, whatever the project
+# saved: full-speed offline rendering of the master mix only, with nothing
+# added back to the project and the cheapest dither/resampling.
+PREVIEW_RENDER_SETTINGS = {
+    "RENDER_1X": "0",           # 0 = full-speed offline (1 = 1x realtime)
+    "RENDER_ADDTOPROJ": "0",    # do not add rendered files to the project
+    "RENDER_STEMS": "0",        # master mix only, no stems
+    "RENDER_DITHER": "0",       # no dither or noise shaping
+    "RENDER_RESAMPLE": "1 0 1",  # linear interpolation resampling
+}
+
+# Render blocks that would produce additional outputs
+PREVIEW_REMOVED_BLOCKS = (
+    "RENDER_CFG2",       # secondary output format
+    "RENDER_METADATA",   # metadata written into the rendered files
+)
+
 
 def _replace_or_insert(text: str, key: str, new_line: str) -> str:
     """Replace an existing top-level RPP setting or insert it if missing.
@@ -42,13 +66,46 @@ def _replace_or_insert_block(text: str, tag: str, block: str) -> str:
     return replaced.replace("\n>", f"\n{block}\n>", 1)
 
 
-def _resolve_relative_file_paths(text: str, rpp_dir: Path) -> str:
+def _remove_block(text: str, tag: str) -> str:
+    """Remove a top-level RPP block if present."""
+    pattern = rf"^  <{re.escape(tag)}(?: [^\n]*)?\n.*?\n  >\n"
+    return re.sub(pattern, "", text, count=1, flags=re.MULTILINE | re.DOTALL)
+
+
+def apply_render_settings(
+    text: str,
+    settings: dict[str, str] = PREVIEW_RENDER_SETTINGS,
+    removed_blocks: tuple[str, ...] = PREVIEW_REMOVED_BLOCKS,
+) -> str:
+    """Force top-level render settings and drop render blocks in RPP text."""
+    for key, value in settings.items():
+        text = _replace_or_insert(text, key, f"  {key} {value}")
+    for tag in removed_blocks:
+        text = _remove_block(text, tag)
+    return text
+
+
+def _resolve_relative_file_paths(
+    text: str,
+    rpp_dir: Path,
+    media_index: MediaIndex | None = None,
+    metadata: ProjectMetadata | None = None,
+    staged_media: dict[str, Path] | None = None,
+) -> str:
     """Replace relative FILE paths in the RPP text with absolute paths.
 
     When a temp RPP is written to a different directory, Reaper resolves
     relative audio file paths from the temp file's location and fails to
     find them. Converting them to absolute paths fixes this.
 
+    With a `media_index`, references to files that do not exist are
+    pointed at the file of the same name the index finds, and recorded in
+    `metadata` (relocated_media, ambiguous_media, or missing_media if not
+    found).
+
+    Files in `staged_media` (absolute source path to local copy, see
+    staging.stage_project) are pointed at their local copies.
+
     Only FILE entries are affected; RENDER_FILE is left untouched.
     """
     def _resolve(match: re.Match) -> str:
@@ -58,6 +115,18 @@ def _resolve_relative_file_paths(text: str, rpp_dir: Path) -> str:
         p = Path(path_str)
         if not p.is_absolute():
             p = (rpp_dir / path_str).resolve()
+        if media_index is not None and not p.exists():
+            found = media_index.locate(media_name(path_str), near=rpp_dir)
+            if found is not None:
+                p = found.path
+                if metadata is not None:
+                    metadata.relocated_media[path_str] = str(p)
+                    if found.ambiguous:
+                        metadata.ambiguous_media.append(path_str)
+            elif metadata is not None and path_str not in metadata.missing_media:
+                metadata.missing_media.append(path_str)
+        if staged_media:
+            p = staged_media.get(str(p), p)
         return f'FILE "{str(p).replace(chr(92), "/")}"'
 
     # \bFILE matches FILE as a whole word, which excludes RENDER_FILE
@@ -65,6 +134,16 @@ def _resolve_relative_file_paths(text: str, rpp_dir: Path) -> str:
     return re.sub(r'\bFILE "([^"]*)"', _resolve, text)
 
 
+def _replace_regions(text: str, segments: list[Segment]) -> str:
+    """Replace the project's markers and regions with one region per segment."""
+    text = re.sub(r"^  MARKER .*\n", "", text, flags=re.MULTILINE)
+    lines = []
+    for index, segment in enumerate(segments, start=1):
+        lines.append(f'  MARKER {index} {segment.start} "{segment.name}" 1 0 1 R')
+        lines.append(f'  MARKER {index} {segment.end} "" 1')
+    return text.replace("\n>", "\n" + "\n".join(lines) + "\n>", 1)
+
+
 def prepare_rpp_for_preview(
     rpp_path: Path,
     output_dir: Path,
@@ -72,30 +151,100 @@ def prepare_rpp_for_preview(
     start: float,
     end: float,
     audio_format: str = "mp3",
+    metadata: ProjectMetadata | None = None,
+    segments: list[Segment] | str | None = None,
+    media_index: MediaIndex | None = None,
+    quality: RenderQuality | None = None,
+    fx_filter: FxFilter | None = None,
+    tracks: list[int | re.Pattern] | None = None,
+    staged_media: dict[str, Path] | None = None,
 ) -> Path:
     """Create a modified copy of an RPP file with render settings for preview.
 
-    Sets the output directory, filename pattern, time bounds, and audio format.
+    Sets the output directory, filename pattern, time bounds, and audio format,
+    and applies the fast preview render settings (PREVIEW_RENDER_SETTINGS).
     Relative audio file paths are resolved to absolute paths so Reaper can
     locate them when loading the temporary file from a different directory.
     The original file is never modified.
 
+    If `metadata` is given, it is filled from the original project text
+    while it is in memory, so cataloguing needs no second read.
+
+    With `segments` (a list, or "regions"/"markers" as parsed by
+    segments.parse_segments), the project's regions are replaced by one
+    region per segment and all regions are rendered in one go, each to
+    "<filename>-<segment name>". `end - start` is the length of segments
+    taken from markers. A project without regions or markers to take
+    segments from gets the single start/end render.
+
+    With a `media_index`, missing media is relocated, and media in
+    `staged_media` is read from its local copy (see
+    _resolve_relative_file_paths).
+
+    `quality` sets encoder settings, sample rate and channel count (see
+    render_cfg); without it Reaper's defaults for the format are used.
+
+    With an `fx_filter`, matching plugins are bypassed (and the master FX
+    chain dropped if it says so); their names go to `metadata.bypassed_fx`.
+
+    With `tracks` selectors (see tracks.parse_track_selectors), only the
+    matching tracks are heard and muted tracks are dropped where possible;
+    the track names go to `metadata.selected_tracks` and
+    `metadata.dropped_tracks`. Raises TrackSelectionError if no track
+    matches.
+
     Returns the path to the temporary modified RPP file.
     """
     text = rpp_path.read_text()
-    text = _resolve_relative_file_paths(text, rpp_path.parent)
+    if metadata is None and isinstance(segments, str):
+        metadata = ProjectMetadata()
+    if metadata is not None:
+        scan_metadata(text, metadata)
+    if segments is not None:
+        segments = resolve_segments(segments, metadata, end - start)
+    text = _resolve_relative_file_paths(text, rpp_path.parent, media_index, metadata, staged_media)
 
     # RPP files use forward slashes for paths, even on Windows.
     # Resolve to an absolute path so Reaper can locate the output directory
     # when loading the temp RPP from the system temp directory.
     output_dir_str = str(Path(output_dir).resolve()).replace("\\", "/")
     text = _replace_or_insert(text, "RENDER_FILE", f'  RENDER_FILE "{output_dir_str}"')
-    text = _replace_or_insert(text, "RENDER_PATTERN", f'  RENDER_PATTERN "{filename}"')
-    text = _replace_or_insert(text, "RENDER_RANGE", f"  RENDER_RANGE 0 {start} {end} 18 1000")
-
-    cfg_blob = _RENDER_CFG_BY_FORMAT[audio_format]
+    if segments:
+        # Bounds 3 renders every project region to its own file
+        text = _replace_regions(text, segments)
+        text = _replace_or_insert(text, "RENDER_PATTERN", f'  RENDER_PATTERN "{filename}-$region"')
+        text = _replace_or_insert(text, "RENDER_RANGE", "  RENDER_RANGE 3 0 0 18 1000")
+    else:
+        text = _replace_or_insert(text, "RENDER_PATTERN", f'  RENDER_PATTERN "{filename}"')
+        text = _replace_or_insert(text, "RENDER_RANGE", f"  RENDER_RANGE 0 {start} {end} 18 1000")
+
+    if quality is None:
+        cfg_blob = _RENDER_CFG_BY_FORMAT[audio_format]
+    else:
+        cfg_blob = quality.render_cfg(audio_format)
+        # RENDER_FMT <mode> <channels> <sample rate, 0 = project rate>
+        sample_rate = quality.sample_rate or 0
+        text = _replace_or_insert(text, "RENDER_FMT", f"  RENDER_FMT 0 {quality.channels} {sample_rate}")
+        if quality.sample_rate:
+            text = _replace_or_insert(text, "RENDER_SRATE", f"  RENDER_SRATE {sample_rate}")
     cfg_block = f"  <RENDER_CFG\n    {cfg_blob}\n  >"
     text = _replace_or_insert_block(text, "RENDER_CFG", cfg_block)
+    text = apply_render_settings(text)
+    if tracks:
+        # Selecting reads all tracks first; the tracks kept then stream
+        # through the FX bypass in the same pass, so plugins of dropped
+        # tracks are not reported
+        lines = select_track_lines(
+            text,
+            tracks,
+            metadata.selected_tracks if metadata is not None else None,
+            metadata.dropped_tracks if metadata is not None else None,
+        )
+        if fx_filter:
+            lines = bypass_fx_lines(lines, fx_filter, metadata.bypassed_fx if metadata is not None else None)
+        text = "\n".join(lines)
+    elif fx_filter:
+        text = bypass_fx(text, fx_filter, metadata.bypassed_fx if metadata is not None else None)
 
     tmp = tempfile.NamedTemporaryFile(
         mode="w", suffix=".rpp", delete=False, prefix="reaper_preview_"
@@ -0,0 +1,86 @@
+"""Preview segments: several snippets of one project from a single render.
+
+Segments are given as explicit time ranges (``0:30,60:90``) or taken from
+the project's own regions or markers. They are written into the temporary
+project as regions, and Reaper renders all of them in one launch with
+region render bounds and ``$region`` in the file pattern.
+"""
+
+import re
+from dataclasses import dataclass
+
+from reaper_preview.metadata import ProjectMetadata
+
+# Segment sources read from the project itself
+SOURCES = ("regions", "markers")
+
+
+class SegmentError(ValueError):
+    """Raised for an invalid segment specification."""
+
+
+@dataclass
+class Segment:
+    """A time range of a project rendered as its own preview."""
+
+    name: str
+    start: float
+    end: float
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "start": self.start, "end": self.end}
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^\w-]+", "_", name).strip("_")
+
+
+def _segment_name(index: int, label: str = "") -> str:
+    # The index keeps names unique and sorted; Reaper uses them for $region
+    slug = _slug(label)
+    return f"{index:02d}-{slug}" if slug else f"{index:02d}"
+
+
+def parse_segments(spec: str) -> list[Segment] | str:
+    """Parse a --segments value.
+
+    Returns the source name ("regions" or "markers"), or a list of segments
+    for comma-separated ``start:end`` ranges in seconds.
+
+    Raises:
+        SegmentError: If the specification is malformed
+    """
+    spec = spec.strip()
+    if spec.lower() in SOURCES:
+        return spec.lower()
+
+    segments = []
+    for index, part in enumerate(spec.split(","), start=1):
+        start, sep, end = part.strip().partition(":")
+        try:
+            start, end = float(start), float(end)
+        except ValueError:
+            raise SegmentError(f"Invalid segment {part.strip()!r}; expected START:END in seconds") from None
+        if not sep or start < 0 or end <= start:
+            raise SegmentError(f"Invalid segment {part.strip()!r}; END must be after START")
+        segments.append(Segment(name=_segment_name(index), start=start, end=end))
+    return segments
+
+
+def resolve_segments(spec: list[Segment] | str, metadata: ProjectMetadata, duration: float) -> list[Segment]:
+    """Return the segments to render for a project.
+
+    Regions are cut to `duration`; markers start a segment of `duration`.
+    Returns an empty list if the project has no regions or markers.
+    """
+    if not isinstance(spec, str):
+        return spec
+    if spec == "regions":
+        return [
+            Segment(name=_segment_name(i, name), start=start, end=min(end, start + duration))
+            for i, (name, start, end) in enumerate(metadata.regions, start=1)
+        ]
+    return [
+        Segment(name=_segment_name(i, name), start=pos, end=pos + duration)
+        for i, (name, pos) in enumerate(metadata.markers, start=1)
+    ]
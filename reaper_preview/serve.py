@@ -0,0 +1,329 @@
+"""Local HTTP server that renders previews on demand.
+
+Projects are listed on an index page, but nothing is rendered until a
+preview is first requested. Rendered files are cached on disk and reused
+until the source .rpp changes.
+"""
+
+import html
+import os
+import threading
+import traceback
+from concurrent.futures import Future
+from dataclasses import replace
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+from reaper_preview.discover import ProjectInfo
+from reaper_preview.render import RenderError, render_project
+from reaper_preview.rpp_modify import prepare_rpp_for_preview
+
+_CONTENT_TYPES = {
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+}
+
+_COPY_CHUNK = 64 * 1024
+
+
+class RangeNotSatisfiable(ValueError):
+    """Raised when a Range header cannot be satisfied for a file."""
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parse an HTTP Range header into an inclusive (start, end) byte range.
+
+    Only single ranges are supported. Returns None if the header should be
+    ignored (unknown unit or multiple ranges), in which case the full file
+    is served.
+
+    Raises:
+        RangeNotSatisfiable: If the range lies outside the file
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+class PreviewCache:
+    """Render previews lazily and keep them on disk.
+
+    Concurrent requests for the same project share a single in-flight
+    render: the first caller renders, the others wait for its result.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        reaper_bin: str,
+        audio_format: str = "mp3",
+        start: float = 0.0,
+        duration: float = 30.0,
+        timeout: int = 300,
+    ):
+        self.cache_dir = cache_dir
+        self.reaper_bin = reaper_bin
+        self.audio_format = audio_format
+        self.start = start
+        self.duration = duration
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._inflight: dict[Path, Future] = {}
+
+    def preview_path(self, project: ProjectInfo) -> Path:
+        return self.cache_dir / f"{project.name}.{self.audio_format}"
+
+    def is_fresh(self, project: ProjectInfo) -> bool:
+        """Whether a cached preview exists and is newer than the .rpp file."""
+        path = self.preview_path(project)
+        try:
+            return path.stat().st_mtime > project.rpp_path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+
+    def get(self, project: ProjectInfo) -> Path:
+        """Return the cached preview for a project, rendering it if needed.
+
+        Raises:
+            RenderError: If rendering fails
+        """
+        if self.is_fresh(project):
+            return self.preview_path(project)
+
+        with self._lock:
+            future = self._inflight.get(project.rpp_path)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[project.rpp_path] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._render(project)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[project.rpp_path]
+
+    def _render(self, project: ProjectInfo) -> Path:
+        # Another request may have finished rendering while we queued up
+        if self.is_fresh(project):
+            return self.preview_path(project)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_rpp = prepare_rpp_for_preview(
+            rpp_path=project.rpp_path,
+            output_dir=self.cache_dir,
+            filename=project.name,
+            start=self.start,
+            end=self.start + self.duration,
+            audio_format=self.audio_format,
+        )
+        try:
+            return render_project(
+                rpp_path=temp_rpp,
+                output_dir=self.cache_dir,
+                filename=project.name,
+                audio_format=self.audio_format,
+                reaper_bin=self.reaper_bin,
+                timeout=self.timeout,
+            )
+        finally:
+            try:
+                temp_rpp.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+def unique_names(projects: list[ProjectInfo]) -> list[ProjectInfo]:
+    """Rename projects that share a name after the folders they are in.
+
+    Previews are routed and cached by name, so two "song" projects in
+    album1/ and album2/ become "album1-song" and "album2-song". Projects
+    with a unique name are returned unchanged.
+    """
+    counts: dict[str, int] = {}
+    for project in projects:
+        counts[project.name] = counts.get(project.name, 0) + 1
+    clashing = [p for p in projects if counts[p.name] > 1]
+    if not clashing:
+        return list(projects)
+
+    root = Path(os.path.commonpath([p.rpp_path.parent for p in clashing]))
+    taken = {p.name for p in projects if counts[p.name] == 1}
+    renamed = []
+    for project in projects:
+        if counts[project.name] > 1:
+            parts = list(project.rpp_path.parent.relative_to(root).parts)
+            # A project in a folder of its own name is named after the folder above
+            if parts and parts[-1] == project.name:
+                parts.pop()
+            base = "-".join(parts + [project.name])
+            name, n = base, 2
+            while name in taken:
+                name, n = f"{base}-{n}", n + 1
+            taken.add(name)
+            project = replace(project, name=name)
+        renamed.append(project)
+    return renamed
+
+
+def _render_index(projects: list[ProjectInfo]) -> bytes:
+    rows = []
+    for project in projects:
+        name = html.escape(project.name)
+        src = f"/preview/{quote(project.name)}"
+        rows.append(
+            f'<li><span>{name}</span> '
+            f'<audio controls preload="none" src="{src}"></audio></li>'
+        )
+    page = (
+        "<!DOCTYPE html>\n"
+        '<html><head><meta charset="utf-8"><title>Reaper previews</title></head>\n'
+        f"<body><h1>Reaper previews ({len(projects)})</h1>\n"
+        "<ul>\n" + "\n".join(rows) + "\n</ul></body></html>\n"
+    )
+    return page.encode("utf-8")
+
+
+def make_handler(projects: list[ProjectInfo], cache: PreviewCache) -> type[BaseHTTPRequestHandler]:
+    """Build a request handler class bound to a project list and cache.
+
+    Projects sharing a name are told apart as described in unique_names().
+    """
+    projects = unique_names(projects)
+    by_name = {project.name: project for project in projects}
+    index_page = _render_index(projects)
+    content_type = _CONTENT_TYPES.get(cache.audio_format, "application/octet-stream")
+
+    class PreviewHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self._handle(send_body=True)
+
+        def do_HEAD(self):
+            self._handle(send_body=False)
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_response(self, code, message=None):
+            self._responded = True
+            super().send_response(code, message)
+
+        def _handle(self, send_body: bool):
+            self._responded = False
+            try:
+                self._route(send_body)
+            except (BrokenPipeError, ConnectionResetError):
+                # The player went away, e.g. after seeking
+                pass
+            except Exception:
+                traceback.print_exc()
+                if not self._responded:
+                    self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal error")
+
+        def _route(self, send_body: bool):
+            path = self.path.split("?", 1)[0]
+            if path in ("/", "/index.html"):
+                self._send_bytes(index_page, "text/html; charset=utf-8", send_body)
+            elif path.startswith("/preview/"):
+                project = by_name.get(unquote(path[len("/preview/"):]))
+                if project is None:
+                    self.send_error(HTTPStatus.NOT_FOUND, "Unknown project")
+                    return
+                try:
+                    preview = cache.get(project)
+                except RenderError as e:
+                    self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"Render failed: {e}")
+                    return
+                self._send_file(preview, send_body)
+            else:
+                self.send_error(HTTPStatus.NOT_FOUND)
+
+        def _send_bytes(self, body: bytes, ctype: str, send_body: bool):
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def _send_file(self, path: Path, send_body: bool):
+            size = path.stat().st_size
+            byte_range = None
+            header = self.headers.get("Range")
+            if header:
+                try:
+                    byte_range = parse_range(header, size)
+                except RangeNotSatisfiable:
+                    self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+            start, end = byte_range if byte_range else (0, size - 1)
+            length = end - start + 1 if size else 0
+            if byte_range:
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            else:
+                self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(length))
+            self.end_headers()
+            if not send_body:
+                return
+
+            with path.open("rb") as f:
+                f.seek(start)
+                remaining = length
+                while remaining > 0:
+                    chunk = f.read(min(_COPY_CHUNK, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+
+    return PreviewHandler
+
+
+def make_server(
+    projects: list[ProjectInfo],
+    cache: PreviewCache,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+) -> ThreadingHTTPServer:
+    """Create (but do not start) a threaded preview server."""
+    server = ThreadingHTTPServer((host, port), make_handler(projects, cache))
+    server.daemon_threads = True
+    return server
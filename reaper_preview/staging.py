@@ -0,0 +1,159 @@
+"""Local staging cache for media on slow network storage.
+
+Reaper reading stems from an SMB or NFS share during a render can take
+longer than the render itself. Media a project references is copied to a
+local cache ahead of its render (while the previous project renders) and
+the temporary project points at the local copies instead.
+
+Copies are keyed by source path, size and mtime, so a changed source gets
+a fresh copy and the stale one ages out. The cache has a size limit and
+evicts the least recently used copies; copies staged for projects that
+have not finished rendering are pinned and never evicted.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+INDEX_FILE = "staging-index.json"
+_INDEX_VERSION = 1
+
+_FILE_RE = re.compile(r'\bFILE "([^"]*)"')
+
+
+def referenced_media(text: str, rpp_dir: Path) -> list[Path]:
+    """Absolute paths of the existing media files an RPP text references."""
+    paths = []
+    seen = set()
+    for match in _FILE_RE.finditer(text):
+        reference = match.group(1)
+        if not reference:
+            continue
+        path = Path(reference)
+        if not path.is_absolute():
+            path = (rpp_dir / reference).resolve()
+        if path not in seen and path.is_file():
+            seen.add(path)
+            paths.append(path)
+    return paths
+
+
+@dataclass
+class _Entry:
+    local: str
+    size: int
+    last_used: float
+    pins: int = 0
+
+
+class StagingCache:
+    """Size-limited LRU cache of local media copies, safe to use from several threads."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self._load()
+
+    @staticmethod
+    def _key(path: Path, stat: os.stat_result) -> str:
+        return hashlib.sha1(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}".encode()).hexdigest()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads((self.cache_dir / INDEX_FILE).read_text())
+            if data.get("version") != _INDEX_VERSION:
+                return
+            for key, (local, size, last_used) in data["entries"].items():
+                if Path(local).is_file():
+                    self._entries[key] = _Entry(local, size, last_used)
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry.size for entry in self._entries.values())
+
+    def _evict(self, needed: int) -> bool:
+        """Remove unpinned copies, oldest first, until `needed` more bytes fit."""
+        total = self.total_bytes
+        for key, entry in sorted(self._entries.items(), key=lambda item: item[1].last_used):
+            if total + needed <= self.max_bytes:
+                break
+            if entry.pins:
+                continue
+            Path(entry.local).unlink(missing_ok=True)
+            del self._entries[key]
+            total -= entry.size
+        return total + needed <= self.max_bytes
+
+    def stage(self, path: Path) -> Path | None:
+        """Return a pinned local copy of a file, copying it if needed.
+
+        Returns None if the file cannot be staged (too large for the cache,
+        or the cache is full of pinned copies, or copying failed).
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        key = self._key(path, stat)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.pins += 1
+                entry.last_used = time.time()
+                return Path(entry.local)
+            if stat.st_size > self.max_bytes or not self._evict(stat.st_size):
+                return None
+            # Reserve the space while copying outside the lock
+            local = self.cache_dir / key[:16] / path.name
+            entry = self._entries[key] = _Entry(str(local), stat.st_size, time.time(), pins=1)
+
+        try:
+            local.parent.mkdir(parents=True, exist_ok=True)
+            tmp = local.with_name(local.name + ".part")
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, local)
+        except OSError:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        return local
+
+    def release(self, locals_: list[Path]) -> None:
+        """Unpin copies returned by stage() once their render is done."""
+        wanted = {str(path) for path in locals_}
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.local in wanted and entry.pins:
+                    entry.pins -= 1
+
+    def save(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                "version": _INDEX_VERSION,
+                "entries": {key: [e.local, e.size, e.last_used] for key, e in self._entries.items()},
+            }
+        tmp = self.cache_dir / (INDEX_FILE + ".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, self.cache_dir / INDEX_FILE)
+
+
+def stage_project(cache: StagingCache, rpp_path: Path) -> dict[str, Path]:
+    """Stage the media of a project; returns local copies by absolute source path."""
+    text = rpp_path.read_text(errors="replace")
+    staged = {}
+    for path in referenced_media(text, rpp_path.parent):
+        local = cache.stage(path)
+        if local is not None:
+            staged[str(path)] = local
+    return staged
@@ -0,0 +1,171 @@
+"""Timeline of a batch run in Chrome Trace Event Format.
+
+``--trace FILE.json`` records what every worker did and when: one lane
+per thread (discovery, each render worker, the media stager) and per
+post-processing process, with a span for each step of each project. The
+file opens in Perfetto (ui.perfetto.dev) or chrome://tracing.
+
+Recording a span costs two clock reads and a locked list append. Events are
+kept as tuples and only turned into JSON when a batch of them is written
+out, in the JSON array form of the format, which needs no closing until
+the end of the run. Timestamps come from time.monotonic_ns, which is the
+same clock in every process on Linux and macOS, so spans measured in
+post-processing workers line up with those of the renders.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+# Events held in memory before they are written out
+FLUSH_EVENTS = 10_000
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict | None):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.monotonic_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.complete(self.name, self.start, time.monotonic_ns(), args=self.args)
+        return False
+
+
+class Tracer:
+    """Buffered writer of trace events, safe to use from several threads.
+
+    Timestamps are nanoseconds of time.monotonic_ns; `origin_ns` is shown
+    as time zero. Call close() at the end of the run.
+    """
+
+    def __init__(self, path: Path, origin_ns: int | None = None, flush_events: int = FLUSH_EVENTS):
+        self.path = path
+        self.origin_ns = time.monotonic_ns() if origin_ns is None else origin_ns
+        self.flush_events = flush_events
+        self._pid = os.getpid()
+        self._events: list[tuple] = []
+        self._lanes: dict[str, int] = {}
+        self._thread = threading.local()
+        self._count = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8", buffering=1024 * 1024)
+        self._file.write("[")
+        self._first = True
+        self._meta("process_name", 0, {"name": "reaper-preview"})
+
+    def _meta(self, name: str, tid: int, args: dict) -> None:
+        # Called with the lock held, or before other threads can see the tracer
+        self._events.append(("M", name, tid, 0, 0, args))
+
+    def lane(self, name: str | None = None) -> int:
+        """Thread id of a named lane, or of the calling thread's lane."""
+        if name is None:
+            # Thread-local rather than by thread ident, which is reused
+            tid = getattr(self._thread, "tid", None)
+            if tid is None:
+                with self._lock:
+                    tid = self._thread.tid = self._new_lane(threading.current_thread().name)
+            return tid
+        tid = self._lanes.get(name)
+        if tid is None:
+            with self._lock:
+                tid = self._lanes.get(name)
+                if tid is None:
+                    tid = self._lanes[name] = self._new_lane(name)
+        return tid
+
+    def _new_lane(self, name: str) -> int:
+        # Called with the lock held
+        self._count += 1
+        self._meta("thread_name", self._count, {"name": name})
+        self._meta("thread_sort_index", self._count, {"sort_index": self._count})
+        return self._count
+
+    def span(self, name: str, **args) -> _Span:
+        """Context manager recording a span on the calling thread's lane."""
+        return _Span(self, name, args or None)
+
+    def complete(self, name: str, start_ns: int, end_ns: int, lane: str | None = None,
+                 args: dict | None = None) -> None:
+        """Record a span that has already ended."""
+        self._record(("X", name, self.lane(lane), start_ns, end_ns - start_ns, args))
+
+    def instant(self, name: str, lane: str | None = None, args: dict | None = None) -> None:
+        self._record(("i", name, self.lane(lane), time.monotonic_ns(), 0, args))
+
+    def _record(self, event: tuple) -> None:
+        with self._lock:
+            self._events.append(event)
+            full = len(self._events) >= self.flush_events
+        if full:
+            self.flush()
+
+    def _encode(self, event: tuple) -> str:
+        phase, name, tid, start_ns, duration_ns, args = event
+        record = {"name": name, "ph": phase, "pid": self._pid, "tid": tid}
+        if phase != "M":
+            record["ts"] = (start_ns - self.origin_ns) / 1000
+        if phase == "X":
+            record["dur"] = duration_ns / 1000
+        elif phase == "i":
+            record["s"] = "t"
+        if args:
+            record["args"] = args
+        return json.dumps(record, default=str)
+
+    def flush(self) -> None:
+        """Write out the events recorded so far."""
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return
+        with self._write_lock:
+            if self._file.closed:
+                return
+            text = ",\n".join(self._encode(event) for event in events)
+            self._file.write(text if self._first else ",\n" + text)
+            self._first = False
+
+    def close(self) -> None:
+        self.flush()
+        with self._write_lock:
+            if not self._file.closed:
+                self._file.write("]\n")
+                self._file.close()
+
+
+class NullTracer:
+    """Stand-in when no trace is recorded; every call does nothing."""
+
+    _span = nullcontext()
+
+    def lane(self, name: str | None = None) -> int:
+        return 0
+
+    def span(self, name: str, **args):
+        return self._span
+
+    def complete(self, name: str, start_ns: int, end_ns: int, lane: str | None = None,
+                 args: dict | None = None) -> None:
+        pass
+
+    def instant(self, name: str, lane: str | None = None, args: dict | None = None) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,221 @@
+"""Render only some tracks of a project.
+
+Selected tracks (by 1-based index or by a regular expression searched in
+the track name) are unmuted, every other track is muted, and soloing is
+cleared, through each track's ``MUTESOLO <mute> <solo> <solo defeat>``
+line. Selecting a folder selects its children. Folders above a selected
+track stay unmuted so its audio still reaches the master, with their own
+items muted.
+
+Muted tracks that send to no remaining track are dropped from the project
+altogether, so their instruments and effects are never loaded. Folder
+depths (``ISBUS <folder> <depth change>``) are recomputed for the tracks
+that are left, and receives (``AUXRECV <source index> ...``) are
+renumbered to the new track order.
+"""
+
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from reaper_preview.metadata import split_tokens
+
+
+class TrackSelectionError(ValueError):
+    """Raised for invalid track selectors or when no track matches."""
+
+
+def parse_track_selectors(values: list[str]) -> list[int | re.Pattern]:
+    """Parse track selectors: 1-based indexes or case-insensitive name regexes."""
+    selectors: list[int | re.Pattern] = []
+    for value in values:
+        if value.isdigit():
+            if int(value) < 1:
+                raise TrackSelectionError("Track indexes start at 1.")
+            selectors.append(int(value))
+            continue
+        try:
+            selectors.append(re.compile(value, re.IGNORECASE))
+        except re.error as e:
+            raise TrackSelectionError(f"Invalid track pattern {value!r}: {e}") from e
+    return selectors
+
+
+@dataclass
+class _Track:
+    lines: list[str]
+    name: str = ""
+    depth: int = 0
+    # Folder depth change after this track, from ISBUS
+    depth_change: int = 0
+    # Indexes of the tracks this one receives from
+    receives: list[int] = field(default_factory=list)
+
+
+def _field(line: str, key: str) -> bool:
+    """Whether a line is the `key` line of a track (not of a nested block)."""
+    return line.startswith(f"    {key} ")
+
+
+def _parse(text: str) -> tuple[list[list[str] | _Track], list[_Track]]:
+    """Split RPP text into plain lines and top-level tracks."""
+    pieces: list[list[str] | _Track] = []
+    tracks: list[_Track] = []
+    current = None
+    for line in text.split("\n"):
+        if current is not None:
+            current.lines.append(line)
+            if line == "  >":
+                current = None
+        elif line == "  <TRACK" or line.startswith("  <TRACK "):
+            current = _Track([line])
+            tracks.append(current)
+            pieces.append(current)
+        else:
+            pieces.append([line])
+
+    depth = 0
+    for track in tracks:
+        track.depth = depth
+        for line in track.lines:
+            try:
+                if _field(line, "NAME"):
+                    tokens = split_tokens(line)
+                    track.name = tokens[1] if len(tokens) > 1 else ""
+                elif _field(line, "ISBUS"):
+                    track.depth_change = int(line.split()[2])
+                elif _field(line, "AUXRECV"):
+                    track.receives.append(int(line.split()[1]))
+            except (IndexError, ValueError):
+                continue
+        depth = max(0, depth + track.depth_change)
+    return pieces, tracks
+
+
+def _set_mutesolo(track: _Track, mute: bool) -> None:
+    for i, line in enumerate(track.lines):
+        if _field(line, "MUTESOLO"):
+            fields = line.split()
+            fields += ["0"] * (4 - len(fields))
+            fields[1], fields[2] = ("1" if mute else "0"), "0"
+            track.lines[i] = "    " + " ".join(fields)
+            return
+    track.lines.insert(1, f"    MUTESOLO {1 if mute else 0} 0 0")
+
+
+def _mute_items(track: _Track) -> None:
+    """Mute the items of a track whose children are still heard through it."""
+    track.lines = [re.sub(r"^(      MUTE )0\b", r"\g<1>1", line) for line in track.lines]
+
+
+def select_tracks(
+    text: str,
+    selectors: list[int | re.Pattern],
+    selected_names: list[str] | None = None,
+    dropped_names: list[str] | None = None,
+) -> str:
+    """Mute every track but the selected ones and drop what cannot be heard.
+
+    Names of the selected tracks and of the dropped ones (unnamed tracks as
+    "Track <n>") are appended to `selected_names` and `dropped_names`.
+
+    Raises:
+        TrackSelectionError: If no track matches the selectors
+    """
+    return "\n".join(select_track_lines(text, selectors, selected_names, dropped_names))
+
+
+def select_track_lines(
+    text: str,
+    selectors: list[int | re.Pattern],
+    selected_names: list[str] | None = None,
+    dropped_names: list[str] | None = None,
+) -> Iterator[str]:
+    """select_tracks(), yielding the lines of the result instead of joining them.
+
+    The selection is made (and TrackSelectionError raised) on the call;
+    only the output lines are produced lazily, so a further line filter
+    can run in the same pass.
+    """
+    pieces, tracks = _parse(text)
+
+    def label(index: int) -> str:
+        return tracks[index].name or f"Track {index + 1}"
+
+    selected = set()
+    for index, track in enumerate(tracks):
+        for selector in selectors:
+            if (selector == index + 1) if isinstance(selector, int) else selector.search(track.name):
+                selected.add(index)
+    if not selected:
+        raise TrackSelectionError("No track matches the track selection")
+
+    # Children of selected folders
+    audible = set()
+    for index in sorted(selected):
+        audible.add(index)
+        for child in range(index + 1, len(tracks)):
+            if tracks[child].depth <= tracks[index].depth:
+                break
+            audible.add(child)
+
+    def ancestors(index: int) -> list[int]:
+        found, depth = [], tracks[index].depth
+        for parent in range(index - 1, -1, -1):
+            if tracks[parent].depth < depth:
+                found.append(parent)
+                depth = tracks[parent].depth
+        return found
+
+    # Kept: what is heard, the folders it passes through, and muted tracks
+    # that send to a kept track (with their own folders)
+    kept = set(audible)
+    pending = list(audible)
+    while pending:
+        index = pending.pop()
+        for other in ancestors(index) + tracks[index].receives:
+            if 0 <= other < len(tracks) and other not in kept:
+                kept.add(other)
+                pending.append(other)
+
+    folders = {parent for index in audible for parent in ancestors(index)} - audible
+    for index in kept:
+        _set_mutesolo(tracks[index], mute=index not in audible and index not in folders)
+        if index in folders:
+            _mute_items(tracks[index])
+
+    if selected_names is not None:
+        selected_names.extend(label(index) for index in sorted(audible))
+    dropped = [index for index in range(len(tracks)) if index not in kept]
+    if dropped_names is not None:
+        dropped_names.extend(label(index) for index in dropped)
+    if not dropped:
+        return (line for piece in pieces for line in _lines(piece))
+
+    # Renumber receives and recompute folder depths of the remaining tracks
+    new_index = {old: new for new, old in enumerate(sorted(kept))}
+    remaining = [tracks[index] for index in sorted(kept)]
+    for position, track in enumerate(remaining):
+        next_depth = remaining[position + 1].depth if position + 1 < len(remaining) else 0
+        change = next_depth - track.depth
+        isbus = f"    ISBUS {1 if change > 0 else 2 if change < 0 else 0} {change}"
+        lines = []
+        for line in track.lines:
+            if _field(line, "AUXRECV"):
+                source = int(line.split()[1])
+                if source not in new_index:
+                    continue
+                line = re.sub(r"^(    AUXRECV )\d+", rf"\g<1>{new_index[source]}", line)
+            elif _field(line, "ISBUS"):
+                line = isbus
+            lines.append(line)
+        if isbus not in lines and change:
+            lines.insert(1, isbus)
+        track.lines = lines
+
+    dropped_tracks = {id(tracks[index]) for index in dropped}
+    return (line for piece in pieces if id(piece) not in dropped_tracks for line in _lines(piece))
+
+
+def _lines(piece: list[str] | _Track) -> list[str]:
+    return piece.lines if isinstance(piece, _Track) else piece
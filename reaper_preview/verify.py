@@ -0,0 +1,165 @@
+"""Structural checks of rendered audio files.
+
+A Reaper that crashes or is killed mid-render can leave an empty or
+truncated file at the output path, which would otherwise be taken for a
+finished preview and skipped on every later run. These checks read only
+the headers: the RIFF chunks of a WAV file, or the first MPEG audio frame
+of an MP3 file with its Xing/Info or VBRI header. The duration follows
+from the header fields and the file size, without decoding any audio.
+"""
+
+import os
+import struct
+from pathlib import Path
+
+from reaper_preview.wavfile import WavError, read_wav_info
+
+# Allowed difference between the expected and the actual duration
+DURATION_TOLERANCE_SECONDS = 0.5
+DURATION_TOLERANCE_FRACTION = 0.02
+
+# How far past the ID3 tag the first frame is looked for
+_MP3_SYNC_SEARCH = 4096
+
+# Bitrates in kbit/s by bitrate index, for MPEG-1 and MPEG-2/2.5 Layer III
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by version bits and rate index
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),   # MPEG-2.5
+}
+
+
+class OutputError(ValueError):
+    """Raised when a rendered file is empty, malformed or of the wrong length."""
+
+
+def _mp3_frame(header: bytes) -> tuple[int, int, int, int, bool] | None:
+    """Parse a Layer III frame header.
+
+    Returns ``(frame length, sample rate, samples per frame, bitrate,
+    mono)`` or None if `header` is not a valid frame header. Free-format
+    frames (bitrate index 0) are not accepted.
+    """
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 3
+    layer = (header[1] >> 1) & 3
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+    rate = _MP3_SAMPLE_RATES[version][rate_index]
+    samples = 1152 if mpeg1 else 576
+    padding = (header[2] >> 1) & 1
+    length = samples // 8 * bitrate // rate + padding
+    return length, rate, samples, bitrate, header[3] >> 6 == 3
+
+
+def mp3_duration(path: Path) -> float:
+    """Duration of an MP3 file in seconds, from its frame headers.
+
+    VBR files carry the frame count in a Xing/Info or VBRI header in the
+    first frame; CBR files without one are measured by size and bitrate.
+    Files shorter than the byte count in their Xing header report the
+    share of the duration they still contain.
+
+    Raises:
+        OutputError: If no valid MPEG-1/2 Layer III frame is found
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(10)
+        start = 0
+        if head[:3] == b"ID3" and len(head) == 10:
+            # Tag size is a 28-bit synchsafe integer; a footer adds 10 bytes
+            tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+            start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+        f.seek(start)
+        # Enough for the largest frame after the last offset searched
+        data = f.read(_MP3_SYNC_SEARCH + 2048)
+        if size >= 128:
+            f.seek(size - 128)
+            if f.read(3) == b"TAG":
+                size -= 128
+
+    # The first frame must be followed by another frame (or the end of the
+    # file), which rules out stray 0xFF bytes in padding
+    for offset in range(min(len(data) - 3, _MP3_SYNC_SEARCH)):
+        frame = _mp3_frame(data[offset:offset + 4])
+        if frame is None:
+            continue
+        length, rate, samples, bitrate, mono = frame
+        following = data[offset + length:offset + length + 4]
+        if len(following) < 4 and start + offset + length >= size or _mp3_frame(following):
+            break
+    else:
+        raise OutputError("No MP3 frame found")
+    audio_start = start + offset
+    audio_bytes = size - audio_start
+
+    side_info = (17 if mono else 32) if samples == 1152 else (9 if mono else 17)
+    xing = data[offset + 4 + side_info:offset + 4 + side_info + 16]
+    if xing[:4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", xing[4:8])[0]
+        if flags & 1:
+            frames = struct.unpack(">I", xing[8:12])[0]
+            duration = frames * samples / rate
+            if flags & 2:
+                stream_bytes = struct.unpack(">I", xing[12:16])[0]
+                if 0 < audio_bytes < stream_bytes:
+                    duration *= audio_bytes / stream_bytes
+            return duration
+    vbri = data[offset + 36:offset + 36 + 18]
+    if vbri[:4] == b"VBRI":
+        frames = struct.unpack(">I", vbri[14:18])[0]
+        return frames * samples / rate
+    return audio_bytes * 8 / bitrate
+
+
+def audio_duration(path: Path) -> float:
+    """Duration of a rendered WAV or MP3 file, from its headers.
+
+    Raises:
+        OutputError: If the file is empty or not a valid file of its format
+    """
+    try:
+        if os.path.getsize(path) == 0:
+            raise OutputError("File is empty")
+    except OSError as e:
+        raise OutputError(f"Cannot read file: {e}") from e
+    suffix = path.suffix.lower()
+    try:
+        if suffix == ".wav":
+            info = read_wav_info(path)
+            if not info.sample_rate or not info.block_align:
+                raise OutputError("Invalid WAV format header")
+            return info.duration
+        if suffix == ".mp3":
+            return mp3_duration(path)
+    except (WavError, OSError) as e:
+        raise OutputError(str(e)) from e
+    raise OutputError(f"Cannot verify {suffix} files")
+
+
+def verify_output(path: Path, expected_duration: float | None = None) -> float:
+    """Check that a rendered file is complete and return its duration.
+
+    Raises:
+        OutputError: If the file is empty, malformed, holds no audio or
+            differs from `expected_duration` by more than the tolerance
+    """
+    duration = audio_duration(path)
+    if duration <= 0:
+        raise OutputError("File contains no audio")
+    if expected_duration is not None:
+        tolerance = max(DURATION_TOLERANCE_SECONDS, expected_duration * DURATION_TOLERANCE_FRACTION)
+        if abs(duration - expected_duration) > tolerance:
+            raise OutputError(f"Duration is {duration:.1f} s, expected {expected_duration:.1f} s")
+    return duration
@@ -0,0 +1,225 @@
+"""Read rendered WAV files without decoding them into Python objects.
+
+The RIFF header is parsed with struct; sample data is memory-mapped with
+NumPy and converted to float32 in vectorized form. NumPy is an optional
+dependency (``pip install reaper-preview[audio]``) and is only imported
+when samples are actually read.
+"""
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavError(ValueError):
+    """Raised when a file is not a WAV file this module can read."""
+
+
+@dataclass
+class WavInfo:
+    """Layout of the audio data in a WAV file."""
+
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    block_align: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // self.block_align if self.block_align else 0
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+
+def parse_wav_header(f) -> WavInfo:
+    """Parse the RIFF header from an open binary file positioned at 0.
+
+    Raises:
+        WavError: If the file is not a RIFF/WAVE file or lacks fmt/data chunks
+    """
+    header = f.read(12)
+    if len(header) < 12 or header[:4] not in (b"RIFF", b"RF64") or header[8:12] != b"WAVE":
+        raise WavError("Not a RIFF/WAVE file")
+
+    fmt = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            break
+        chunk_id, size = struct.unpack("<4sI", chunk)
+        if chunk_id == b"fmt ":
+            body = f.read(size)
+            if len(body) < 16:
+                raise WavError("Truncated fmt chunk")
+            format_tag, channels, rate, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                # The real format is the first two bytes of the SubFormat GUID
+                format_tag = struct.unpack("<H", body[24:26])[0]
+            fmt = (format_tag, channels, rate, bits, block_align)
+            if size & 1:
+                f.seek(1, 1)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise WavError("data chunk before fmt chunk")
+            format_tag, channels, rate, bits, block_align = fmt
+            return WavInfo(
+                format_tag=format_tag,
+                channels=channels,
+                sample_rate=rate,
+                bits_per_sample=bits,
+                block_align=block_align,
+                data_offset=f.tell(),
+                data_size=size,
+            )
+        else:
+            # Chunks are word-aligned; odd sizes are followed by a pad byte
+            f.seek(size + (size & 1), 1)
+
+    raise WavError("No data chunk" if fmt else "No fmt chunk")
+
+
+def read_wav_info(path: Path) -> WavInfo:
+    """Return the header information of a WAV file.
+
+    The data size is clamped to what is actually on disk, so a truncated
+    file reports the frames it really contains.
+    """
+    with open(path, "rb") as f:
+        info = parse_wav_header(f)
+        f.seek(0, 2)
+        available = f.tell() - info.data_offset
+    info.data_size = max(0, min(info.data_size, available))
+    return info
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise RuntimeError(
+            "NumPy is required for audio analysis; install it with 'pip install reaper-preview[audio]'"
+        ) from e
+    return numpy
+
+
+def map_samples(path: Path, info: WavInfo | None = None):
+    """Memory-map the raw samples of a WAV file without converting them.
+
+    Returns ``(raw, offset, scale)`` where `raw` has shape (frames, channels)
+    and ``(raw - offset) * scale`` are the samples in [-1.0, 1.0). Reductions
+    such as min/max can run on `raw` directly and be scaled afterwards.
+    24-bit samples are exposed as int32 words that carry one stray low
+    byte, i.e. they are exact to within 2**-23.
+
+    Raises:
+        WavError: If the sample format is not supported
+    """
+    np = _numpy()
+    if info is None:
+        info = read_wav_info(path)
+    frames, channels = info.frames, info.channels
+    if frames == 0:
+        return np.zeros((0, channels), dtype=np.float32), 0.0, 1.0
+
+    count = frames * channels
+    bits = info.bits_per_sample
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        dtype = "<f4" if bits == 32 else "<f8"
+        raw = np.memmap(path, dtype=dtype, mode="r", offset=info.data_offset, shape=(count,))
+        offset, scale = 0.0, 1.0
+    elif info.format_tag == WAVE_FORMAT_PCM and bits == 8:
+        raw = np.memmap(path, dtype=np.uint8, mode="r", offset=info.data_offset, shape=(count,))
+        offset, scale = 128.0, 1.0 / 128.0
+    elif info.format_tag == WAVE_FORMAT_PCM and bits == 16:
+        raw = np.memmap(path, dtype="<i2", mode="r", offset=info.data_offset, shape=(count,))
+        offset, scale = 0.0, 1.0 / 32768.0
+    elif info.format_tag == WAVE_FORMAT_PCM and bits == 24:
+        # View the data as overlapping little-endian int32 words at a 3-byte
+        # stride, starting one byte early (the last header byte). Each word
+        # then holds a sample in its top 24 bits and a stray low byte, so no
+        # per-byte shuffling or copying is needed.
+        data = np.memmap(path, dtype=np.uint8, mode="r", offset=info.data_offset - 1, shape=(count * 3 + 1,))
+        raw = np.ndarray(shape=(count,), dtype="<i4", buffer=data, strides=(3,))
+        offset, scale = 0.0, 1.0 / 2147483648.0
+    elif info.format_tag == WAVE_FORMAT_PCM and bits == 32:
+        raw = np.memmap(path, dtype="<i4", mode="r", offset=info.data_offset, shape=(count,))
+        offset, scale = 0.0, 1.0 / 2147483648.0
+    else:
+        raise WavError(f"Unsupported WAV format {info.format_tag:#x} with {bits} bits")
+
+    return raw.reshape(frames, channels), offset, scale
+
+
+def read_samples(path: Path, info: WavInfo | None = None):
+    """Return the samples of a WAV file as a float32 array of shape (frames, channels).
+
+    Integer formats are scaled to [-1.0, 1.0). Sample data is memory-mapped,
+    so only the pages touched by the conversion are read from disk.
+
+    Raises:
+        WavError: If the sample format is not supported
+    """
+    np = _numpy()
+    if info is None:
+        info = read_wav_info(path)
+    raw, offset, scale = map_samples(path, info)
+    if info.format_tag == WAVE_FORMAT_PCM and info.bits_per_sample == 24:
+        # Mask off the stray low byte of each word
+        raw = raw & ~0xFF
+    samples = raw.astype(np.float32)
+    if offset:
+        samples -= np.float32(offset)
+    if scale != 1.0:
+        samples *= np.float32(scale)
+    return samples
+
+
+def write_samples(path: Path, samples, info: WavInfo) -> None:
+    """Write float samples of shape (frames, channels) in the format of `info`.
+
+    Values are clipped to the representable range. The file is written to a
+    temporary name and moved into place, so readers never see a partial file.
+
+    Raises:
+        WavError: If the sample format is not supported
+    """
+    np = _numpy()
+    bits = info.bits_per_sample
+    flat = np.asarray(samples, dtype=np.float32).reshape(-1)
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        data = flat.astype("<f4" if bits == 32 else "<f8").tobytes()
+    elif info.format_tag == WAVE_FORMAT_PCM and bits in (16, 24, 32):
+        scale = float(2 ** (bits - 1))
+        ints = np.clip(np.rint(flat.astype(np.float64) * scale), -scale, scale - 1).astype("<i4")
+        if bits == 16:
+            data = ints.astype("<i2").tobytes()
+        elif bits == 24:
+            data = ints.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+        else:
+            data = ints.tobytes()
+    else:
+        raise WavError(f"Unsupported WAV format {info.format_tag:#x} with {bits} bits")
+
+    block_align = info.channels * bits // 8
+    header = b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE"
+    header += b"fmt " + struct.pack(
+        "<IHHIIHH", 16, info.format_tag, info.channels, info.sample_rate,
+        info.sample_rate * block_align, block_align, bits,
+    )
+    header += b"data" + struct.pack("<I", len(data))
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(data)
+    os.replace(tmp, path)
@@ -0,0 +1,43 @@
+"""Tests for reaper_preview.analysis module."""
+
+import numpy as np
+import pytest
+
+from tests.wav_helpers import sine, write_wav
+from reaper_preview.analysis import analyze_wav
+
+
+class TestAnalyzeWav:
+    def test_tone(self, tmp_path):
+        path = write_wav(tmp_path / "tone.wav", sine(2.0, amplitude=0.5))
+        stats = analyze_wav(path)
+        assert stats.duration == pytest.approx(2.0)
+        assert stats.peak_db == pytest.approx(-6.02, abs=0.05)
+        assert stats.rms_db == pytest.approx(-9.03, abs=0.05)
+        assert stats.silent_fraction == 0.0
+        assert not stats.is_silent
+        assert not stats.is_clipped
+
+    def test_digital_silence(self, tmp_path):
+        path = write_wav(tmp_path / "silent.wav", np.zeros((44100, 2)))
+        stats = analyze_wav(path)
+        assert stats.is_silent
+        assert stats.to_dict()["peak_db"] is None
+        assert stats.to_dict()["silent"] is True
+
+    def test_partly_silent(self, tmp_path):
+        audio = np.concatenate([sine(1.0), np.zeros((44100, 2))])
+        stats = analyze_wav(write_wav(tmp_path / "half.wav", audio))
+        assert stats.silent_fraction == pytest.approx(0.5, abs=0.02)
+        assert not stats.is_silent
+
+    def test_clipped(self, tmp_path):
+        audio = np.clip(sine(1.0, amplitude=4.0), -1.0, 1.0)
+        stats = analyze_wav(write_wav(tmp_path / "clip.wav", audio, bits=32))
+        assert stats.is_clipped
+        assert stats.to_dict()["clipped"] is True
+
+    def test_empty_file(self, tmp_path):
+        stats = analyze_wav(write_wav(tmp_path / "empty.wav", np.zeros((0, 2))))
+        assert stats.duration == 0.0
+        assert stats.is_silent
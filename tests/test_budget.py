@@ -0,0 +1,76 @@
+"""Tests for reaper_preview.budget module."""
+
+from pathlib import Path
+
+import pytest
+
+from reaper_preview.budget import RunBudget
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRunBudget:
+    def test_without_budget_everything_fits(self, tmp_path):
+        budget = RunBudget(tmp_path / "schedule.json")
+        budget.record(Path("a.rpp"), 10_000)
+        assert budget.remaining() is None
+        assert budget.fits(Path("a.rpp"))
+
+    def test_fits_by_estimate_and_remaining_time(self, tmp_path):
+        clock = _Clock()
+        budget = RunBudget(tmp_path / "schedule.json", seconds=100, clock=clock)
+        budget.record(Path("slow.rpp"), 80)
+        budget.record(Path("fast.rpp"), 10)
+
+        clock.now += 50
+        assert not budget.fits(Path("slow.rpp"))
+        assert budget.fits(Path("fast.rpp"))
+        clock.now += 60
+        assert not budget.fits(Path("fast.rpp"))
+
+    def test_unknown_project_expected_to_take_the_median(self, tmp_path):
+        budget = RunBudget(tmp_path / "schedule.json")
+        assert budget.estimate(Path("new.rpp")) is None
+        for name, seconds in (("a", 10), ("b", 20), ("c", 90)):
+            budget.record(Path(f"{name}.rpp"), seconds)
+        assert budget.estimate(Path("new.rpp")) == 20
+
+    def test_estimate_follows_recent_renders(self, tmp_path):
+        budget = RunBudget(tmp_path / "schedule.json")
+        budget.record(Path("a.rpp"), 100)
+        budget.record(Path("a.rpp"), 50)
+        assert budget.estimate(Path("a.rpp")) == pytest.approx(75)
+
+    def test_projects_kept_by_absolute_path(self, tmp_path, monkeypatch):
+        (tmp_path / "lib").mkdir()
+        monkeypatch.chdir(tmp_path)
+        budget = RunBudget(tmp_path / "schedule.json")
+        budget.record(Path("lib/a.rpp"), 30, max_rss_kb=1000)
+        budget.defer(Path("lib/b.rpp"))
+        budget.save(known=[Path("lib/a.rpp"), Path("lib/b.rpp")])
+
+        monkeypatch.chdir(tmp_path / "lib")
+        reloaded = RunBudget(tmp_path / "schedule.json")
+        assert reloaded.estimate(Path("a.rpp")) == 30
+        assert reloaded.expected_rss_kb(Path("a.rpp")) == 1000
+        assert reloaded.previously_deferred == [tmp_path.resolve() / "lib" / "b.rpp"]
+
+    def test_saves_estimates_and_deferred_projects(self, tmp_path):
+        budget = RunBudget(tmp_path / "schedule.json", seconds=60)
+        budget.record(Path("a.rpp"), 30)
+        budget.record(Path("gone.rpp"), 30)
+        budget.defer(Path("b.rpp"))
+        budget.save(known=[Path("a.rpp"), Path("b.rpp")])
+
+        reloaded = RunBudget(tmp_path / "schedule.json")
+        assert reloaded.previously_deferred == [Path("b.rpp").resolve()]
+        assert reloaded.estimate(Path("a.rpp")) == 30
+        assert reloaded.estimate(Path("gone.rpp")) == 30  # the median of what is left
+        reloaded.save()
+        assert RunBudget(tmp_path / "schedule.json").previously_deferred == []
@@ -0,0 +1,91 @@
+"""Tests for reaper_preview.catalog module."""
+
+import json
+import os
+import time
+from unittest.mock import patch
+
+from reaper_preview.catalog import Catalog
+from reaper_preview.discover import ProjectInfo
+from reaper_preview.metadata import parse_metadata
+
+SONG_RPP = """\
+<REAPER_PROJECT 0.1 "7.0"
+  TEMPO 90 4 4
+  <TRACK
+    <ITEM
+      POSITION 0
+      LENGTH 12
+    >
+  >
+>
+"""
+
+
+def _project(tmp_path, text=SONG_RPP):
+    rpp = tmp_path / "song.rpp"
+    rpp.write_text(text)
+    return ProjectInfo(name="song", rpp_path=rpp, project_dir=tmp_path)
+
+
+class TestCatalog:
+    def test_store_and_get(self, tmp_path):
+        project = _project(tmp_path)
+        with Catalog(tmp_path / "catalog.db") as catalog:
+            assert catalog.store(project, parse_metadata(SONG_RPP)) is True
+            row = catalog.get(project.rpp_path)
+
+        assert row["name"] == "song"
+        assert row["track_count"] == 1
+        assert row["tempo"] == 90.0
+        assert row["length"] == 12.0
+        assert json.loads(row["plugins"]) == []
+
+    def test_persists_across_connections(self, tmp_path):
+        project = _project(tmp_path)
+        with Catalog(tmp_path / "catalog.db") as catalog:
+            catalog.store(project, parse_metadata(SONG_RPP))
+        with Catalog(tmp_path / "catalog.db") as catalog:
+            assert catalog.is_current(project.rpp_path)
+
+    def test_store_same_hash_does_not_rewrite(self, tmp_path):
+        project = _project(tmp_path)
+        with Catalog(tmp_path / "catalog.db") as catalog:
+            catalog.store(project, parse_metadata(SONG_RPP))
+            assert catalog.store(project, parse_metadata(SONG_RPP)) is False
+
+    def test_refresh_skips_unchanged_file_without_reading(self, tmp_path):
+        project = _project(tmp_path)
+        with Catalog(tmp_path / "catalog.db") as catalog:
+            catalog.refresh(project)
+            with patch("reaper_preview.catalog.parse_metadata") as mock_parse, \
+                 patch("pathlib.Path.read_text") as mock_read:
+                assert catalog.refresh(project) is False
+            mock_read.assert_not_called()
+            mock_parse.assert_not_called()
+
+    def test_refresh_touched_but_unchanged_file_is_not_reparsed(self, tmp_path):
+        project = _project(tmp_path)
+        with Catalog(tmp_path / "catalog.db") as catalog:
+            catalog.refresh(project)
+            later = time.time() + 10
+            os.utime(project.rpp_path, (later, later))
+            with patch("reaper_preview.catalog.parse_metadata") as mock_parse:
+                assert catalog.refresh(project) is False
+            mock_parse.assert_not_called()
+            assert catalog.is_current(project.rpp_path)
+
+    def test_refresh_changed_file_is_reparsed(self, tmp_path):
+        project = _project(tmp_path)
+        with Catalog(tmp_path / "catalog.db") as catalog:
+            catalog.refresh(project)
+            project.rpp_path.write_text(SONG_RPP.replace("TEMPO 90", "TEMPO 140"))
+            assert catalog.refresh(project) is True
+            assert catalog.get(project.rpp_path)["tempo"] == 140.0
+
+    def test_prune_removes_missing_projects(self, tmp_path):
+        project = _project(tmp_path)
+        with Catalog(tmp_path / "catalog.db") as catalog:
+            catalog.refresh(project)
+            assert catalog.prune([]) == 1
+            assert catalog.get(project.rpp_path) is None
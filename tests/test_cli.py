@@ -3,10 +3,19 @@
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import pytest
 from click.testing import CliRunner
 
 from reaper_preview.cli import main
 from reaper_preview.render import RenderError
+from tests.wav_helpers import write_mp3
+
+
+@pytest.fixture(autouse=True)
+def _keep_test_priority():
+    """main lowers the priority of its own process, which would be the test runner."""
+    with patch("reaper_preview.cli.set_nice"), patch("reaper_preview.cli.set_io_priority"):
+        yield
 
 
 class TestCLI:
@@ -85,6 +94,29 @@ class TestCLI:
 
         assert result.exit_code == 0
 
+    def test_serve_help(self):
+        runner = CliRunner()
+        result = runner.invoke(main, ["serve", "--help"])
+        assert result.exit_code == 0
+        assert "--cache-dir" in result.output
+        assert "--port" in result.output
+
+    def test_dry_run_fills_catalog(self, tmp_path):
+        import sqlite3
+
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT\n  TEMPO 100 4 4\n>\n")
+        catalog = tmp_path / "catalog.db"
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["--input-dir", str(tmp_path), "--dry-run", "--catalog", str(catalog)]
+        )
+
+        assert result.exit_code == 0
+        assert "1 project updated" in result.output
+        rows = sqlite3.connect(catalog).execute("SELECT name, tempo FROM projects").fetchall()
+        assert rows == [("song", 100.0)]
+
     def test_rejects_invalid_format(self, tmp_path):
         runner = CliRunner()
         result = runner.invoke(
@@ -107,7 +139,7 @@ class TestCLIIntegration:
         runner = CliRunner()
         with patch("reaper_preview.cli.render_project") as mock_render:
             # Mock render to return expected output paths
-            def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout):
+            def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout, **kwargs):
                 output_file = output_dir / f"{filename}.{audio_format}"
                 output_file.parent.mkdir(parents=True, exist_ok=True)
                 output_file.write_text("fake audio")
@@ -160,7 +192,7 @@ class TestCLIIntegration:
         runner = CliRunner()
         with patch("reaper_preview.cli.render_project") as mock_render:
 
-            def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300):
+            def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
                 # Fail on song2, succeed on others
                 if "song2" in filename:
                     raise RenderError("Simulated render failure")
@@ -221,8 +253,7 @@ class TestCLIIntegration:
 
         output_dir = tmp_path / "previews"
         output_dir.mkdir()
-        preview = output_dir / "song.mp3"
-        preview.write_text("existing preview")
+        preview = write_mp3(output_dir / "song.mp3", 30.0)
 
         # Make preview newer than RPP
         old_time = time.time() - 100
@@ -243,6 +274,63 @@ class TestCLIIntegration:
         mock_render.assert_not_called()
         assert "Skipping" in result.output or "skipping" in result.output
 
+    def test_rerenders_empty_preview(self, tmp_path):
+        """A 0-byte file left by an interrupted render is not a preview."""
+        import os
+        import time
+
+        rpp_file = tmp_path / "song.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        output_dir.mkdir()
+        preview = output_dir / "song.mp3"
+        preview.write_bytes(b"")
+        old_time = time.time() - 100
+        os.utime(rpp_file, (old_time, old_time))
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", return_value=preview) as mock_render:
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        mock_render.assert_called_once()
+        assert mock_render.call_args.kwargs["expected_duration"] == 30.0
+
+    def test_rerenders_truncated_preview(self, tmp_path):
+        """A partial file left by an earlier crash is caught from its headers."""
+        import os
+        import time
+
+        rpp_file = tmp_path / "song.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        output_dir.mkdir()
+        preview = output_dir / "song.mp3"
+        preview.write_bytes(b"ID3\x04" + bytes(28))
+        old_time = time.time() - 100
+        os.utime(rpp_file, (old_time, old_time))
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", return_value=preview) as mock_render:
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        mock_render.assert_called_once()
+
     def test_force_rerenders_existing_preview(self, tmp_path):
         """With --force, re-render even if preview exists."""
         import os
@@ -253,8 +341,7 @@ class TestCLIIntegration:
 
         output_dir = tmp_path / "previews"
         output_dir.mkdir()
-        preview = output_dir / "song.mp3"
-        preview.write_text("existing preview")
+        preview = write_mp3(output_dir / "song.mp3", 30.0)
 
         # Make preview newer than RPP
         old_time = time.time() - 100
@@ -391,3 +478,1095 @@ class TestCLIIntegration:
             )
 
         mock_render.assert_called_once()
+
+    def test_writes_report_and_gallery(self, tmp_path):
+        import json
+
+        (tmp_path / "song1.rpp").write_text("<REAPER_PROJECT>")
+        (tmp_path / "song2.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+        gallery = tmp_path / "gallery"
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project") as mock_render:
+
+            def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+                if filename == "song2":
+                    raise RenderError("Simulated render failure")
+                output_file = output_dir / f"{filename}.{audio_format}"
+                output_file.write_text("fake audio")
+                return output_file
+
+            mock_render.side_effect = fake_render
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--report", str(report),
+                    "--gallery", str(gallery),
+                ],
+            )
+
+        assert result.exit_code == 0
+        data = json.loads(report.read_text())
+        assert data["summary"] == {"rendered": 1, "skipped": 0, "failed": 1}
+        statuses = {p["name"]: p["status"] for p in data["projects"]}
+        assert statuses == {"song1": "rendered", "song2": "failed"}
+        assert (gallery / "index.html").exists()
+
+    def _rpp_with_instrument(self, tmp_path):
+        (tmp_path / "song.rpp").write_text(
+            '<REAPER_PROJECT 0.1 "7.0"\n'
+            '  <TRACK\n'
+            '    <FXCHAIN\n'
+            '      <VST "VSTi: Kontakt (Native Instruments)" Kontakt.dll 0 ""\n'
+            '      >\n'
+            '    >\n'
+            '  >\n'
+            '>\n'
+        )
+        resource_dir = tmp_path / "REAPER"
+        resource_dir.mkdir()
+        (resource_dir / "reaper-vstplugins64.ini").write_text("[vstcache]\nreacomp.dll=0,1,ReaComp (Cockos)\n")
+        return resource_dir
+
+    def test_missing_instrument_skipped_by_policy(self, tmp_path):
+        resource_dir = self._rpp_with_instrument(tmp_path)
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project") as mock_render:
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(tmp_path / "previews"),
+                    "--reaper-bin", "reaper",
+                    "--resource-dir", str(resource_dir),
+                    "--missing-plugins", "skip",
+                ],
+            )
+
+        assert result.exit_code == 0
+        mock_render.assert_not_called()
+        assert "Missing instruments: VSTi: Kontakt (Native Instruments)" in result.output
+        assert "1 skipped" in result.output
+        assert "failed" not in result.output
+
+    def test_missing_instrument_rendered_with_warning(self, tmp_path):
+        resource_dir = self._rpp_with_instrument(tmp_path)
+        output_dir = tmp_path / "previews"
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project") as mock_render:
+            mock_render.return_value = output_dir / "song.mp3"
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--resource-dir", str(resource_dir),
+                ],
+            )
+
+        assert result.exit_code == 0
+        mock_render.assert_called_once()
+        assert "Missing instruments" in result.output
+        assert "Projects with missing instruments: song" in result.output
+
+    def test_check_audio_retries_silent_preview(self, tmp_path):
+        import json
+
+        import numpy as np
+
+        from tests.wav_helpers import sine, write_wav
+
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+        outputs = [np.zeros((44100, 2)), sine(1.0)]
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            return write_wav(output_dir / f"{filename}.wav", outputs.pop(0))
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render) as mock_render:
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--format", "wav",
+                    "--check-audio",
+                    "--on-silent", "retry",
+                    "--report", str(report),
+                ],
+            )
+
+        assert result.exit_code == 0
+        assert mock_render.call_count == 2
+        assert "rendering again" in result.output
+        audio = json.loads(report.read_text())["projects"][0]["audio"]
+        assert audio["silent"] is False
+
+    def test_check_audio_flags_silent_preview(self, tmp_path):
+        import numpy as np
+
+        from tests.wav_helpers import write_wav
+
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            return write_wav(output_dir / f"{filename}.wav", np.zeros((44100, 2)))
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render) as mock_render:
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--format", "wav",
+                    "--check-audio",
+                ],
+            )
+
+        assert result.exit_code == 0
+        mock_render.assert_called_once()
+        assert "Preview is silent" in result.output
+        assert "Silent previews: song" in result.output
+
+    def test_multiple_formats_render_once_and_encode(self, tmp_path, monkeypatch):
+        import json
+
+        from tests.wav_helpers import sine, write_wav
+
+        # Stand-in ffmpeg that copies its input to the destination
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        ffmpeg = bin_dir / "ffmpeg"
+        ffmpeg.write_text(
+            '#!/bin/sh\n'
+            'while [ $# -gt 1 ]; do [ "$1" = "-i" ] && src="$2"; shift; done\n'
+            'cp "$src" "$1"\n'
+        )
+        ffmpeg.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}:/usr/bin:/bin")
+
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+        formats = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            formats.append(audio_format)
+            return write_wav(output_dir / f"{filename}.{audio_format}", sine(1.0))
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--format", "mp3,flac",
+                    "--report", str(report),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert formats == ["wav"]
+        assert (output_dir / "song.mp3").exists()
+        assert (output_dir / "song.flac").exists()
+        # The master was not requested, so it is not kept
+        assert not (output_dir / "song.wav").exists()
+        assert not list((output_dir / ".reaper-preview" / "masters").iterdir())
+        project = json.loads(report.read_text())["projects"][0]
+        assert project["status"] == "rendered"
+        assert project["output_path"] == str(output_dir / "song.mp3")
+        assert set(project["outputs"]) == {"mp3", "flac"}
+
+    def test_preview_quality_mp3_is_encoded_with_preset_settings(self, tmp_path, monkeypatch):
+        from tests.wav_helpers import sine, write_wav
+
+        # Stand-in ffmpeg that records its arguments and copies its input
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        ffmpeg = bin_dir / "ffmpeg"
+        args_file = tmp_path / "ffmpeg-args"
+        ffmpeg.write_text(
+            '#!/bin/sh\n'
+            f'echo "$@" > "{args_file}"\n'
+            'while [ $# -gt 1 ]; do [ "$1" = "-i" ] && src="$2"; shift; done\n'
+            'cp "$src" "$1"\n'
+        )
+        ffmpeg.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}:/usr/bin:/bin")
+
+        (tmp_path / "song.rpp").write_text('<REAPER_PROJECT 0.1 "6.0"\n>\n')
+        output_dir = tmp_path / "previews"
+        renders = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            renders.append((audio_format, Path(rpp_path).read_text()))
+            return write_wav(output_dir / f"{filename}.{audio_format}", sine(1.0))
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--missing-plugins", "ignore",
+                    "--quality", "preview",
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        [(audio_format, rpp_text)] = renders
+        # Reaper renders a mono 32 kHz master; the MP3 settings go to the encoder
+        assert audio_format == "wav"
+        assert "  RENDER_FMT 0 1 32000\n" in rpp_text
+        args = args_file.read_text().split()
+        assert args[args.index("-b:a") + 1] == "96k"
+        assert args[args.index("-ac") + 1] == "1"
+        assert (output_dir / "song.mp3").exists()
+
+    def test_preview_quality_mp3_rendered_directly_without_encoder(self, tmp_path, monkeypatch):
+        empty_bin = tmp_path / "bin"
+        empty_bin.mkdir()
+        monkeypatch.setenv("PATH", str(empty_bin))
+
+        (tmp_path / "song.rpp").write_text('<REAPER_PROJECT 0.1 "6.0"\n>\n')
+        output_dir = tmp_path / "previews"
+        renders = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            renders.append((audio_format, Path(rpp_path).read_text()))
+            return write_mp3(output_dir / f"{filename}.{audio_format}", 30.0)
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--missing-plugins", "ignore",
+                    "--quality", "preview",
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert "Warning: No installed encoder" in result.output
+        [(audio_format, rpp_text)] = renders
+        assert audio_format == "mp3"
+        assert "  RENDER_FMT 0 1 32000\n" in rpp_text
+        assert "bDNwbQ==" in rpp_text
+        assert (output_dir / "song.mp3").exists()
+
+    def test_multiple_formats_skip_only_when_all_exist(self, tmp_path):
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        output_dir.mkdir()
+        (output_dir / "song.wav").write_bytes(b"RIFF")
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=RenderError("boom")) as mock_render, \
+                patch("reaper_preview.cli.get_encoder"):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--format", "wav,mp3",
+                ],
+            )
+
+        assert mock_render.called
+        assert "1 failed" in result.output
+
+    def test_rejects_unknown_format_in_list(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(main, ["--input-dir", str(tmp_path), "--format", "wav,aiff", "--dry-run"])
+        assert result.exit_code != 0
+        assert "Invalid value" in result.output
+
+    def test_segments_render_in_one_launch_and_report_each(self, tmp_path):
+        import json
+
+        import numpy as np
+
+        from tests.wav_helpers import sine, write_wav
+
+        (tmp_path / "song.rpp").write_text('<REAPER_PROJECT 0.1 "6.0"\n>\n')
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+
+        def fake_render(rpp_path, output_dir, filename, segment_names, audio_format, reaper_bin, timeout=300, **kwargs):
+            assert 'RENDER_PATTERN "song-$region"' in Path(rpp_path).read_text()
+            audio = {"01": sine(1.0), "02": np.zeros((44100, 2))}
+            return [write_wav(output_dir / f"{filename}-{name}.wav", audio[name]) for name in segment_names]
+
+        runner = CliRunner()
+        args = [
+            "--input-dir", str(tmp_path),
+            "--output-dir", str(output_dir),
+            "--reaper-bin", "reaper",
+            "--format", "wav",
+            "--segments", "0:30,60:90",
+            "--check-audio",
+            "--report", str(report),
+        ]
+        with patch("reaper_preview.cli.render_segments", side_effect=fake_render) as mock_render:
+            result = runner.invoke(main, args)
+
+        assert result.exit_code == 0, result.output
+        assert mock_render.call_count == 1
+        projects = json.loads(report.read_text())["projects"]
+        assert [p["name"] for p in projects] == ["song-01", "song-02"]
+        assert projects[1]["segment"] == {"name": "02", "start": 60.0, "end": 90.0}
+        assert projects[0]["audio"]["silent"] is False
+        assert "Preview is silent" in projects[1]["warnings"]
+
+        # Up-to-date segments are skipped on the next run
+        with patch("reaper_preview.cli.render_segments") as mock_render:
+            result = runner.invoke(main, args)
+        assert not mock_render.called
+        assert [p["status"] for p in json.loads(report.read_text())["projects"]] == ["skipped", "skipped"]
+
+    def test_region_segments_in_gallery_and_skip_check(self, tmp_path):
+        import json
+
+        from tests.wav_helpers import sine, write_wav
+
+        regions = '  MARKER 1 0 Intro 1 0 1 R\n  MARKER 1 10 "" 1\n  MARKER 2 20 Chorus 1 0 1 R\n  MARKER 2 30 "" 1\n'
+        (tmp_path / "song.rpp").write_text(f'<REAPER_PROJECT 0.1 "6.0"\n{regions}>\n')
+        (tmp_path / "song-2019.rpp").write_text('<REAPER_PROJECT 0.1 "6.0"\n>\n')
+        output_dir = tmp_path / "previews"
+        gallery = tmp_path / "gallery"
+        report = tmp_path / "report.json"
+
+        def fake_segments(rpp_path, output_dir, filename, segment_names, audio_format, reaper_bin, **kwargs):
+            return [write_wav(output_dir / f"{filename}-{name}.wav", sine(1.0)) for name in segment_names]
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, **kwargs):
+            return write_wav(output_dir / f"{filename}.wav", sine(1.0))
+
+        runner = CliRunner()
+        args = [
+            "--input-dir", str(tmp_path),
+            "--output-dir", str(output_dir),
+            "--reaper-bin", "reaper",
+            "--missing-plugins", "ignore",
+            "--format", "wav",
+            "--segments", "regions",
+            "--gallery", str(gallery),
+            "--report", str(report),
+        ]
+        for _ in range(2):
+            with patch("reaper_preview.cli.render_segments", side_effect=fake_segments), \
+                    patch("reaper_preview.cli.render_project", side_effect=fake_render):
+                result = runner.invoke(main, args)
+            assert result.exit_code == 0, result.output
+
+            # The second run skips everything; song-2019 is not a segment of song
+            projects = json.loads(report.read_text())["projects"]
+            assert sorted(p["name"] for p in projects) == ["song-01-Intro", "song-02-Chorus", "song-2019"]
+            entries = json.loads((gallery / "gallery.json").read_text())["entries"].values()
+            assert sorted(e["name"] for e in entries) == ["song-01-Intro", "song-02-Chorus", "song-2019"]
+
+    def test_rejects_invalid_segments(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(main, ["--input-dir", str(tmp_path), "--segments", "30:10", "--dry-run"])
+        assert result.exit_code != 0
+        assert "Invalid value" in result.output
+
+    def test_peaks_and_sparklines_follow_the_preview(self, tmp_path):
+        import json
+
+        from tests.wav_helpers import sine, write_wav
+
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            return write_wav(output_dir / f"{filename}.wav", sine(1.0))
+
+        runner = CliRunner()
+        args = [
+            "--input-dir", str(tmp_path),
+            "--output-dir", str(output_dir),
+            "--reaper-bin", "reaper",
+            "--format", "wav",
+            "--peaks", "dat",
+            "--sparklines",
+            "--report", str(report),
+        ]
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(main, args)
+
+        assert result.exit_code == 0, result.output
+        project = json.loads(report.read_text())["projects"][0]
+        assert project["peaks"] == str(output_dir / "song.peaks.dat")
+        assert project["sparkline"] == str(output_dir / "song.png")
+        assert (output_dir / "song.png").exists()
+
+        # Missing peaks of an up-to-date WAV preview are redrawn without rendering
+        (output_dir / "song.peaks.dat").unlink()
+        with patch("reaper_preview.cli.render_project") as mock_render:
+            result = runner.invoke(main, args)
+        assert not mock_render.called
+        assert "Skipping" in result.output
+        assert (output_dir / "song.peaks.dat").exists()
+
+    def test_relocate_media_rewrites_missing_references(self, tmp_path):
+        import json
+
+        library = tmp_path / "library"
+        (library / "moved" / "Audio").mkdir(parents=True)
+        (library / "moved" / "Audio" / "kick.wav").write_bytes(b"kick")
+        (library / "song.rpp").write_text(
+            '<REAPER_PROJECT 0.1 "6.0"\n  <SOURCE WAVE\n    FILE "/gone/Audio/kick.wav"\n  >\n>\n'
+        )
+        output_dir = tmp_path / "previews"
+        seen = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            seen.append(Path(rpp_path).read_text())
+            output = output_dir / f"{filename}.mp3"
+            output.write_text("fake")
+            return output
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(library),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--relocate-media",
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert "Indexed 1 media file." in result.output
+        assert "Relocated 1 missing media file" in result.output
+        assert f'FILE "{(library / "moved" / "Audio" / "kick.wav").as_posix()}"' in seen[0]
+        index = json.loads((output_dir / ".reaper-preview" / "media-index.json").read_text())
+        assert list(index["files"]) == [str(library / "moved" / "Audio" / "kick.wav")]
+
+    def test_bypass_fx_rewrites_temp_rpp_and_reports(self, tmp_path):
+        import json
+
+        (tmp_path / "song.rpp").write_text(
+            '<REAPER_PROJECT 0.1 "7.0"\n'
+            '  <MASTERFXLIST\n'
+            '    BYPASS 0 0 0\n'
+            '    <VST "VST3: Pro-L 2 (FabFilter)" "FabFilter Pro-L 2.vst3" 0 ""\n'
+            '    >\n'
+            '  >\n'
+            '  <TRACK\n'
+            '    <FXCHAIN\n'
+            '      BYPASS 0 0 0\n'
+            '      <VST "VST: ValhallaRoom (Valhalla DSP)" ValhallaRoom.dll 0 ""\n'
+            '      >\n'
+            '    >\n'
+            '  >\n'
+            '>\n'
+        )
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+        seen = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            seen.append(Path(rpp_path).read_text())
+            output = output_dir / f"{filename}.mp3"
+            output.write_text("fake")
+            return output
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--missing-plugins", "ignore",
+                    "--bypass-fx", "valhalla",
+                    "--drop-master-fx",
+                    "--report", str(report),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert "Bypassed 2 FX: Master: Pro-L 2 (FabFilter), ValhallaRoom (Valhalla DSP)" in result.output
+        assert "MASTERFXLIST" not in seen[0]
+        assert "BYPASS 1 1 0" in seen[0]
+        project = json.loads(report.read_text())["projects"][0]
+        assert project["bypassed_fx"] == ["Master: Pro-L 2 (FabFilter)", "ValhallaRoom (Valhalla DSP)"]
+
+    def test_tracks_render_subset_and_fail_without_match(self, tmp_path):
+        import json
+
+        track = '  <TRACK\n    NAME {}\n    MUTESOLO 0 0 0\n  >\n'
+        (tmp_path / "a.rpp").write_text('<REAPER_PROJECT 0.1 "7.0"\n' + track.format("Drums") + track.format("Keys") + '>\n')
+        (tmp_path / "b.rpp").write_text('<REAPER_PROJECT 0.1 "7.0"\n' + track.format("Keys") + '>\n')
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+        seen = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            seen.append(Path(rpp_path).read_text())
+            output = output_dir / f"{filename}.mp3"
+            output.write_text("fake")
+            return output
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--missing-plugins", "ignore",
+                    "--tracks", "drum",
+                    "--report", str(report),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert "Tracks: Drums (1 dropped)" in result.output
+        assert len(seen) == 1
+        assert "Keys" not in seen[0]
+        projects = {p["name"]: p for p in json.loads(report.read_text())["projects"]}
+        assert projects["a"]["tracks"] == ["Drums"]
+        assert projects["b"]["status"] == "failed"
+        assert "No track matches" in projects["b"]["error"]
+
+    def test_stage_dir_points_temp_rpp_at_local_copies(self, tmp_path):
+        (tmp_path / "song").mkdir()
+        (tmp_path / "song" / "kick.wav").write_bytes(b"RIFF")
+        (tmp_path / "song" / "song.rpp").write_text(
+            '<REAPER_PROJECT\n  <SOURCE WAVE\n    FILE "kick.wav"\n  >\n>\n'
+        )
+        output_dir = tmp_path / "previews"
+        stage_dir = tmp_path / "stage"
+        seen = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            seen.append(Path(rpp_path).read_text())
+            output = output_dir / f"{filename}.mp3"
+            output.write_text("fake")
+            return output
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path / "song"),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--missing-plugins", "ignore",
+                    "--stage-dir", str(stage_dir),
+                    "--stage-size", "1M",
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert "Staged 1 media file locally" in result.output
+        staged = next(stage_dir.glob("*/kick.wav"))
+        assert f'FILE "{staged}"' in seen[0]
+        assert (stage_dir / "staging-index.json").exists()
+
+    def test_quarantines_project_that_keeps_failing(self, tmp_path):
+        (tmp_path / "broken.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        args = [
+            "--input-dir", str(tmp_path),
+            "--output-dir", str(output_dir),
+            "--reaper-bin", "reaper",
+            "--missing-plugins", "ignore",
+            "--quarantine-after", "2",
+        ]
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=RenderError("timed out")) as mock_render:
+            runner.invoke(main, args)
+            result = runner.invoke(main, args)
+            assert "Quarantined after 2 failures" in result.output
+            result = runner.invoke(main, args)
+        assert mock_render.call_count == 2
+        assert "Skipping (quarantined after 2 failures: timed out)" in result.output
+
+        result = runner.invoke(main, ["quarantine", "list", "--output-dir", str(output_dir)])
+        assert str(tmp_path / "broken.rpp") in result.output
+        assert "2 failures" in result.output
+
+        # Saving the project releases it
+        (tmp_path / "broken.rpp").write_text("<REAPER_PROJECT 0.1>")
+        with patch("reaper_preview.cli.render_project", side_effect=RenderError("timed out")) as mock_render:
+            runner.invoke(main, args)
+        mock_render.assert_called_once()
+
+        result = runner.invoke(main, ["quarantine", "clear", "--output-dir", str(output_dir)])
+        assert "Released 0 projects." in result.output
+        result = runner.invoke(main, ["quarantine", "list", "--output-dir", str(output_dir)])
+        assert "No projects are quarantined." in result.output
+
+    def test_time_budget_defers_projects_to_the_next_run(self, tmp_path):
+        import json
+
+        for name in ("a", "b", "c"):
+            (tmp_path / f"{name}.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+        rendered = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            rendered.append(filename)
+            output = output_dir / f"{filename}.mp3"
+            output.write_text("fake")
+            return output
+
+        args = ["--input-dir", str(tmp_path), "--output-dir", str(output_dir), "--reaper-bin", "reaper",
+                "--missing-plugins", "ignore", "--report", str(report)]
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(main, args + ["--time-budget", "0s"])
+            assert result.exit_code == 0, result.output
+            assert "3 deferred" in result.output
+            assert [p["status"] for p in json.loads(report.read_text())["projects"]] == ["deferred"] * 3
+
+            # The next run starts with the deferred projects
+            (tmp_path / "d.rpp").write_text("<REAPER_PROJECT>")
+            result = runner.invoke(main, args)
+        assert result.exit_code == 0, result.output
+        assert rendered == ["a", "b", "c", "d"]
+        assert "[4/4] d..." in result.output
+
+    def test_deferred_projects_found_from_another_directory(self, tmp_path, monkeypatch):
+        library = tmp_path / "lib"
+        library.mkdir()
+        for name in ("a", "b"):
+            (library / f"{name}.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        rendered = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            rendered.append(filename)
+            return write_mp3(output_dir / f"{filename}.mp3", 30.0)
+
+        args = ["--output-dir", str(output_dir), "--reaper-bin", "reaper", "--missing-plugins", "ignore"]
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            monkeypatch.chdir(tmp_path)
+            result = runner.invoke(main, [*args, "--input-dir", "lib", "--time-budget", "0s"])
+            assert "2 deferred" in result.output
+
+            # Sorts first, but the deferred projects still go before it
+            (library / "0.rpp").write_text("<REAPER_PROJECT>")
+            monkeypatch.chdir(library)
+            result = runner.invoke(main, [*args, "--input-dir", "."])
+        assert result.exit_code == 0, result.output
+        assert rendered == ["a", "b", "0"]
+
+    def test_on_deadline_kill_stops_render_and_defers(self, tmp_path):
+        import json
+
+        from reaper_preview.render import RenderTimeoutError
+
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+        timeouts = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            timeouts.append(timeout)
+            raise RenderTimeoutError("Render timed out")
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--missing-plugins", "ignore",
+                    "--time-budget", "2m",
+                    "--on-deadline", "kill",
+                    "--report", str(report),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert 100 < timeouts[0] <= 120
+        assert "Deferred (stopped at the end of the time budget)" in result.output
+        assert json.loads(report.read_text())["projects"][0]["status"] == "deferred"
+
+    def test_project_killed_at_deadline_is_rendered_next_run(self, tmp_path):
+        import subprocess
+        import sys
+
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        preview = output_dir / "song.mp3"
+        real_popen = subprocess.Popen
+
+        def hanging_reaper(cmd, **kwargs):
+            # Writes the start of the preview, then runs past the deadline
+            script = f"import time; open({str(preview)!r}, 'wb').write(bytes(32)); time.sleep(30)"
+            return real_popen([sys.executable, "-c", script], **kwargs)
+
+        args = [
+            "--input-dir", str(tmp_path),
+            "--output-dir", str(output_dir),
+            "--reaper-bin", "reaper",
+            "--missing-plugins", "ignore",
+        ]
+        runner = CliRunner()
+        with patch("subprocess.Popen", side_effect=hanging_reaper):
+            result = runner.invoke(main, [*args, "--time-budget", "2", "--on-deadline", "kill"])
+        assert result.exit_code == 0, result.output
+        assert "Deferred (stopped at the end of the time budget)" in result.output
+        assert not preview.exists()
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            return write_mp3(output_dir / f"{filename}.mp3", 30.0)
+
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render) as mock_render:
+            result = runner.invoke(main, args)
+        assert result.exit_code == 0, result.output
+        mock_render.assert_called_once()
+        assert "Completed: 1 successful" in result.output
+
+    def test_render_finished_before_deadline_is_timed(self, tmp_path):
+        import json
+
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        timeouts = []
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            timeouts.append(timeout)
+            return write_mp3(output_dir / f"{filename}.mp3", 30.0)
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--missing-plugins", "ignore",
+                    "--time-budget", "2m",
+                    "--on-deadline", "kill",
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        # Clamped to the deadline, but finished: its time is the project's estimate
+        assert timeouts[0] <= 120
+        estimates = json.loads((output_dir / ".reaper-preview" / "schedule.json").read_text())["estimates"]
+        assert list(estimates) == [str((tmp_path / "song.rpp").resolve())]
+
+    def test_rejects_invalid_time_budget(self, tmp_path):
+        result = CliRunner().invoke(main, ["--input-dir", str(tmp_path), "--time-budget", "6 hours"])
+        assert result.exit_code != 0
+        assert "is not a duration" in result.output
+
+    def test_pipeline_renders_while_discovering(self, tmp_path):
+        import json
+
+        for name in ("b", "a", "c"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / f"{name}.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            output = output_dir / f"{filename}.mp3"
+            output.write_text("fake")
+            return output
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--missing-plugins", "ignore",
+                    "--pipeline",
+                    "--report", str(report),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert "Rendering projects as they are found" in result.output
+        assert "Discovery finished: 3 projects found." in result.output
+        assert "Completed: 3 successful" in result.output
+        # The report keeps the usual order
+        assert [p["name"] for p in json.loads(report.read_text())["projects"]] == ["a", "b", "c"]
+
+    def test_jobs_render_concurrently_in_separate_instances(self, tmp_path):
+        import json
+        import threading
+
+        for name in ("a", "b", "c", "d"):
+            (tmp_path / f"{name}.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+        lock = threading.Lock()
+        running = {"now": 0, "max": 0}
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            with lock:
+                running["now"] += 1
+                running["max"] = max(running["max"], running["now"])
+            barrier.wait()
+            with lock:
+                running["now"] -= 1
+            output = output_dir / f"{filename}.mp3"
+            output.write_text("fake")
+            return output
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render) as mock_render:
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--resource-dir", str(tmp_path),
+                    "--missing-plugins", "ignore",
+                    "--jobs", "2",
+                    "--report", str(report),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert running["max"] == 2
+        assert "using --isolated-profile" in result.output
+        assert all("cfgfile" in c.kwargs for c in mock_render.call_args_list)
+        assert [p["name"] for p in json.loads(report.read_text())["projects"]] == ["a", "b", "c", "d"]
+        # Each project's lines stay together
+        for name in "abcd":
+            assert f"] {name}...\n  ✓ Rendered: {name}.mp3\n" in result.output
+
+    def test_concurrent_renders_pinned_to_disjoint_cores(self, tmp_path):
+        import threading
+
+        for name in ("a", "b"):
+            (tmp_path / f"{name}.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            barrier.wait()
+            output = output_dir / f"{filename}.mp3"
+            output.write_text("fake")
+            return output
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render) as mock_render, \
+             patch("reaper_preview.cli.available_cpus", return_value=[0, 1, 2, 3]), \
+             patch("reaper_preview.cli.set_nice") as mock_nice, \
+             patch("reaper_preview.cli.set_io_priority") as mock_ionice:
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--resource-dir", str(tmp_path),
+                    "--missing-plugins", "ignore",
+                    "--jobs", "2",
+                    "--ionice", "idle",
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert sorted(sorted(c.kwargs["cpus"]) for c in mock_render.call_args_list) == [[0, 1], [2, 3]]
+        mock_nice.assert_called_once_with(10)
+        mock_ionice.assert_called_once_with("idle", 0)
+
+    def test_dry_run_keeps_priority(self, tmp_path):
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+
+        with patch("reaper_preview.cli.set_nice") as mock_nice, \
+             patch("reaper_preview.cli.set_io_priority") as mock_ionice:
+            result = CliRunner().invoke(main, ["--input-dir", str(tmp_path), "--dry-run"])
+
+        assert result.exit_code == 0, result.output
+        mock_nice.assert_not_called()
+        mock_ionice.assert_not_called()
+
+    def test_rejects_invalid_ionice(self, tmp_path):
+        result = CliRunner().invoke(main, ["--input-dir", str(tmp_path), "--ionice", "best-effort:9"])
+        assert result.exit_code != 0
+        assert "is not none, idle" in result.output
+
+    def test_max_jobs_adapts_concurrency(self, tmp_path):
+        for name in ("a", "b"):
+            (tmp_path / f"{name}.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            kwargs["stats"].max_rss_kb = 500 * 1024
+            output = output_dir / f"{filename}.mp3"
+            output.write_text("fake")
+            return output
+
+        args = ["--input-dir", str(tmp_path), "--output-dir", str(output_dir), "--reaper-bin", "reaper",
+                "--missing-plugins", "ignore", "--isolated-profile"]
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render) as mock_render, \
+             patch("reaper_preview.cli.available_cpus", return_value=[0, 1, 2, 3]), \
+             patch("reaper_preview.cli.ensure_profile", return_value=tmp_path / "reaper.ini"):
+            result = runner.invoke(main, args + ["--max-jobs", "3"])
+            assert result.exit_code == 0, result.output
+            assert "Adapting concurrent renders to load and memory: 1 to 3" in result.output
+            assert "Concurrency: 1 to 1 renders allowed, 1 at most at once" in result.output
+            # A lone render under an adaptive limit may use every core
+            assert all("cpus" not in c.kwargs for c in mock_render.call_args_list)
+
+            result = runner.invoke(main, args + ["--min-jobs", "4", "--max-jobs", "3"])
+        assert result.exit_code == 1
+        assert "--min-jobs cannot be more than --max-jobs" in result.output
+
+    def test_isolated_profile_passed_to_every_launch(self, tmp_path):
+        import json
+
+        (tmp_path / "a.rpp").write_text("<REAPER_PROJECT>")
+        (tmp_path / "b.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, cfgfile=None, **kwargs):
+            output = output_dir / f"{filename}.mp3"
+            output.write_text("fake")
+            return output
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render) as mock_render:
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--resource-dir", str(tmp_path),
+                    "--missing-plugins", "ignore",
+                    "--isolated-profile",
+                    "--report", str(report),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        profile_ini = output_dir / ".reaper-preview" / "reaper-profile" / "reaper.ini"
+        assert profile_ini.exists()
+        assert [c.kwargs["cfgfile"] for c in mock_render.call_args_list] == [profile_ini, profile_ini]
+        assert "2 launches" in result.output
+        assert all(p["render_seconds"] is not None for p in json.loads(report.read_text())["projects"])
+
+    def test_normalize_runs_in_post_processing_pool(self, tmp_path):
+        import json
+
+        from tests.wav_helpers import sine, write_wav
+
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        report = tmp_path / "report.json"
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, **kwargs):
+            return write_wav(output_dir / f"{filename}.wav", sine(3.0, amplitude=0.05))
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--format", "wav",
+                    "--normalize", "-16",
+                    "--report", str(report),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        loudness = json.loads(report.read_text())["projects"][0]["loudness"]
+        assert loudness["gain_db"] > 0
+
+    def test_trace_records_lanes_and_project_steps(self, tmp_path):
+        import json
+        import time
+
+        from tests.wav_helpers import sine, write_wav
+
+        for name in ("a", "b"):
+            (tmp_path / f"{name}.rpp").write_text("<REAPER_PROJECT>")
+        output_dir = tmp_path / "previews"
+        trace = tmp_path / "trace.json"
+
+        def fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout=300, stats=None, **kwargs):
+            stats.spawned_ns = time.monotonic_ns()
+            output = write_wav(output_dir / f"{filename}.wav", sine(1.0, amplitude=0.05))
+            stats.exited_ns = time.monotonic_ns()
+            return output
+
+        runner = CliRunner()
+        with patch("reaper_preview.cli.render_project", side_effect=fake_render), \
+                patch("reaper_preview.cli.ensure_profile", return_value=tmp_path / "reaper.ini"):
+            result = runner.invoke(
+                main,
+                [
+                    "--input-dir", str(tmp_path),
+                    "--output-dir", str(output_dir),
+                    "--reaper-bin", "reaper",
+                    "--missing-plugins", "ignore",
+                    "--format", "wav",
+                    "--normalize", "-16",
+                    "--jobs", "2",
+                    "--trace", str(trace),
+                ],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert f"Trace written to {trace}" in result.output
+        events = json.loads(trace.read_text())
+        lanes = {e["tid"]: e["args"]["name"] for e in events if e["name"] == "thread_name"}
+        spans = [e for e in events if e["ph"] == "X"]
+        names = {e["name"] for e in spans}
+        assert {"discover", "a", "b", "prepare", "spawn", "render", "verify", "post-process"} <= names
+        assert {lanes[e["tid"]] for e in spans if e["name"] == "prepare"} <= {"render_0", "render_1"}
+        assert all(lanes[e["tid"]].startswith("post-process ") for e in spans if e["name"] == "post-process")
+        assert lanes[next(e["tid"] for e in spans if e["name"] == "discover")] == "discovery"
+        # Steps of a project nest inside its span, on the same lane
+        project = next(e for e in spans if e["name"] == "a")
+        render = next(e for e in spans if e["name"] == "render" and e["tid"] == project["tid"]
+                      and project["ts"] <= e["ts"] <= project["ts"] + project["dur"])
+        assert render["ts"] + render["dur"] <= project["ts"] + project["dur"] + 1
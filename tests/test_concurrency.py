@@ -0,0 +1,84 @@
+"""Tests for reaper_preview.concurrency module."""
+
+import threading
+
+from reaper_preview.concurrency import ADJUST_SECONDS, ConcurrencyController, read_loadavg, read_meminfo
+
+GB = 1024 * 1024
+
+
+class _System:
+    """Load, memory (KiB) and a clock the test moves by hand."""
+
+    def __init__(self, load=0.0, available=32 * GB, total=32 * GB):
+        self.load, self.available, self.total = load, available, total
+        self.now = 0.0
+
+    def controller(self, min_jobs=1, max_jobs=4):
+        return ConcurrencyController(
+            min_jobs, max_jobs, cpus=4,
+            read_load=lambda: self.load,
+            read_memory=lambda: (self.available, self.total),
+            clock=lambda: self.now,
+        )
+
+
+def test_readers(tmp_path):
+    (tmp_path / "loadavg").write_text("1.50 0.80 0.40 2/345 6789\n")
+    (tmp_path / "meminfo").write_text("MemTotal:       16000000 kB\nMemFree: 1 kB\nMemAvailable:    8000000 kB\n")
+    assert read_loadavg(tmp_path / "loadavg") == 1.5
+    assert read_meminfo(tmp_path / "meminfo") == (8000000, 16000000)
+    assert read_loadavg(tmp_path / "missing") is None
+    assert read_meminfo(tmp_path / "loadavg") is None
+
+
+class TestConcurrencyController:
+    def test_grows_while_idle_and_shrinks_under_load(self):
+        system = _System()
+        controller = system.controller()
+        tokens = [controller.acquire()]
+        assert controller.limit == 1
+
+        system.now += ADJUST_SECONDS
+        tokens.append(controller.acquire())
+        assert controller.limit == 2
+
+        system.load = 8.0
+        system.now += ADJUST_SECONDS
+        controller.release(tokens.pop())
+        controller._adjust((system.available, system.total))
+        assert controller.limit == 1
+        assert (controller.lowest, controller.highest) == (1, 2)
+
+    def test_does_not_grow_without_memory_for_a_typical_render(self):
+        system = _System(available=6 * GB)
+        controller = system.controller()
+        controller.release(controller.acquire(), rss_kb=4 * GB)
+        controller.acquire()
+
+        system.now += ADJUST_SECONDS
+        controller._adjust((system.available, system.total))
+        assert controller.limit == 1
+
+    def test_large_project_held_back_until_memory_is_free(self):
+        system = _System(available=20 * GB)
+        controller = system.controller(min_jobs=2, max_jobs=2)
+        small = controller.acquire(2 * GB)
+        system.now += 60  # its memory is now part of MemAvailable
+
+        started = threading.Event()
+
+        def large():
+            token = controller.acquire(24 * GB)
+            started.set()
+            controller.release(token)
+
+        thread = threading.Thread(target=large)
+        thread.start()
+        assert not started.wait(0.3)
+        assert controller.held_back == 1
+
+        # Alone, even a project that does not fit is started
+        controller.release(small)
+        assert started.wait(2)
+        thread.join()
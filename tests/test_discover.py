@@ -3,7 +3,7 @@
 import pytest
 from pathlib import Path
 
-from reaper_preview.discover import ProjectInfo, discover_projects
+from reaper_preview.discover import ProjectInfo, discover_projects, iter_projects
 
 
 class TestProjectInfo:
@@ -76,3 +76,26 @@ class TestDiscoverProjects:
         result = discover_projects(tmp_path)
         assert result[0].name == "alpha"
         assert result[1].name == "zebra"
+
+
+class TestIterProjects:
+    def test_yields_projects_lazily(self, tmp_path):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "one.rpp").touch()
+        (tmp_path / "b").mkdir()
+        (tmp_path / "b" / "two.rpp").touch()
+        (tmp_path / "b" / "two.rpp-bak").touch()
+
+        projects = iter_projects(tmp_path)
+        first = next(projects)
+        assert first.rpp_path.suffix == ".rpp"
+        rest = list(projects)
+        assert sorted(p.name for p in [first, *rest]) == ["one", "two"]
+
+    def test_skips_directories(self, tmp_path):
+        (tmp_path / "song.rpp").touch()
+        (tmp_path / "previews").mkdir()
+        (tmp_path / "previews" / "copy.rpp").touch()
+
+        projects = list(iter_projects(tmp_path, skip_dirs=[tmp_path / "previews"]))
+        assert [p.name for p in projects] == ["song"]
@@ -0,0 +1,109 @@
+"""Tests for reaper_preview.encode module."""
+
+import subprocess
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from reaper_preview.encode import (
+    ENCODERS,
+    EncodeError,
+    Encoder,
+    FfmpegEncoder,
+    LameEncoder,
+    get_encoder,
+    register_encoder,
+)
+from reaper_preview.render_cfg import Mp3Settings
+
+
+class TestGetEncoder:
+    def test_named_encoder(self):
+        assert isinstance(get_encoder("ffmpeg", ["mp3", "flac"]), FfmpegEncoder)
+
+    def test_named_encoder_must_support_formats(self):
+        with pytest.raises(EncodeError, match="cannot encode flac"):
+            get_encoder("lame", ["flac"])
+
+    def test_unknown_encoder(self):
+        with pytest.raises(EncodeError, match="Unknown encoder"):
+            get_encoder("sox", ["mp3"])
+
+    def test_auto_picks_installed_encoder(self):
+        def which(name):
+            return "/usr/bin/lame" if name == "lame" else None
+
+        with patch("reaper_preview.encode.shutil.which", side_effect=which):
+            assert isinstance(get_encoder("auto", ["mp3"]), LameEncoder)
+            with pytest.raises(EncodeError, match="No installed encoder"):
+                get_encoder("auto", ["flac"])
+
+    def test_register_encoder(self):
+        @register_encoder
+        class CopyEncoder(Encoder):
+            name = "copy-test"
+            executable = "cp"
+            formats = ("wav",)
+
+            def command(self, source, dest, audio_format):
+                return [self.executable, str(source), str(dest)]
+
+        try:
+            assert isinstance(get_encoder("copy-test", ["wav"]), CopyEncoder)
+        finally:
+            del ENCODERS["copy-test"]
+
+
+class TestEncode:
+    def test_ffmpeg_command(self, tmp_path):
+        cmd = FfmpegEncoder("ffmpeg").command(tmp_path / "a.wav", tmp_path / "a.flac", "flac")
+        assert cmd[0] == "ffmpeg"
+        assert cmd[cmd.index("-i") + 1] == str(tmp_path / "a.wav")
+        assert cmd[-3:] == ["-f", "flac", str(tmp_path / "a.flac")]
+
+    def test_mp3_settings(self, tmp_path):
+        preview = Mp3Settings(bitrate=96, mono=True)
+        cmd = FfmpegEncoder("ffmpeg", mp3=preview).command(tmp_path / "a.wav", tmp_path / "a.mp3", "mp3")
+        assert cmd[cmd.index("-b:a") + 1] == "96k"
+        assert cmd[cmd.index("-ac") + 1] == "1"
+        assert "-q:a" not in cmd
+        vbr = LameEncoder("lame", mp3=Mp3Settings(vbr_quality=3))
+        cmd = vbr.command(tmp_path / "a.wav", tmp_path / "a.mp3", "mp3")
+        assert cmd[cmd.index("-V") + 1] == "3"
+        assert "--cbr" not in cmd and "-m" not in cmd
+        cmd = get_encoder("lame", ["mp3"], mp3=preview).command(tmp_path / "a.wav", tmp_path / "a.mp3", "mp3")
+        assert cmd[cmd.index("-b") + 1] == "96"
+        assert cmd[cmd.index("-m") + 1] == "m"
+
+    def test_encode_writes_through_temp_file(self, tmp_path):
+        source = tmp_path / "a.wav"
+        source.write_bytes(b"RIFF")
+        dest = tmp_path / "a.mp3"
+
+        def fake_run(cmd, **kwargs):
+            Path(cmd[-1]).write_bytes(b"ID3")
+            return Mock(returncode=0, stderr=b"")
+
+        with patch("subprocess.run", side_effect=fake_run) as mock_run:
+            assert LameEncoder("lame").encode(source, dest, "mp3") == dest
+
+        assert Path(mock_run.call_args[0][0][-1]) != dest
+        assert dest.read_bytes() == b"ID3"
+        assert set(tmp_path.iterdir()) == {source, dest}
+
+    def test_encode_failure_raises(self, tmp_path):
+        dest = tmp_path / "a.mp3"
+        with patch("subprocess.run", return_value=Mock(returncode=1, stderr=b"bad input")):
+            with pytest.raises(EncodeError, match="bad input"):
+                LameEncoder("lame").encode(tmp_path / "a.wav", dest, "mp3")
+        assert not dest.exists()
+
+    def test_encode_timeout_raises(self, tmp_path):
+        with patch("subprocess.run", side_effect=subprocess.TimeoutExpired("lame", 1)):
+            with pytest.raises(EncodeError, match="timed out"):
+                LameEncoder("lame").encode(tmp_path / "a.wav", tmp_path / "a.mp3", "mp3", timeout=1)
+
+    def test_unsupported_format(self, tmp_path):
+        with pytest.raises(EncodeError):
+            LameEncoder("lame").encode(tmp_path / "a.wav", tmp_path / "a.flac", "flac")
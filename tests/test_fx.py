@@ -0,0 +1,91 @@
+"""Tests for reaper_preview.fx module."""
+
+from reaper_preview.fx import FxFilter, bypass_fx, load_fx_categories
+from reaper_preview.metadata import PluginRef
+
+FX_RPP = """\
+<REAPER_PROJECT 0.1 "7.0"
+  <MASTERFXLIST
+    BYPASS 0 0 0
+    <VST "VST3: Pro-L 2 (FabFilter)" "FabFilter Pro-L 2.vst3" 0 "" 1
+      bGltaXQ=
+    >
+    WAK 0 0
+  >
+  <TRACK
+    NAME "Vox"
+    <FXCHAIN
+      SHOW 0
+      BYPASS 0 0 0
+      <VST "VST: ReaEQ (Cockos)" reaeq.dll 0 "" 1
+        ZXE=
+      >
+      FXID {1}
+      BYPASS 0 0 0
+      <VST "VST: ValhallaRoom (Valhalla DSP)" ValhallaRoom.dll 0 "" 1
+        cm9vbQ==
+      >
+      FXID {2}
+      BYPASS 1 0 0
+      <JS "Liteon/convolution" ""
+        0 0 -
+      >
+      WAK 0 0
+    >
+  >
+>
+"""
+
+
+class TestFxFilter:
+    def test_plain_name_matches_anywhere_case_insensitive(self):
+        fx_filter = FxFilter(names=["valhalla"])
+        assert fx_filter.matches(PluginRef("VST", "VST: ValhallaRoom (Valhalla DSP)", "ValhallaRoom.dll"))
+        assert not fx_filter.matches(PluginRef("VST", "VST: ReaEQ (Cockos)", "reaeq.dll"))
+
+    def test_glob_matches_whole_name(self):
+        fx_filter = FxFilter(names=["rea*"])
+        assert fx_filter.matches(PluginRef("VST", "VST: ReaEQ (Cockos)", "reaeq.dll"))
+        assert not fx_filter.matches(PluginRef("VST", "VST: ValhallaRoom (Valhalla DSP)", "ValhallaRoom.dll"))
+
+    def test_category_matches_plugin_file(self, tmp_path):
+        (tmp_path / "reaper-fxtags.ini").write_text(
+            "[category]\nValhallaRoom.dll=Reverb|Delay\nreaeq.dll=EQ\n[developer]\nreaeq.dll=Cockos\n"
+        )
+        fx_filter = FxFilter(categories=["reverb"], fx_categories=load_fx_categories(tmp_path))
+        assert fx_filter.matches(PluginRef("VST", "VST: ValhallaRoom (Valhalla DSP)", "ValhallaRoom.dll"))
+        assert not fx_filter.matches(PluginRef("VST", "VST: ReaEQ (Cockos)", "reaeq.dll"))
+
+    def test_no_tags_file(self, tmp_path):
+        assert load_fx_categories(tmp_path) == {}
+
+    def test_empty_filter_is_false(self):
+        assert not FxFilter()
+        assert FxFilter(drop_master_fx=True)
+
+
+class TestBypassFx:
+    def test_bypasses_matching_plugins_and_reports_them(self):
+        bypassed = []
+        text = bypass_fx(FX_RPP, FxFilter(names=["valhalla", "convolution"]), bypassed)
+
+        lines = text.splitlines()
+        valhalla = next(i for i, line in enumerate(lines) if "ValhallaRoom" in line)
+        assert lines[valhalla - 1] == "      BYPASS 1 1 0"
+        reaeq = next(i for i, line in enumerate(lines) if "ReaEQ" in line)
+        assert lines[reaeq - 1] == "      BYPASS 0 0 0"
+        # The convolution was already bypassed by the user
+        assert bypassed == ["ValhallaRoom (Valhalla DSP)"]
+
+    def test_drops_master_fx_chain(self):
+        bypassed = []
+        text = bypass_fx(FX_RPP, FxFilter(drop_master_fx=True), bypassed)
+
+        assert "MASTERFXLIST" not in text
+        assert "Pro-L 2" not in text
+        assert '  <TRACK\n    NAME "Vox"' in text
+        assert text.endswith(">\n")
+        assert bypassed == ["Master: Pro-L 2 (FabFilter)"]
+
+    def test_leaves_text_unchanged_without_matches(self):
+        assert bypass_fx(FX_RPP, FxFilter(names=["nothing"])) == FX_RPP
@@ -0,0 +1,129 @@
+"""Tests for reaper_preview.gallery module."""
+
+import json
+
+from reaper_preview.gallery import INDEX_FILE, STATE_FILE, update_gallery
+from reaper_preview.report import FAILED, RENDERED, SKIPPED, ProjectResult
+
+
+def _results(tmp_path, names, status=SKIPPED, mtime=1000.0):
+    out = tmp_path / "previews"
+    return [
+        ProjectResult(
+            name=name,
+            rpp_path=tmp_path / "lib" / f"{name}.rpp",
+            status=status,
+            output_path=out / f"{name}.mp3",
+            output_mtime=mtime,
+        )
+        for name in names
+    ]
+
+
+def _pages(gallery_dir):
+    return sorted(gallery_dir.glob("page-*.html"))
+
+
+class TestUpdateGallery:
+    def test_first_run_writes_all_pages_and_index(self, tmp_path):
+        gallery = tmp_path / "gallery"
+        results = _results(tmp_path, [f"song{i}" for i in range(10)])
+
+        written = update_gallery(gallery, results, page_size=3)
+
+        pages = _pages(gallery)
+        assert len(pages) == 4
+        assert set(pages) | {gallery / INDEX_FILE} == set(written)
+        assert (gallery / STATE_FILE).exists()
+
+    def test_segments_of_a_project_are_separate_entries(self, tmp_path):
+        gallery = tmp_path / "gallery"
+        results = _results(tmp_path, ["song-01", "song-02"])
+        for result in results:
+            result.rpp_path = tmp_path / "lib" / "song.rpp"
+
+        update_gallery(gallery, results)
+
+        entries = json.loads((gallery / STATE_FILE).read_text())["entries"]
+        assert sorted(e["name"] for e in entries.values()) == ["song-01", "song-02"]
+
+    def test_every_project_appears_once(self, tmp_path):
+        gallery = tmp_path / "gallery"
+        names = [f"song{i}" for i in range(10)]
+        update_gallery(gallery, _results(tmp_path, names), page_size=3)
+
+        text = "".join(p.read_text() for p in _pages(gallery))
+        for name in names:
+            assert text.count(f">{name}<") == 1
+
+    def test_audio_is_lazy_loaded(self, tmp_path):
+        gallery = tmp_path / "gallery"
+        update_gallery(gallery, _results(tmp_path, ["song"]))
+
+        page = _pages(gallery)[0].read_text()
+        assert 'preload="none"' in page
+        assert "../previews/song.mp3" in page
+
+    def test_unchanged_run_writes_nothing(self, tmp_path):
+        gallery = tmp_path / "gallery"
+        results = _results(tmp_path, [f"song{i}" for i in range(10)])
+        update_gallery(gallery, results, page_size=3)
+
+        assert update_gallery(gallery, results, page_size=3) == []
+
+    def test_rendered_then_skipped_writes_nothing(self, tmp_path):
+        gallery = tmp_path / "gallery"
+        names = [f"song{i}" for i in range(10)]
+        update_gallery(gallery, _results(tmp_path, names, status=RENDERED), page_size=3)
+        state_mtime = (gallery / STATE_FILE).stat().st_mtime_ns
+
+        assert update_gallery(gallery, _results(tmp_path, names, status=SKIPPED), page_size=3) == []
+        assert (gallery / STATE_FILE).stat().st_mtime_ns == state_mtime
+
+    def test_only_changed_shard_rewritten(self, tmp_path):
+        gallery = tmp_path / "gallery"
+        names = [f"song{i}" for i in range(20)]
+        update_gallery(gallery, _results(tmp_path, names), page_size=5)
+
+        results = _results(tmp_path, names)
+        results[7] = _results(tmp_path, ["song7"], status=RENDERED, mtime=2000.0)[0]
+        written = update_gallery(gallery, results, page_size=5)
+
+        assert len(written) == 2  # one page plus the index
+        assert gallery / INDEX_FILE in written
+        changed = next(p for p in written if p.name.startswith("page-"))
+        assert ">song7<" in changed.read_text()
+
+    def test_removed_project_dropped(self, tmp_path):
+        gallery = tmp_path / "gallery"
+        update_gallery(gallery, _results(tmp_path, ["keep", "gone"]))
+        update_gallery(gallery, _results(tmp_path, ["keep"]))
+
+        text = "".join(p.read_text() for p in _pages(gallery))
+        assert ">keep<" in text
+        assert ">gone<" not in text
+
+    def test_failed_project_keeps_previous_preview(self, tmp_path):
+        gallery = tmp_path / "gallery"
+        update_gallery(gallery, _results(tmp_path, ["song"]))
+        failed = ProjectResult(
+            name="song",
+            rpp_path=tmp_path / "lib" / "song.rpp",
+            status=FAILED,
+            error="Rendering timed out",
+        )
+        update_gallery(gallery, [failed])
+
+        page = _pages(gallery)[0].read_text()
+        assert "song.mp3" in page
+        assert "Rendering timed out" in page
+
+    def test_shard_count_grows_when_library_grows(self, tmp_path):
+        gallery = tmp_path / "gallery"
+        update_gallery(gallery, _results(tmp_path, ["a", "b"]), page_size=2)
+        assert len(_pages(gallery)) == 1
+
+        update_gallery(gallery, _results(tmp_path, [f"s{i}" for i in range(9)]), page_size=2)
+        state = json.loads((gallery / STATE_FILE).read_text())
+        assert state["shards"] * 2 * 2 >= 9
+        assert len(_pages(gallery)) == state["shards"]
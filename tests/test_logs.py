@@ -0,0 +1,40 @@
+"""Tests for reaper_preview.logs module."""
+
+import gzip
+import io
+
+from reaper_preview.logs import LOG_DIR, read_tail, start_run_logs
+
+
+class TestStartRunLogs:
+    def test_compresses_earlier_runs_and_keeps_the_latest(self, tmp_path):
+        root = tmp_path / LOG_DIR
+        for name in ("20260101-000000", "20260102-000000", "20260103-000000"):
+            (root / name).mkdir(parents=True)
+            (root / name / "song.log").write_text(f"run {name}\n")
+
+        run_dir = start_run_logs(tmp_path, keep=3)
+
+        runs = sorted(path.name for path in root.iterdir())
+        assert runs == ["20260102-000000", "20260103-000000", run_dir.name]
+        assert not (root / "20260103-000000" / "song.log").exists()
+        with gzip.open(root / "20260103-000000" / "song.log.gz", "rt") as f:
+            assert f.read() == "run 20260103-000000\n"
+        assert list(run_dir.iterdir()) == []
+
+    def test_runs_in_the_same_second_get_their_own_directory(self, tmp_path):
+        first = start_run_logs(tmp_path)
+        second = start_run_logs(tmp_path)
+        assert first != second
+
+
+class TestReadTail:
+    def test_short_output_is_returned_whole(self):
+        assert read_tail(io.BytesIO(b"line 1\nline 2\n")) == "line 1\nline 2"
+
+    def test_long_output_starts_at_a_line(self):
+        data = b"".join(f"line {i}\n".encode() for i in range(1000))
+        tail = read_tail(io.BytesIO(data), limit=30)
+        assert tail.endswith("line 999")
+        assert tail.startswith("line 99")
+        assert len(tail) < 30
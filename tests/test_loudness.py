@@ -0,0 +1,78 @@
+"""Tests for reaper_preview.loudness module."""
+
+import math
+
+import numpy as np
+import pytest
+
+from tests.wav_helpers import sine, write_wav
+from reaper_preview.loudness import integrated_loudness, k_weighting, normalize_wav, true_peak
+from reaper_preview.wavfile import read_samples
+
+
+class TestKWeighting:
+    def test_matches_bs1770_coefficients_at_48k(self):
+        (b1, a1), (b2, a2) = k_weighting(48000)
+        assert b1 == pytest.approx([1.53512485958697, -2.69169618940638, 1.19839281085285])
+        assert a1 == pytest.approx([1.0, -1.69065929318241, 0.73248077421585])
+        assert b2 == pytest.approx([1.0, -2.0, 1.0])
+        assert a2 == pytest.approx([1.0, -1.99004745483398, 0.99007225036621])
+
+
+class TestIntegratedLoudness:
+    def test_full_scale_sine_in_one_channel(self):
+        # BS.1770 reference: a 0 dBFS 997 Hz sine in one channel reads -3.01 LKFS
+        audio = sine(5.0, sample_rate=48000, freq=997, amplitude=1.0, channels=2)
+        audio[:, 1] = 0.0
+        assert integrated_loudness(audio, 48000) == pytest.approx(-3.01, abs=0.05)
+
+    def test_level_change_shifts_loudness(self):
+        loud = integrated_loudness(sine(5.0, amplitude=0.5), 44100)
+        quiet = integrated_loudness(sine(5.0, amplitude=0.05), 44100)
+        assert loud - quiet == pytest.approx(20.0, abs=0.05)
+
+    def test_silence_is_gated(self):
+        assert integrated_loudness(np.zeros((44100 * 2, 2)), 44100) == -math.inf
+
+    def test_too_short(self):
+        assert integrated_loudness(sine(0.2), 44100) == -math.inf
+
+
+class TestTruePeak:
+    def test_finds_inter_sample_peak(self):
+        # A quarter-sample-rate sine sampled at 45 degrees peaks between samples
+        t = np.arange(4800)
+        audio = np.sin(2 * np.pi * t / 4 + np.pi / 4)[:, None]
+        assert np.abs(audio).max() == pytest.approx(0.7071, abs=1e-3)
+        assert true_peak(audio) == pytest.approx(1.0, abs=0.01)
+
+    def test_never_below_sample_peak(self):
+        audio = np.zeros((1000, 2))
+        audio[500, 1] = 0.8
+        assert true_peak(audio) >= 0.8
+
+
+class TestNormalizeWav:
+    def test_brings_quiet_file_to_target(self, tmp_path):
+        path = write_wav(tmp_path / "quiet.wav", sine(5.0, amplitude=0.02), bits=24)
+        result = normalize_wav(path, target_lufs=-16.0, true_peak_limit_db=-1.0)
+
+        assert result.gain_db > 10
+        samples = read_samples(path)
+        assert integrated_loudness(samples, 44100) == pytest.approx(-16.0, abs=0.1)
+
+    def test_true_peak_limit_reduces_gain(self, tmp_path):
+        path = write_wav(tmp_path / "peaky.wav", sine(5.0, amplitude=0.5))
+        result = normalize_wav(path, target_lufs=0.0, true_peak_limit_db=-1.0)
+
+        assert result.gain_db == pytest.approx(-1.0 - result.true_peak_db, abs=1e-6)
+        assert 20 * np.log10(np.abs(read_samples(path)).max()) <= -0.99
+
+    def test_silent_file_untouched(self, tmp_path):
+        path = write_wav(tmp_path / "silent.wav", np.zeros((44100, 2)))
+        before = path.read_bytes()
+        result = normalize_wav(path)
+
+        assert result.gain_db == 0.0
+        assert result.to_dict()["integrated_lufs"] is None
+        assert path.read_bytes() == before
@@ -0,0 +1,93 @@
+"""Tests for reaper_preview.media module."""
+
+import json
+
+from reaper_preview.discover import discover_projects
+from reaper_preview.media import MediaIndex, media_name, partial_hash
+
+
+def _index_of(root, cache_path=None):
+    index = MediaIndex.load(cache_path) if cache_path else MediaIndex()
+    discover_projects(root, media_index=index)
+    return index
+
+
+class TestMediaName:
+    def test_separators(self):
+        assert media_name("C:\\Music\\Song\\kick.wav") == "kick.wav"
+        assert media_name("audio/kick.wav") == "kick.wav"
+        assert media_name("kick.wav") == "kick.wav"
+
+
+class TestMediaIndex:
+    def test_discovery_indexes_media_only(self, tmp_path):
+        (tmp_path / "song.rpp").write_text("<REAPER_PROJECT>")
+        (tmp_path / "audio").mkdir()
+        (tmp_path / "audio" / "Kick.WAV").write_bytes(b"kick")
+        (tmp_path / "notes.txt").write_text("x")
+
+        index = _index_of(tmp_path)
+        assert len(index) == 1
+        assert index.locate("kick.wav").path == tmp_path / "audio" / "Kick.WAV"
+        assert index.locate("snare.wav") is None
+
+    def test_skip_dirs_not_indexed(self, tmp_path):
+        (tmp_path / "previews").mkdir()
+        (tmp_path / "previews" / "song.wav").write_bytes(b"x")
+        index = MediaIndex()
+        discover_projects(tmp_path, media_index=index, skip_dirs=[tmp_path / "previews"])
+        assert len(index) == 0
+
+    def test_prefers_copy_nearest_to_project(self, tmp_path):
+        for folder in ("a/song", "b/song"):
+            (tmp_path / folder).mkdir(parents=True)
+            (tmp_path / folder / "kick.wav").write_bytes(b"same")
+
+        index = _index_of(tmp_path)
+        found = index.locate("kick.wav", near=tmp_path / "b" / "song")
+        assert found.path == tmp_path / "b" / "song" / "kick.wav"
+        assert found.ambiguous is False
+
+    def test_different_content_is_ambiguous(self, tmp_path):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        (tmp_path / "a" / "kick.wav").write_bytes(b"one")
+        (tmp_path / "b" / "kick.wav").write_bytes(b"two")
+
+        assert _index_of(tmp_path).locate("kick.wav").ambiguous is True
+
+    def test_persisted_hashes_reused_until_file_changes(self, tmp_path):
+        library = tmp_path / "library"
+        (library / "a").mkdir(parents=True)
+        (library / "b").mkdir()
+        (library / "a" / "kick.wav").write_bytes(b"one")
+        (library / "b" / "kick.wav").write_bytes(b"one")
+        cache = tmp_path / "media-index.json"
+
+        index = _index_of(library, cache)
+        index.locate("kick.wav")
+        index.save()
+        files = json.loads(cache.read_text())["files"]
+        assert files[str(library / "a" / "kick.wav")][2] == partial_hash(library / "a" / "kick.wav", 3)
+
+        # Unchanged files keep their hash; changed and removed ones do not
+        (library / "b" / "kick.wav").write_bytes(b"changed")
+        index = _index_of(library, cache)
+        index.save()
+        files = json.loads(cache.read_text())["files"]
+        assert files[str(library / "a" / "kick.wav")][2] is not None
+        assert files[str(library / "b" / "kick.wav")][2] is None
+
+        (library / "b" / "kick.wav").unlink()
+        index = _index_of(library, cache)
+        index.save()
+        assert list(json.loads(cache.read_text())["files"]) == [str(library / "a" / "kick.wav")]
+
+    def test_partial_hash_covers_both_ends(self, tmp_path):
+        big = bytearray(300 * 1024)
+        path = tmp_path / "a.wav"
+        path.write_bytes(bytes(big))
+        before = partial_hash(path, len(big))
+        big[-1] = 1
+        path.write_bytes(bytes(big))
+        assert partial_hash(path, len(big)) != before
@@ -0,0 +1,114 @@
+"""Tests for reaper_preview.metadata module."""
+
+from reaper_preview.metadata import PluginRef, parse_metadata, rpp_hash
+
+PROJECT_RPP = """\
+<REAPER_PROJECT 0.1 "7.0/linux-x86_64" 1700000000
+  TEMPO 128 3 4
+  SAMPLERATE 48000 0 0
+  <TRACK {A}
+    NAME "Synth"
+    <FXCHAIN
+      BYPASS 0 0 0
+      <VST "VSTi: Serum (Xfer Records)" Serum.vst3 0 "" 1234<56789>
+        AAAA
+      >
+      BYPASS 0 0 0
+      <JS utility/volume ""
+        0 -
+      >
+    >
+    <ITEM
+      POSITION 2.5
+      LENGTH 10
+      <SOURCE WAVE
+        FILE "audio/pad.wav"
+      >
+    >
+    <ITEM
+      POSITION 20
+      LENGTH 4
+      <SOURCE WAVE
+        FILE "audio/pad.wav"
+      >
+    >
+  >
+  <TRACK {B}
+    NAME "Drums"
+    <FXCHAIN
+      BYPASS 0 0 0
+      <CLAP "CLAP: Surge XT Effects (Surge Synth Team)" org.surge-synth-team.surge-xt-fx
+        CFG 4 760 1 ""
+      >
+    >
+    <ITEM
+      POSITION 0
+      LENGTH 8
+      <SOURCE WAVE
+        FILE "/abs/kick.wav"
+      >
+    >
+  >
+>
+"""
+
+
+class TestParseMetadata:
+    def test_counts_tracks_and_items(self):
+        meta = parse_metadata(PROJECT_RPP)
+        assert meta.track_count == 2
+        assert meta.item_count == 3
+
+    def test_tempo_and_time_signature(self):
+        meta = parse_metadata(PROJECT_RPP)
+        assert meta.tempo == 128.0
+        assert meta.time_signature == (3, 4)
+
+    def test_sample_rate(self):
+        assert parse_metadata(PROJECT_RPP).sample_rate == 48000
+
+    def test_project_length_is_end_of_last_item(self):
+        assert parse_metadata(PROJECT_RPP).length == 24.0
+
+    def test_plugins(self):
+        plugins = parse_metadata(PROJECT_RPP).plugins
+        assert plugins == [
+            PluginRef(kind="VST", name="VSTi: Serum (Xfer Records)", ident="Serum.vst3"),
+            PluginRef(kind="JS", name="utility/volume", ident=""),
+            PluginRef(kind="CLAP", name="CLAP: Surge XT Effects (Surge Synth Team)",
+                      ident="org.surge-synth-team.surge-xt-fx"),
+        ]
+
+    def test_instrument_detection(self):
+        plugins = parse_metadata(PROJECT_RPP).plugins
+        assert [p.is_instrument for p in plugins] == [True, False, False]
+
+    def test_media_references_deduplicated(self):
+        assert parse_metadata(PROJECT_RPP).media == ["audio/pad.wav", "/abs/kick.wav"]
+
+    def test_hash_matches_text(self):
+        assert parse_metadata(PROJECT_RPP).sha1 == rpp_hash(PROJECT_RPP)
+
+    def test_bare_project(self):
+        meta = parse_metadata('<REAPER_PROJECT 0.1 "6.0"\n>\n')
+        assert meta.track_count == 0
+        assert meta.tempo is None
+        assert meta.length == 0.0
+
+    def test_malformed_values_ignored(self):
+        meta = parse_metadata('<REAPER_PROJECT\n  TEMPO abc\n  SAMPLERATE 44100\n>\n')
+        assert meta.tempo is None
+        assert meta.sample_rate == 44100
+
+    def test_markers_and_regions(self):
+        meta = parse_metadata(
+            "<REAPER_PROJECT\n"
+            '  MARKER 2 40 "Chorus 1" 1 0 1 R {X} 0\n'
+            '  MARKER 1 12.5 Drop 0 0 1 B {Y} 0\n'
+            '  MARKER 3 0 "" 1 0 1 R {Z} 0\n'
+            '  MARKER 3 8 "" 1\n'
+            '  MARKER 2 60 "" 1\n'
+            ">\n"
+        )
+        assert meta.markers == [("Drop", 12.5)]
+        assert meta.regions == [("", 0.0, 8.0), ("Chorus 1", 40.0, 60.0)]
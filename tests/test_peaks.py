@@ -0,0 +1,83 @@
+"""Tests for reaper_preview.peaks module."""
+
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from reaper_preview.peaks import (
+    compute_peaks,
+    is_current,
+    peaks_path_for,
+    read_peaks,
+    write_peaks,
+    write_sparkline,
+)
+from tests.wav_helpers import sine, write_wav
+
+
+@pytest.fixture
+def ramp_wav(tmp_path):
+    # 1 s of silence then 1 s at half scale
+    samples = np.zeros((8000, 2))
+    samples[4000:] = [0.5, -0.5]
+    return write_wav(tmp_path / "ramp.wav", samples, sample_rate=4000)
+
+
+class TestComputePeaks:
+    def test_bins_per_second(self, ramp_wav):
+        peaks = compute_peaks(ramp_wav, bins_per_second=10)
+        assert peaks.samples_per_bin == 400
+        assert len(peaks) == 20
+        assert peaks.mins[:10].tolist() == [0] * 10
+        assert peaks.maxs[10:].tolist() == [64] * 10
+        assert peaks.mins[10:].tolist() == [-64] * 10
+
+    def test_partial_last_bin(self, tmp_path):
+        wav = write_wav(tmp_path / "a.wav", sine(1.05, sample_rate=4000), sample_rate=4000)
+        assert len(compute_peaks(wav, bins_per_second=10)) == 11
+
+    @pytest.mark.parametrize("bits", [16, 24, 32])
+    def test_bit_depths_agree(self, tmp_path, bits):
+        wav = write_wav(tmp_path / "a.wav", sine(0.5, amplitude=0.8), bits=bits)
+        peaks = compute_peaks(wav)
+        assert peaks.maxs.max() == round(0.8 * 128)
+        assert peaks.mins.min() == -round(0.8 * 128)
+
+
+class TestPeakFiles:
+    def test_dat_round_trip(self, ramp_wav, tmp_path):
+        peaks = compute_peaks(ramp_wav, bins_per_second=10)
+        path = write_peaks(tmp_path / "ramp.peaks.dat", peaks)
+        version, flags, rate, per_bin, length = struct.unpack("<iIiiI", path.read_bytes()[:20])
+        assert (version, flags, rate, per_bin, length) == (1, 1, 4000, 400, 20)
+        assert path.stat().st_size == 20 + 2 * 20
+        loaded = read_peaks(path)
+        assert loaded.mins.tolist() == peaks.mins.tolist()
+        assert loaded.maxs.tolist() == peaks.maxs.tolist()
+
+    def test_json_format(self, ramp_wav, tmp_path):
+        path = write_peaks(tmp_path / "ramp.peaks.json", compute_peaks(ramp_wav, bins_per_second=10))
+        data = json.loads(path.read_text())
+        assert data["samples_per_pixel"] == 400
+        assert data["length"] == 20
+        assert data["data"][-2:] == [-64, 64]
+
+    def test_sparkline_is_png(self, ramp_wav, tmp_path):
+        path = write_sparkline(tmp_path / "ramp.png", compute_peaks(ramp_wav, bins_per_second=10), height=9)
+        data = path.read_bytes()
+        assert data.startswith(b"\x89PNG\r\n\x1a\n")
+        width, height = struct.unpack(">II", data[16:24])
+        assert (width, height) == (20, 9)
+
+    def test_is_current(self, ramp_wav):
+        import os
+
+        peaks_path = peaks_path_for(ramp_wav, "dat")
+        assert peaks_path.name == "ramp.peaks.dat"
+        assert not is_current(peaks_path, ramp_wav)
+        peaks_path.write_bytes(b"")
+        assert is_current(peaks_path, ramp_wav)
+        os.utime(ramp_wav, (peaks_path.stat().st_mtime + 10,) * 2)
+        assert not is_current(peaks_path, ramp_wav)
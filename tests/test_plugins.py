@@ -0,0 +1,125 @@
+"""Tests for reaper_preview.plugins module."""
+
+import json
+from unittest.mock import patch
+
+from reaper_preview.metadata import PluginRef
+from reaper_preview.plugins import PluginInventory, find_missing, load_inventory, scan_inventory
+
+VST_INI = """\
+[vstcache]
+reacomp.dll=00A8E5A5E8B5D901,1919247729,ReaComp (Cockos)
+Serum_x64.dll=0012C0FFEE000000,1483109208,Serum (Xfer Records)!!!VSTi
+Vital.vst3=00ABCDEF00000000,{56657374566974616C00000000000000},Vital (Vital Audio)!!!VSTi
+"""
+
+AU_INI = """\
+[auplugins]
+Apple: AUDelay=
+Native Instruments: Massive=<inst>
+"""
+
+CLAP_INI = """\
+[/usr/lib/clap/Surge XT.clap]
+_=00D9A7B81C0F0000
+org.surge-synth-team.surge-xt=1|Surge XT (Surge Synth Team)
+"""
+
+
+def _resource_dir(tmp_path):
+    res = tmp_path / "REAPER"
+    res.mkdir()
+    (res / "reaper-vstplugins64.ini").write_text(VST_INI)
+    (res / "reaper-auplugins64.ini").write_text(AU_INI)
+    (res / "reaper-clap-linux-x86_64.ini").write_text(CLAP_INI)
+    (res / "Effects" / "utility").mkdir(parents=True)
+    (res / "Effects" / "utility" / "volume").write_text("desc: volume")
+    return res
+
+
+class TestScanInventory:
+    def test_reads_all_cache_files(self, tmp_path):
+        inventory = scan_inventory(_resource_dir(tmp_path))
+        assert "serum_x64.dll" in inventory.vst_files
+        assert "serum (xfer records)" in inventory.vst_names
+        assert "apple: audelay" in inventory.au_names
+        assert "org.surge-synth-team.surge-xt" in inventory.clap_ids
+        assert "utility/volume" in inventory.js_effects
+
+    def test_empty_resource_dir(self, tmp_path):
+        assert scan_inventory(tmp_path) == PluginInventory()
+
+
+class TestInventoryHas:
+    def setup_method(self):
+        self.inventory = PluginInventory(
+            vst_files={"serum_x64.dll", "vital.vst3"},
+            vst_names={"serum (xfer records)", "vital (vital audio)"},
+            au_names={"apple: audelay"},
+            clap_ids={"org.surge-synth-team.surge-xt"},
+            js_effects={"utility/volume"},
+        )
+
+    def test_vst_by_file(self):
+        assert self.inventory.has(PluginRef("VST", "VSTi: Other name", "Serum_x64.dll"))
+
+    def test_vst_by_name_when_file_differs(self):
+        assert self.inventory.has(PluginRef("VST", "VSTi: Serum (Xfer Records)", "C:\\VST\\Serum.dll"))
+
+    def test_vst_missing(self):
+        assert not self.inventory.has(PluginRef("VST", "VSTi: Kontakt (Native Instruments)", "Kontakt.dll"))
+
+    def test_au(self):
+        assert self.inventory.has(PluginRef("AU", "AU: AUDelay (Apple)", "Apple: AUDelay"))
+        assert not self.inventory.has(PluginRef("AU", "AUi: Massive (Native Instruments)", "NI: Massive"))
+
+    def test_clap(self):
+        assert self.inventory.has(PluginRef("CLAP", "CLAPi: Surge XT", "org.surge-synth-team.surge-xt"))
+        assert not self.inventory.has(PluginRef("CLAP", "CLAPi: Other", "com.example.other"))
+
+    def test_js(self):
+        assert self.inventory.has(PluginRef("JS", "utility/volume"))
+        assert not self.inventory.has(PluginRef("JS", "utility/missing"))
+
+    def test_unknown_kinds_assumed_present(self):
+        assert self.inventory.has(PluginRef("LV2", "LV2: Something", "urn:x"))
+
+
+class TestFindMissing:
+    def test_reports_each_missing_plugin_once(self):
+        inventory = PluginInventory(vst_files={"reacomp.dll"})
+        plugins = [
+            PluginRef("VST", "VST: ReaComp (Cockos)", "reacomp.dll"),
+            PluginRef("VST", "VSTi: Kontakt", "Kontakt.dll"),
+            PluginRef("VST", "VSTi: Kontakt", "Kontakt.dll"),
+        ]
+        assert find_missing(plugins, inventory) == [PluginRef("VST", "VSTi: Kontakt", "Kontakt.dll")]
+
+
+class TestLoadInventory:
+    def test_writes_and_reuses_cache(self, tmp_path):
+        res = _resource_dir(tmp_path)
+        cache = tmp_path / "state" / "inventory.json"
+
+        first = load_inventory(res, cache)
+        assert cache.exists()
+        with patch("reaper_preview.plugins.scan_inventory") as mock_scan:
+            second = load_inventory(res, cache)
+        mock_scan.assert_not_called()
+        assert first == second
+
+    def test_cache_invalidated_when_ini_changes(self, tmp_path):
+        import os
+
+        res = _resource_dir(tmp_path)
+        cache = tmp_path / "inventory.json"
+        load_inventory(res, cache)
+
+        ini = res / "reaper-vstplugins64.ini"
+        ini.write_text(VST_INI + "Kontakt.dll=0,1,Kontakt (Native Instruments)!!!VSTi\n")
+        st = ini.stat()
+        os.utime(ini, (st.st_atime, st.st_mtime + 10))
+
+        inventory = load_inventory(res, cache)
+        assert "kontakt.dll" in inventory.vst_files
+        assert "kontakt.dll" in json.loads(cache.read_text())["inventory"]["vst_files"]
@@ -0,0 +1,66 @@
+"""Tests for reaper_preview.priority module."""
+
+import os
+import platform
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from reaper_preview.priority import CoreSets, partition_cpus, set_affinity, set_io_priority, set_nice
+
+linux_only = pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="needs os.sched_setaffinity")
+
+
+@pytest.fixture
+def child():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+class TestPartitionCpus:
+    def test_disjoint_sets_covering_all_cores(self):
+        sets = partition_cpus(list(range(10)), 3)
+        assert sets == [{0, 1, 2, 3}, {4, 5, 6}, {7, 8, 9}]
+
+    def test_more_workers_than_cores(self):
+        assert partition_cpus([0, 1], 3) == [{0}, {1}, {0}]
+
+
+def test_core_sets_wait_for_a_free_set():
+    core_sets = CoreSets([{0}, {1}])
+    first, second = core_sets.acquire(), core_sets.acquire()
+    assert first | second == {0, 1}
+
+    got = []
+    thread = threading.Thread(target=lambda: got.append(core_sets.acquire()))
+    thread.start()
+    thread.join(0.2)
+    assert not got
+    core_sets.release(second)
+    thread.join(2)
+    assert got == [second]
+
+
+@linux_only
+def test_set_affinity_of_another_process(child):
+    cores = {sorted(os.sched_getaffinity(0))[0]}
+    assert set_affinity(cores, child.pid)
+    assert os.sched_getaffinity(child.pid) == cores
+
+
+def test_set_nice_only_raises(child):
+    assert set_nice(5, child.pid)
+    assert os.getpriority(os.PRIO_PROCESS, child.pid) >= 5
+    # Lowering it would need privileges; it is left as it is
+    assert set_nice(1, child.pid)
+    assert os.getpriority(os.PRIO_PROCESS, child.pid) >= 5
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="ioprio_set is Linux-only")
+def test_set_io_priority_of_another_process(child):
+    assert set_io_priority("best-effort", 7, child.pid)
+    assert set_io_priority("idle", pid=child.pid)
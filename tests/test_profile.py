@@ -0,0 +1,53 @@
+"""Tests for reaper_preview.profile module."""
+
+import os
+
+from reaper_preview.profile import PROFILE_OVERRIDES, apply_overrides, ensure_profile
+
+
+class TestApplyOverrides:
+    def test_replaces_and_appends_keys(self):
+        text = "[REAPER]\nundomaxmem=200\nvstpath64=/vst\n[other]\nx=1\n"
+        result = apply_overrides(text, {"REAPER": {"undomaxmem": "0", "autosaveint": "0"}})
+        assert result == "[REAPER]\nundomaxmem=0\nvstpath64=/vst\nautosaveint=0\n[other]\nx=1\n"
+
+    def test_adds_missing_section(self):
+        assert apply_overrides("", {"REAPER": {"a": "1"}}) == "[REAPER]\na=1\n"
+
+
+class TestEnsureProfile:
+    def _resource_dir(self, tmp_path):
+        resource = tmp_path / "REAPER"
+        (resource / "Effects").mkdir(parents=True)
+        (resource / "reaper.ini").write_text("[REAPER]\nvstpath64=/vst\nundomaxmem=512\n")
+        (resource / "reaper-vstplugins64.ini").write_text("[vstcache]\n")
+        return resource
+
+    def test_creates_profile_from_user_config(self, tmp_path):
+        resource = self._resource_dir(tmp_path)
+        ini = ensure_profile(tmp_path / "state", resource)
+
+        text = ini.read_text()
+        assert "vstpath64=/vst" in text
+        for key, value in PROFILE_OVERRIDES["REAPER"].items():
+            assert f"{key}={value}" in text
+        assert (ini.parent / "reaper-vstplugins64.ini").read_text() == "[vstcache]\n"
+        assert (ini.parent / "Effects").resolve() == (resource / "Effects").resolve()
+        # The user's configuration is untouched
+        assert (resource / "reaper.ini").read_text().endswith("undomaxmem=512\n")
+
+    def test_reused_until_user_config_changes(self, tmp_path):
+        resource = self._resource_dir(tmp_path)
+        ini = ensure_profile(tmp_path / "state", resource)
+        ini.write_text("[REAPER]\nmarker=1\n")
+
+        assert ensure_profile(tmp_path / "state", resource).read_text() == "[REAPER]\nmarker=1\n"
+
+        user_ini = resource / "reaper.ini"
+        user_ini.write_text("[REAPER]\nvstpath64=/other\n")
+        os.utime(user_ini, (user_ini.stat().st_mtime + 10,) * 2)
+        assert "vstpath64=/other" in ensure_profile(tmp_path / "state", resource).read_text()
+
+    def test_without_resource_dir(self, tmp_path):
+        ini = ensure_profile(tmp_path / "state", None)
+        assert ini.read_text().startswith("[REAPER]\n")
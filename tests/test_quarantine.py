@@ -0,0 +1,72 @@
+"""Tests for reaper_preview.quarantine module."""
+
+from pathlib import Path
+
+from reaper_preview.quarantine import FailureHistory, rpp_file_hash
+
+
+def _project(tmp_path, name="song", text="<REAPER_PROJECT>"):
+    path = tmp_path / f"{name}.rpp"
+    path.write_text(text)
+    return path
+
+
+class TestFailureHistory:
+    def test_quarantines_after_consecutive_failures(self, tmp_path):
+        rpp = _project(tmp_path)
+        history = FailureHistory(tmp_path / "history.json", quarantine_after=2)
+        key = rpp_file_hash(rpp)
+
+        assert history.record_failure(key, rpp, "timeout").quarantined_at is None
+        assert history.quarantined(key) is None
+        record = history.record_failure(key, rpp, "timeout again")
+        assert record.quarantined_at is not None
+        assert history.quarantined(key).last_error == "timeout again"
+
+    def test_changed_rpp_is_released(self, tmp_path):
+        rpp = _project(tmp_path)
+        history = FailureHistory(tmp_path / "history.json", quarantine_after=1)
+        old_key = rpp_file_hash(rpp)
+        history.record_failure(old_key, rpp, "timeout")
+
+        rpp.write_text("<REAPER_PROJECT 0.1>")
+        new_key = rpp_file_hash(rpp)
+        assert new_key != old_key
+        assert history.quarantined(new_key) is None
+        # A failure of the new version starts a new count and drops the old one
+        history.record_failure(new_key, rpp, "timeout")
+        assert [key for key, _ in history.quarantined_projects()] == [new_key]
+
+    def test_success_resets_count(self, tmp_path):
+        rpp = _project(tmp_path)
+        history = FailureHistory(tmp_path / "history.json", quarantine_after=2)
+        key = rpp_file_hash(rpp)
+        history.record_failure(key, rpp, "timeout")
+        history.record_success(rpp)
+        assert history.record_failure(key, rpp, "timeout").failures == 1
+
+    def test_saved_and_cleared_by_name(self, tmp_path):
+        a, b = _project(tmp_path, "a"), _project(tmp_path, "b", "<REAPER_PROJECT 0.2>")
+        history = FailureHistory(tmp_path / "history.json", quarantine_after=1)
+        history.record_failure(rpp_file_hash(a), a, "boom")
+        history.record_failure(rpp_file_hash(b), b, "boom")
+        history.save()
+
+        reloaded = FailureHistory(tmp_path / "history.json")
+        assert [record.path for _, record in reloaded.quarantined_projects()] == [str(a), str(b)]
+        assert reloaded.clear(["a"]) == [str(a)]
+        assert reloaded.clear() == [str(b)]
+        assert reloaded.quarantined_projects() == []
+
+    def test_recorded_by_absolute_path_and_cleared_by_relative_path(self, tmp_path, monkeypatch):
+        (tmp_path / "lib").mkdir()
+        _project(tmp_path / "lib")
+        monkeypatch.chdir(tmp_path)
+        rpp = Path("lib/song.rpp")
+        history = FailureHistory(tmp_path / "history.json", quarantine_after=1)
+        history.record_failure(rpp_file_hash(rpp), rpp, "boom")
+
+        absolute = str(rpp.resolve())
+        assert [record.path for _, record in history.quarantined_projects()] == [absolute]
+        monkeypatch.chdir(tmp_path / "lib")
+        assert history.clear(["../lib/song.rpp"]) == [absolute]
@@ -1,12 +1,27 @@
 """Tests for reaper_preview.render module."""
 
+import os
 import subprocess
+import sys
+import time
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
 import pytest
 
-from reaper_preview.render import RenderError, RenderTimeoutError, render_project
+from reaper_preview import render
+from reaper_preview.render import RenderError, RenderStats, RenderTimeoutError, render_project, render_segments
+from tests.wav_helpers import write_mp3, write_silent_wav
+
+_REAL_POPEN = subprocess.Popen
+
+
+def _fake_reaper(script: str = "pass"):
+    """Patch Popen to run a Python script in place of Reaper, with the same process options."""
+    def spawn(cmd, **kwargs):
+        return _REAL_POPEN([sys.executable, "-c", script], **kwargs)
+
+    return patch("subprocess.Popen", side_effect=spawn)
 
 
 class TestRenderProject:
@@ -16,10 +31,9 @@ class TestRenderProject:
         output_dir = tmp_path / "output"
         output_dir.mkdir()
         expected_output = output_dir / "test.mp3"
-        expected_output.write_text("fake audio")
+        write_mp3(expected_output, 1.0)
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = Mock(returncode=0)
+        with _fake_reaper() as mock_popen:
             render_project(
                 rpp_path=rpp_file,
                 output_dir=output_dir,
@@ -28,8 +42,8 @@ class TestRenderProject:
                 reaper_bin="reaper",
             )
 
-        mock_run.assert_called_once()
-        args = mock_run.call_args[0][0]
+        mock_popen.assert_called_once()
+        args = mock_popen.call_args[0][0]
         assert args == ["reaper", "-nosplash", "-noactivate", "-renderproject", str(rpp_file)]
 
     def test_returns_output_path_on_success(self, tmp_path):
@@ -38,10 +52,9 @@ class TestRenderProject:
         output_dir = tmp_path / "output"
         output_dir.mkdir()
         expected_output = output_dir / "test.mp3"
-        expected_output.write_text("fake audio")
+        write_mp3(expected_output, 1.0)
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = Mock(returncode=0)
+        with _fake_reaper():
             result = render_project(
                 rpp_path=rpp_file,
                 output_dir=output_dir,
@@ -58,16 +71,15 @@ class TestRenderProject:
         output_dir = tmp_path / "output"
         output_dir.mkdir()
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.side_effect = subprocess.TimeoutExpired("reaper", 60)
-            with pytest.raises(RenderTimeoutError, match="timed out"):
+        with _fake_reaper("import time; time.sleep(30)"):
+            with pytest.raises(RenderTimeoutError, match="timed out after 1 seconds"):
                 render_project(
                     rpp_path=rpp_file,
                     output_dir=output_dir,
                     filename="test",
                     audio_format="mp3",
                     reaper_bin="reaper",
-                    timeout=60,
+                    timeout=1,
                 )
 
     def test_raises_on_nonzero_exit(self, tmp_path):
@@ -76,9 +88,8 @@ class TestRenderProject:
         output_dir = tmp_path / "output"
         output_dir.mkdir()
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = Mock(returncode=1, stderr="Error occurred")
-            with pytest.raises(RenderError, match=r"exited with code 1"):
+        with _fake_reaper("import sys; sys.stderr.write('Error occurred'); sys.exit(1)"):
+            with pytest.raises(RenderError, match=r"exited with code 1. output: Error occurred"):
                 render_project(
                     rpp_path=rpp_file,
                     output_dir=output_dir,
@@ -87,6 +98,34 @@ class TestRenderProject:
                     reaper_bin="reaper",
                 )
 
+    def test_output_streams_to_log_file(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        log_path = tmp_path / "logs" / "test.log"
+        script = (
+            "import sys\n"
+            "for i in range(5000): print('plugin chatter', i)\n"
+            "sys.stderr.write('fatal: no audio device')\n"
+            "sys.exit(2)\n"
+        )
+
+        with _fake_reaper(script):
+            with pytest.raises(RenderError) as excinfo:
+                render_project(
+                    rpp_path=rpp_file,
+                    output_dir=tmp_path,
+                    filename="test",
+                    audio_format="wav",
+                    log_path=log_path,
+                )
+
+        message = str(excinfo.value)
+        assert "fatal: no audio device" in message
+        assert "plugin chatter 0\n" not in message
+        assert str(log_path) in message
+        log = log_path.read_text()
+        assert "plugin chatter 0\n" in log and "plugin chatter 4999\n" in log
+
     def test_raises_on_missing_output_file(self, tmp_path):
         rpp_file = tmp_path / "test.rpp"
         rpp_file.write_text("<REAPER_PROJECT>")
@@ -94,8 +133,7 @@ class TestRenderProject:
         output_dir.mkdir()
         # Don't create the output file
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = Mock(returncode=0)
+        with _fake_reaper():
             with pytest.raises(RenderError, match="not created"):
                 render_project(
                     rpp_path=rpp_file,
@@ -111,10 +149,9 @@ class TestRenderProject:
         output_dir = tmp_path / "output"
         output_dir.mkdir()
         expected_output = output_dir / "test.wav"
-        expected_output.write_text("fake audio")
+        write_silent_wav(expected_output, 1.0)
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = Mock(returncode=0)
+        with _fake_reaper(), patch("reaper_preview.render._wait", wraps=render._wait) as mock_wait:
             render_project(
                 rpp_path=rpp_file,
                 output_dir=output_dir,
@@ -124,7 +161,7 @@ class TestRenderProject:
                 timeout=120,
             )
 
-        assert mock_run.call_args[1]["timeout"] == 120
+        assert mock_wait.call_args_list[0][0][1] == 120
 
     def test_constructs_correct_output_path_for_wav(self, tmp_path):
         rpp_file = tmp_path / "test.rpp"
@@ -132,10 +169,9 @@ class TestRenderProject:
         output_dir = tmp_path / "output"
         output_dir.mkdir()
         expected_output = output_dir / "test.wav"
-        expected_output.write_text("fake audio")
+        write_silent_wav(expected_output, 1.0)
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = Mock(returncode=0)
+        with _fake_reaper():
             result = render_project(
                 rpp_path=rpp_file,
                 output_dir=output_dir,
@@ -146,3 +182,191 @@ class TestRenderProject:
 
         assert result == expected_output
         assert result.suffix == ".wav"
+
+    def test_cfgfile_runs_new_instance_with_profile(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        write_silent_wav(tmp_path / "test.wav", 1.0)
+
+        with _fake_reaper() as mock_popen:
+            render_project(
+                rpp_path=rpp_file,
+                output_dir=tmp_path,
+                filename="test",
+                audio_format="wav",
+                cfgfile=tmp_path / "profile" / "reaper.ini",
+            )
+
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[1:4] == ["-newinst", "-cfgfile", str(tmp_path / "profile" / "reaper.ini")]
+        assert cmd[-2:] == ["-renderproject", str(rpp_file)]
+
+
+def _gone(pid: int) -> bool:
+    try:
+        return Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()[0] == "Z"
+    except FileNotFoundError:
+        return True
+
+
+@pytest.mark.skipif(not Path("/proc").is_dir(), reason="needs /proc")
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="needs os.sched_setaffinity")
+def test_pins_reaper_to_cores(tmp_path):
+    rpp_file = tmp_path / "test.rpp"
+    rpp_file.write_text("<REAPER_PROJECT>")
+    write_silent_wav(tmp_path / "test.wav", 1.0)
+    log = tmp_path / "render.log"
+    cores = {sorted(os.sched_getaffinity(0))[0]}
+
+    script = "import os, time; time.sleep(0.2); print(sorted(os.sched_getaffinity(0)))"
+    with _fake_reaper(script):
+        render_project(rpp_file, tmp_path, "test", "wav", log_path=log, cpus=cores)
+    assert log.read_text().strip() == str(sorted(cores))
+
+
+class TestOutputVerification:
+    def test_truncated_output_is_deleted_and_fails(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        output = write_mp3(tmp_path / "test.mp3", 30.0, truncate_to=0)
+
+        with _fake_reaper(), pytest.raises(RenderError, match="invalid file test.mp3: File is empty"):
+            render_project(rpp_file, tmp_path, "test", "mp3", expected_duration=30.0)
+        assert not output.exists()
+
+    def test_short_output_fails(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        write_silent_wav(tmp_path / "test.wav", 5.0)
+
+        with _fake_reaper(), pytest.raises(RenderError, match="Duration is 5.0 s, expected 30.0 s"):
+            render_project(rpp_file, tmp_path, "test", "wav", expected_duration=30.0)
+
+    def test_one_bad_segment_fails_all(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        good = write_silent_wav(tmp_path / "test-01.wav", 2.0)
+        write_silent_wav(tmp_path / "test-02.wav", 0.5)
+
+        with _fake_reaper(), pytest.raises(RenderError, match="test-02.wav"):
+            render_segments(rpp_file, tmp_path, "test", ["01", "02"], "wav", expected_durations=[2.0, 2.0])
+        assert not good.exists()
+
+
+    def test_partial_output_of_timed_out_render_is_deleted(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        output = tmp_path / "test.mp3"
+        script = f"import time; open({str(output)!r}, 'wb').write(bytes(32)); time.sleep(30)"
+
+        with _fake_reaper(script), pytest.raises(RenderTimeoutError):
+            render_project(rpp_file, tmp_path, "test", "mp3", timeout=1)
+        assert not output.exists()
+
+    def test_failed_render_keeps_untouched_previous_output(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        previous = write_silent_wav(tmp_path / "test-01.wav", 2.0)
+        partial = tmp_path / "test-02.wav"
+        script = f"import sys; open({str(partial)!r}, 'wb').write(b'RIFF'); sys.exit(1)"
+
+        with _fake_reaper(script), pytest.raises(RenderError, match="exited with code 1"):
+            render_segments(rpp_file, tmp_path, "test", ["01", "02"], "wav")
+        assert previous.exists()
+        assert not partial.exists()
+
+
+class TestProcessCleanup:
+    def test_kills_leftover_processes_and_records_usage(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        write_silent_wav(tmp_path / "test.wav", 1.0)
+        pid_file = tmp_path / "pids"
+        # A bridge host in the render's group and one that starts its own session
+        script = (
+            "import subprocess, sys\n"
+            "sleeper = [sys.executable, '-c', 'import time; time.sleep(60)']\n"
+            "hosts = [subprocess.Popen(sleeper), subprocess.Popen(sleeper, start_new_session=True)]\n"
+            f"open({str(pid_file)!r}, 'w').write(' '.join(str(h.pid) for h in hosts))\n"
+        )
+        stats = RenderStats()
+
+        with _fake_reaper(script):
+            render_project(
+                rpp_path=rpp_file,
+                output_dir=tmp_path,
+                filename="test",
+                audio_format="wav",
+                stats=stats,
+            )
+
+        pids = [int(pid) for pid in pid_file.read_text().split()]
+        deadline = time.monotonic() + 5
+        while not all(_gone(pid) for pid in pids) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert all(_gone(pid) for pid in pids)
+        assert stats.leftover_processes == 2
+        assert stats.max_rss_kb > 0
+        assert stats.cpu_seconds >= 0
+        assert stats.spawned_ns <= stats.exited_ns
+
+    def test_timeout_stops_the_whole_group(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        pid_file = tmp_path / "pids"
+        script = (
+            "import subprocess, sys, time\n"
+            "host = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            f"open({str(pid_file)!r}, 'w').write(str(host.pid))\n"
+            "time.sleep(60)\n"
+        )
+
+        with _fake_reaper(script), pytest.raises(RenderTimeoutError):
+            render_project(
+                rpp_path=rpp_file,
+                output_dir=tmp_path,
+                filename="test",
+                audio_format="wav",
+                timeout=2,
+            )
+
+        host = int(pid_file.read_text())
+        deadline = time.monotonic() + 5
+        while not _gone(host) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert _gone(host)
+
+
+class TestRenderSegments:
+    def test_returns_segment_files_in_order(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        for name in ("01", "02"):
+            write_silent_wav(tmp_path / f"test-{name}.wav", 1.0)
+
+        with _fake_reaper() as mock_popen:
+            result = render_segments(
+                rpp_path=rpp_file,
+                output_dir=tmp_path,
+                filename="test",
+                segment_names=["01", "02"],
+                audio_format="wav",
+            )
+
+        assert mock_popen.call_count == 1
+        assert result == [tmp_path / "test-01.wav", tmp_path / "test-02.wav"]
+
+    def test_raises_on_missing_segment(self, tmp_path):
+        rpp_file = tmp_path / "test.rpp"
+        rpp_file.write_text("<REAPER_PROJECT>")
+        (tmp_path / "test-01.wav").write_text("fake audio")
+
+        with _fake_reaper():
+            with pytest.raises(RenderError, match="test-02.wav"):
+                render_segments(
+                    rpp_path=rpp_file,
+                    output_dir=tmp_path,
+                    filename="test",
+                    segment_names=["01", "02"],
+                    audio_format="wav",
+                )
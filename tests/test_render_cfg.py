@@ -0,0 +1,65 @@
+"""Tests for reaper_preview.render_cfg module."""
+
+import base64
+
+import pytest
+
+from reaper_preview.render_cfg import (
+    PREVIEW_QUALITY,
+    Mp3Settings,
+    RenderCfgError,
+    WavSettings,
+    build_render_cfg,
+    parse_render_cfg,
+)
+
+# Saved by Reaper for WAV, 24 bit PCM, "Write BWF chunk" enabled
+CAPTURED_WAV_24_BWF = "ZXZhdxgAAQ=="
+
+
+class TestWav:
+    def test_matches_captured_blob(self):
+        assert build_render_cfg(WavSettings(bits=24, bwf=True)) == CAPTURED_WAV_24_BWF
+
+    def test_parses_captured_blob(self):
+        assert parse_render_cfg(CAPTURED_WAV_24_BWF) == WavSettings(bits=24, bwf=True)
+
+    def test_bit_depth(self):
+        assert base64.b64decode(build_render_cfg(WavSettings(bits=16, bwf=False))) == b"evaw\x10\x00\x00"
+
+    def test_rejects_unknown_bit_depth(self):
+        with pytest.raises(RenderCfgError):
+            build_render_cfg(WavSettings(bits=12))
+
+    def test_bare_fourcc_is_default(self):
+        assert parse_render_cfg("ZXZhdw==") == WavSettings()
+
+
+class TestMp3:
+    def test_keeps_reapers_mp3_settings(self):
+        # The MP3 record is not written; the encoder stage applies Mp3Settings
+        assert PREVIEW_QUALITY.render_cfg("mp3") == "bDNwbQ=="
+        assert parse_render_cfg("bDNwbQ==") == Mp3Settings()
+
+    def test_does_not_decode_mp3_records(self):
+        # Any record longer than the bare FourCC
+        with pytest.raises(RenderCfgError):
+            parse_render_cfg("bDNwbUABAAABAAAABQAAAP////8EAAAA")
+
+    def test_rejects_invalid_settings(self):
+        with pytest.raises(RenderCfgError):
+            Mp3Settings(bitrate=100)
+        with pytest.raises(RenderCfgError):
+            Mp3Settings(vbr_quality=10)
+
+    def test_unknown_format(self):
+        with pytest.raises(RenderCfgError):
+            parse_render_cfg(base64.b64encode(b"ggo ").decode())
+
+
+class TestPreviewQuality:
+    def test_preset(self):
+        assert PREVIEW_QUALITY.sample_rate == 32000
+        assert PREVIEW_QUALITY.channels == 1
+        assert PREVIEW_QUALITY.mp3 == Mp3Settings(bitrate=96, mono=True)
+        assert parse_render_cfg(PREVIEW_QUALITY.render_cfg("wav")) == WavSettings(bits=16, bwf=False)
@@ -2,12 +2,17 @@
 
 from pathlib import Path
 
+from reaper_preview.fx import FxFilter
+from reaper_preview.metadata import ProjectMetadata, rpp_hash
 from reaper_preview.rpp_modify import (
     RENDER_CFG_MP3,
     RENDER_CFG_WAV,
     _resolve_relative_file_paths,
+    PREVIEW_RENDER_SETTINGS,
+    apply_render_settings,
     prepare_rpp_for_preview,
 )
+from reaper_preview.segments import parse_segments
 
 MINIMAL_RPP = """\
 <REAPER_PROJECT 0.1 "6.0"
@@ -21,6 +26,33 @@ MINIMAL_RPP = """\
 >
 """
 
+# Render options a project may have saved that slow previews down or
+# produce extra outputs
+SLOW_RENDER_RPP = """\
+<REAPER_PROJECT 0.1 "7.0"
+  RENDER_FILE ""
+  RENDER_PATTERN ""
+  RENDER_FMT 0 2 0
+  RENDER_1X 1
+  RENDER_RANGE 1 0 0 18 1000
+  RENDER_RESAMPLE 4 0 1
+  RENDER_ADDTOPROJ 1
+  RENDER_STEMS 3
+  RENDER_DITHER 3
+  <RENDER_CFG
+    ZXZhdxgAAQ==
+  >
+  <RENDER_CFG2
+    bDNwbUAAAAA=
+  >
+  <RENDER_METADATA
+    TAG ID3:TIT2 "Song"
+  >
+  <TRACK
+  >
+>
+"""
+
 BARE_RPP = """\
 <REAPER_PROJECT 0.1 "6.0"
 >
@@ -356,6 +388,239 @@ class TestPrepareRppForPreview:
         assert f'FILE "{kick_abs}"' in content
         assert f'FILE "{snare_abs}"' in content
 
+    def test_fills_metadata_from_original_text(self, tmp_path):
+        rpp_file = tmp_path / "song.rpp"
+        rpp_file.write_text(MINIMAL_RPP)
+        output_dir = tmp_path / "previews"
+        output_dir.mkdir()
+        metadata = ProjectMetadata()
+
+        prepare_rpp_for_preview(
+            rpp_path=rpp_file,
+            output_dir=output_dir,
+            filename="song-preview",
+            start=0.0,
+            end=30.0,
+            metadata=metadata,
+        )
+        assert metadata.sha1 == rpp_hash(MINIMAL_RPP)
+        assert metadata.track_count == 0
+
+
+    def test_segments_render_as_regions(self, tmp_path):
+        rpp_file = tmp_path / "song.rpp"
+        rpp_file.write_text(MINIMAL_RPP.replace("\n>\n", '\n  MARKER 1 5 "Old" 0\n>\n'))
+        output_dir = tmp_path / "previews"
+        output_dir.mkdir()
+
+        result = prepare_rpp_for_preview(
+            rpp_path=rpp_file,
+            output_dir=output_dir,
+            filename="song",
+            start=0.0,
+            end=30.0,
+            segments=parse_segments("0:30,60:90"),
+        )
+        content = _read_output(result)
+        assert 'RENDER_PATTERN "song-$region"' in content
+        assert "RENDER_RANGE 3 0 0 18 1000" in content
+        assert '"Old"' not in content
+        assert '  MARKER 1 0.0 "01" 1 0 1 R\n  MARKER 1 30.0 "" 1\n' in content
+        assert '  MARKER 2 60.0 "02" 1 0 1 R\n  MARKER 2 90.0 "" 1\n' in content
+
+    def test_segments_from_markers(self, tmp_path):
+        rpp_file = tmp_path / "song.rpp"
+        rpp_file.write_text(MINIMAL_RPP.replace("\n>\n", '\n  MARKER 1 45 "Chorus" 0\n>\n'))
+        output_dir = tmp_path / "previews"
+        output_dir.mkdir()
+
+        result = prepare_rpp_for_preview(
+            rpp_path=rpp_file,
+            output_dir=output_dir,
+            filename="song",
+            start=0.0,
+            end=20.0,
+            segments="markers",
+        )
+        content = _read_output(result)
+        assert '  MARKER 1 45.0 "01-Chorus" 1 0 1 R\n  MARKER 1 65.0 "" 1\n' in content
+
+    def test_segments_without_markers_render_single_range(self, tmp_path):
+        rpp_file = tmp_path / "song.rpp"
+        rpp_file.write_text(MINIMAL_RPP)
+        output_dir = tmp_path / "previews"
+        output_dir.mkdir()
+
+        result = prepare_rpp_for_preview(
+            rpp_path=rpp_file,
+            output_dir=output_dir,
+            filename="song",
+            start=0.0,
+            end=30.0,
+            segments="regions",
+        )
+        content = _read_output(result)
+        assert 'RENDER_PATTERN "song"' in content
+        assert "RENDER_RANGE 0 0.0 30.0" in content
+
+
+    def test_relocates_missing_media(self, tmp_path):
+        from reaper_preview.media import MediaIndex
+
+        moved = tmp_path / "library" / "samples" / "kick.wav"
+        moved.parent.mkdir(parents=True)
+        moved.write_bytes(b"kick")
+        index = MediaIndex()
+        index.add(moved, moved.stat())
+
+        project_dir = tmp_path / "project"
+        project_dir.mkdir()
+        rpp_file = project_dir / "song.rpp"
+        rpp_file.write_text(MINIMAL_RPP.replace(
+            "\n>\n", '\n  <SOURCE WAVE\n    FILE "Audio/kick.wav"\n    FILE "Audio/snare.wav"\n  >\n>\n'
+        ))
+        metadata = ProjectMetadata()
+
+        result = prepare_rpp_for_preview(
+            rpp_path=rpp_file,
+            output_dir=tmp_path,
+            filename="song",
+            start=0.0,
+            end=30.0,
+            metadata=metadata,
+            media_index=index,
+        )
+        content = _read_output(result)
+        assert f'FILE "{moved.as_posix()}"' in content
+        assert metadata.relocated_media == {"Audio/kick.wav": str(moved)}
+        assert metadata.missing_media == ["Audio/snare.wav"]
+
+
+class TestQuality:
+    def test_preview_quality_sets_blob_rate_and_channels(self, tmp_path):
+        from reaper_preview.render_cfg import PREVIEW_QUALITY
+
+        rpp_file = tmp_path / "song.rpp"
+        rpp_file.write_text(MINIMAL_RPP)
+
+        result = prepare_rpp_for_preview(
+            rpp_path=rpp_file,
+            output_dir=tmp_path,
+            filename="song",
+            start=0.0,
+            end=30.0,
+            audio_format="mp3",
+            quality=PREVIEW_QUALITY,
+        )
+        content = _read_output(result)
+        assert f"    {PREVIEW_QUALITY.render_cfg('mp3')}\n" in content
+        assert "  RENDER_FMT 0 1 32000\n" in content
+        assert "  RENDER_SRATE 32000\n" in content
+        assert content.count("RENDER_FMT") == 1
+
+
+class TestRenderSettings:
+    def test_overrides_saved_render_options(self):
+        content = apply_render_settings(SLOW_RENDER_RPP)
+        assert "  RENDER_1X 0\n" in content
+        assert "  RENDER_ADDTOPROJ 0\n" in content
+        assert "  RENDER_STEMS 0\n" in content
+        assert "  RENDER_DITHER 0\n" in content
+        assert "  RENDER_RESAMPLE 1 0 1\n" in content
+        assert "RENDER_CFG2" not in content
+        assert "RENDER_METADATA" not in content
+        # Everything else is kept
+        assert "  <RENDER_CFG\n    ZXZhdxgAAQ==\n  >\n" in content
+        assert "  <TRACK\n  >\n>" in content
+
+    def test_inserts_missing_settings(self):
+        content = apply_render_settings(BARE_RPP)
+        for key, value in PREVIEW_RENDER_SETTINGS.items():
+            assert f"  {key} {value}\n" in content
+        assert content.endswith("\n>\n")
+
+    def test_applied_by_prepare(self, tmp_path):
+        rpp_file = tmp_path / "song.rpp"
+        rpp_file.write_text(SLOW_RENDER_RPP)
+
+        result = prepare_rpp_for_preview(
+            rpp_path=rpp_file,
+            output_dir=tmp_path,
+            filename="song",
+            start=0.0,
+            end=30.0,
+        )
+        content = _read_output(result)
+        assert content.count("RENDER_1X") == 1
+        assert "  RENDER_1X 0\n" in content
+        assert "RENDER_CFG2" not in content
+
+    def test_bypasses_fx_in_prepare(self, tmp_path):
+        rpp_file = tmp_path / "song.rpp"
+        rpp_file.write_text(
+            '<REAPER_PROJECT 0.1 "7.0"\n'
+            '  <TRACK\n'
+            '    <FXCHAIN\n'
+            '      BYPASS 0 0 0\n'
+            '      <VST "VST: ValhallaRoom (Valhalla DSP)" ValhallaRoom.dll 0 ""\n'
+            '      >\n'
+            '    >\n'
+            '  >\n'
+            '>\n'
+        )
+        metadata = ProjectMetadata()
+
+        result = prepare_rpp_for_preview(
+            rpp_path=rpp_file,
+            output_dir=tmp_path,
+            filename="song",
+            start=0.0,
+            end=30.0,
+            metadata=metadata,
+            fx_filter=FxFilter(names=["valhalla"]),
+        )
+        content = _read_output(result)
+        assert "      BYPASS 1 1 0\n" in content
+        assert "  RENDER_1X 0\n" in content
+        assert metadata.bypassed_fx == ["ValhallaRoom (Valhalla DSP)"]
+        # The original keeps its FX
+        assert "BYPASS 0 0 0" in rpp_file.read_text()
+
+
+    def test_selects_tracks_and_bypasses_fx_in_prepare(self, tmp_path):
+        chain = (
+            '    <FXCHAIN\n'
+            '      BYPASS 0 0 0\n'
+            '      <VST "VST: ValhallaRoom (Valhalla DSP)" ValhallaRoom.dll 0 ""\n'
+            '      >\n'
+            '    >\n'
+        )
+        rpp_file = tmp_path / "song.rpp"
+        rpp_file.write_text(
+            '<REAPER_PROJECT 0.1 "7.0"\n'
+            '  <TRACK\n    NAME Vocals\n' + chain + '  >\n'
+            '  <TRACK\n    NAME Drums\n' + chain + '  >\n'
+            '>\n'
+        )
+        metadata = ProjectMetadata()
+
+        result = prepare_rpp_for_preview(
+            rpp_path=rpp_file,
+            output_dir=tmp_path,
+            filename="song",
+            start=0.0,
+            end=30.0,
+            metadata=metadata,
+            tracks=[1],
+            fx_filter=FxFilter(names=["valhalla"]),
+        )
+        content = _read_output(result)
+        assert "NAME Vocals" in content
+        assert "NAME Drums" not in content
+        assert content.count("      BYPASS 1 1 0\n") == 1
+        assert metadata.dropped_tracks == ["Drums"]
+        # Only the plugin of the kept track is reported
+        assert metadata.bypassed_fx == ["ValhallaRoom (Valhalla DSP)"]
 
 class TestResolveRelativeFilePaths:
     def test_relative_path_resolved(self, tmp_path):
@@ -0,0 +1,43 @@
+"""Tests for reaper_preview.segments module."""
+
+import pytest
+
+from reaper_preview.metadata import ProjectMetadata
+from reaper_preview.segments import Segment, SegmentError, parse_segments, resolve_segments
+
+
+class TestParseSegments:
+    def test_time_ranges(self):
+        assert parse_segments("0:30, 60:90.5") == [
+            Segment(name="01", start=0.0, end=30.0),
+            Segment(name="02", start=60.0, end=90.5),
+        ]
+
+    def test_sources(self):
+        assert parse_segments("regions") == "regions"
+        assert parse_segments("Markers") == "markers"
+
+    @pytest.mark.parametrize("spec", ["30", "a:b", "30:10", "-5:10", "0:30,"])
+    def test_invalid(self, spec):
+        with pytest.raises(SegmentError):
+            parse_segments(spec)
+
+
+class TestResolveSegments:
+    def test_explicit_segments_unchanged(self):
+        segments = parse_segments("0:30")
+        assert resolve_segments(segments, ProjectMetadata(), 30.0) is segments
+
+    def test_regions_cut_to_duration(self):
+        metadata = ProjectMetadata(regions=[("Intro", 0.0, 10.0), ("Chorus / A", 40.0, 90.0)])
+        assert resolve_segments("regions", metadata, 30.0) == [
+            Segment(name="01-Intro", start=0.0, end=10.0),
+            Segment(name="02-Chorus_A", start=40.0, end=70.0),
+        ]
+
+    def test_markers_start_segments(self):
+        metadata = ProjectMetadata(markers=[("", 12.0)])
+        assert resolve_segments("markers", metadata, 20.0) == [Segment(name="01", start=12.0, end=32.0)]
+
+    def test_no_regions(self):
+        assert resolve_segments("regions", ProjectMetadata(), 30.0) == []
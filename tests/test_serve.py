@@ -0,0 +1,222 @@
+"""Tests for reaper_preview.serve module."""
+
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from reaper_preview.discover import ProjectInfo
+from reaper_preview.render import RenderError
+from reaper_preview.serve import PreviewCache, RangeNotSatisfiable, make_server, parse_range, unique_names
+
+
+def _project(tmp_path, name="song"):
+    rpp = tmp_path / f"{name}.rpp"
+    rpp.write_text("<REAPER_PROJECT\n>\n")
+    old_time = time.time() - 100
+    os.utime(rpp, (old_time, old_time))
+    return ProjectInfo(name=name, rpp_path=rpp, project_dir=tmp_path)
+
+
+def _fake_render(rpp_path, output_dir, filename, audio_format, reaper_bin, timeout):
+    output_file = output_dir / f"{filename}.{audio_format}"
+    output_file.write_bytes(bytes(range(256)) * 4)
+    return output_file
+
+
+class TestParseRange:
+    def test_explicit_range(self):
+        assert parse_range("bytes=0-99", 1000) == (0, 99)
+
+    def test_open_ended_range(self):
+        assert parse_range("bytes=500-", 1000) == (500, 999)
+
+    def test_suffix_range(self):
+        assert parse_range("bytes=-100", 1000) == (900, 999)
+
+    def test_end_clamped_to_file_size(self):
+        assert parse_range("bytes=900-5000", 1000) == (900, 999)
+
+    def test_start_past_end_not_satisfiable(self):
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=1000-", 1000)
+
+    def test_multiple_ranges_ignored(self):
+        assert parse_range("bytes=0-1,5-6", 1000) is None
+
+    def test_unknown_unit_ignored(self):
+        assert parse_range("items=0-1", 1000) is None
+
+
+class TestUniqueNames:
+    def test_unique_names_unchanged(self, tmp_path):
+        projects = [_project(tmp_path, "a"), _project(tmp_path, "b")]
+        assert unique_names(projects) == projects
+
+    def test_clashing_names_use_their_folders(self, tmp_path):
+        (tmp_path / "album1" / "song").mkdir(parents=True)
+        (tmp_path / "album2").mkdir()
+        first = _project(tmp_path / "album1" / "song")
+        second = _project(tmp_path / "album2")
+        other = _project(tmp_path, "other")
+
+        renamed = unique_names([first, second, other])
+
+        assert [p.name for p in renamed] == ["album1-song", "album2-song", "other"]
+        assert [p.rpp_path for p in renamed] == [first.rpp_path, second.rpp_path, other.rpp_path]
+
+
+class TestPreviewCache:
+    def test_renders_on_first_request_then_reuses(self, tmp_path):
+        project = _project(tmp_path)
+        cache = PreviewCache(cache_dir=tmp_path / "cache", reaper_bin="reaper")
+
+        with patch("reaper_preview.serve.render_project", side_effect=_fake_render) as mock_render:
+            first = cache.get(project)
+            second = cache.get(project)
+
+        assert first == second == tmp_path / "cache" / "song.mp3"
+        mock_render.assert_called_once()
+
+    def test_rerenders_when_rpp_is_newer(self, tmp_path):
+        project = _project(tmp_path)
+        cache = PreviewCache(cache_dir=tmp_path / "cache", reaper_bin="reaper")
+
+        with patch("reaper_preview.serve.render_project", side_effect=_fake_render) as mock_render:
+            preview = cache.get(project)
+            old_time = time.time() - 200
+            os.utime(preview, (old_time, old_time))
+            cache.get(project)
+
+        assert mock_render.call_count == 2
+
+    def test_concurrent_requests_share_one_render(self, tmp_path):
+        project = _project(tmp_path)
+        cache = PreviewCache(cache_dir=tmp_path / "cache", reaper_bin="reaper")
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_render(**kwargs):
+            started.set()
+            release.wait(5)
+            return _fake_render(**kwargs)
+
+        results = []
+        with patch("reaper_preview.serve.render_project", side_effect=slow_render) as mock_render:
+            threads = [threading.Thread(target=lambda: results.append(cache.get(project))) for _ in range(4)]
+            for t in threads:
+                t.start()
+            started.wait(5)
+            time.sleep(0.05)
+            release.set()
+            for t in threads:
+                t.join(5)
+
+        mock_render.assert_called_once()
+        assert len(results) == 4
+
+    def test_render_error_propagates_and_clears_inflight(self, tmp_path):
+        project = _project(tmp_path)
+        cache = PreviewCache(cache_dir=tmp_path / "cache", reaper_bin="reaper")
+
+        with patch("reaper_preview.serve.render_project", side_effect=RenderError("boom")):
+            with pytest.raises(RenderError):
+                cache.get(project)
+
+        with patch("reaper_preview.serve.render_project", side_effect=_fake_render):
+            assert cache.get(project).exists()
+
+    def test_temp_rpp_cleaned_up(self, tmp_path):
+        project = _project(tmp_path)
+        cache = PreviewCache(cache_dir=tmp_path / "cache", reaper_bin="reaper")
+        temp_rpp = tmp_path / "temp.rpp"
+        temp_rpp.write_text("temp")
+
+        with patch("reaper_preview.serve.prepare_rpp_for_preview", return_value=temp_rpp), \
+             patch("reaper_preview.serve.render_project", side_effect=_fake_render):
+            cache.get(project)
+
+        assert not temp_rpp.exists()
+
+
+class TestServer:
+    @pytest.fixture
+    def server(self, tmp_path):
+        project = _project(tmp_path)
+        cache = PreviewCache(cache_dir=tmp_path / "cache", reaper_bin="reaper")
+        server = make_server([project], cache, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        with patch("reaper_preview.serve.render_project", side_effect=_fake_render):
+            yield f"http://127.0.0.1:{server.server_port}"
+        server.shutdown()
+        server.server_close()
+
+    def test_index_lists_projects(self, server):
+        with urllib.request.urlopen(f"{server}/") as response:
+            body = response.read().decode()
+        assert "song" in body
+        assert 'preload="none"' in body
+
+    def test_full_preview_download(self, server):
+        with urllib.request.urlopen(f"{server}/preview/song") as response:
+            assert response.status == 200
+            assert response.headers["Accept-Ranges"] == "bytes"
+            assert response.headers["Content-Type"] == "audio/mpeg"
+            assert len(response.read()) == 1024
+
+    def test_range_request(self, server):
+        request = urllib.request.Request(f"{server}/preview/song", headers={"Range": "bytes=10-19"})
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 206
+            assert response.headers["Content-Range"] == "bytes 10-19/1024"
+            assert response.read() == bytes(range(10, 20))
+
+    def test_unsatisfiable_range(self, server):
+        request = urllib.request.Request(f"{server}/preview/song", headers={"Range": "bytes=5000-"})
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(request)
+        assert excinfo.value.code == 416
+
+    def test_unknown_project_is_404(self, server):
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(f"{server}/preview/nope")
+        assert excinfo.value.code == 404
+
+    def test_unexpected_error_is_500(self, server):
+        with patch("reaper_preview.serve.PreviewCache.get", side_effect=PermissionError("denied")):
+            with pytest.raises(urllib.error.HTTPError) as excinfo:
+                urllib.request.urlopen(f"{server}/preview/song")
+        assert excinfo.value.code == 500
+        # The server keeps serving
+        with urllib.request.urlopen(f"{server}/preview/song") as response:
+            assert response.status == 200
+
+
+def test_projects_with_the_same_name_are_served_separately(tmp_path):
+    (tmp_path / "album1").mkdir()
+    (tmp_path / "album2").mkdir()
+    projects = [_project(tmp_path / "album1"), _project(tmp_path / "album2")]
+    cache = PreviewCache(cache_dir=tmp_path / "cache", reaper_bin="reaper")
+    server = make_server(projects, cache, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with patch("reaper_preview.serve.render_project", side_effect=_fake_render) as mock_render:
+            with urllib.request.urlopen(f"{url}/") as response:
+                body = response.read().decode()
+            for name in ("album1-song", "album2-song"):
+                assert f"/preview/{name}" in body
+                with urllib.request.urlopen(f"{url}/preview/{name}") as response:
+                    assert response.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    rendered = [call.kwargs["filename"] for call in mock_render.call_args_list]
+    assert rendered == ["album1-song", "album2-song"]
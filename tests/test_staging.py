@@ -0,0 +1,77 @@
+"""Tests for reaper_preview.staging module."""
+
+import os
+
+from reaper_preview.staging import StagingCache, referenced_media, stage_project
+
+
+def _media(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+class TestReferencedMedia:
+    def test_resolves_relative_and_skips_missing(self, tmp_path):
+        kick = _media(tmp_path / "audio" / "kick.wav", 10)
+        text = '<SOURCE WAVE\n  FILE "audio/kick.wav"\n>\n<SOURCE WAVE\n  FILE "gone.wav"\n>\n'
+        assert referenced_media(text, tmp_path) == [kick]
+
+
+class TestStagingCache:
+    def test_stages_copy_and_reuses_it(self, tmp_path):
+        source = _media(tmp_path / "share" / "kick.wav", 100)
+        cache = StagingCache(tmp_path / "cache", max_bytes=1000)
+
+        local = cache.stage(source)
+        assert local.read_bytes() == source.read_bytes()
+        assert local.is_relative_to(tmp_path / "cache")
+        assert cache.stage(source) == local
+
+    def test_changed_source_gets_new_copy(self, tmp_path):
+        source = _media(tmp_path / "share" / "kick.wav", 100)
+        cache = StagingCache(tmp_path / "cache", max_bytes=1000)
+        first = cache.stage(source)
+        os.utime(source, ns=(0, source.stat().st_mtime_ns + 10**9))
+        assert cache.stage(source) != first
+
+    def test_evicts_least_recently_used_unpinned_copy(self, tmp_path):
+        a, b, c = (_media(tmp_path / "share" / f"{name}.wav", 400) for name in "abc")
+        cache = StagingCache(tmp_path / "cache", max_bytes=1000)
+        local_a = cache.stage(a)
+        local_b = cache.stage(b)
+        cache.release([local_a, local_b])
+        cache.stage(a)  # a is now the most recently used
+
+        assert cache.stage(c) is not None
+        assert not local_b.exists()
+        assert local_a.exists()
+
+    def test_pinned_copies_are_not_evicted(self, tmp_path):
+        a, b = (_media(tmp_path / "share" / f"{name}.wav", 600) for name in "ab")
+        cache = StagingCache(tmp_path / "cache", max_bytes=1000)
+        local_a = cache.stage(a)
+
+        assert cache.stage(b) is None
+        assert local_a.exists()
+        cache.release([local_a])
+        assert cache.stage(b) is not None
+
+    def test_index_survives_restart(self, tmp_path):
+        source = _media(tmp_path / "share" / "kick.wav", 100)
+        cache = StagingCache(tmp_path / "cache", max_bytes=1000)
+        local = cache.stage(source)
+        cache.save()
+
+        reopened = StagingCache(tmp_path / "cache", max_bytes=1000)
+        assert reopened.total_bytes == 100
+        assert reopened.stage(source) == local
+
+
+def test_stage_project(tmp_path):
+    kick = _media(tmp_path / "song" / "kick.wav", 10)
+    rpp = tmp_path / "song" / "song.rpp"
+    rpp.write_text('<REAPER_PROJECT\n  <SOURCE WAVE\n    FILE "kick.wav"\n  >\n>\n')
+
+    staged = stage_project(StagingCache(tmp_path / "cache", max_bytes=1000), rpp)
+    assert list(staged) == [str(kick)]
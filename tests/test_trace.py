@@ -0,0 +1,85 @@
+"""Tests for reaper_preview.trace module."""
+
+import json
+import threading
+
+from reaper_preview.trace import NullTracer, Tracer
+
+
+def _events(path):
+    return json.loads(path.read_text())
+
+
+def _lane_names(events):
+    return {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M" and e["name"] == "thread_name"}
+
+
+class TestTracer:
+    def test_writes_complete_spans_in_microseconds(self, tmp_path):
+        path = tmp_path / "trace.json"
+        tracer = Tracer(path, origin_ns=1_000_000)
+        tracer.complete("render", 3_000_000, 5_500_000, lane="worker", args={"project": "song"})
+        tracer.close()
+
+        events = _events(path)
+        [span] = [e for e in events if e["ph"] == "X"]
+        assert span["name"] == "render"
+        assert span["ts"] == 2000
+        assert span["dur"] == 2500
+        assert span["args"] == {"project": "song"}
+        assert _lane_names(events)[span["tid"]] == "worker"
+        assert any(e["name"] == "process_name" for e in events)
+
+    def test_one_lane_per_thread(self, tmp_path):
+        path = tmp_path / "trace.json"
+        tracer = Tracer(path)
+
+        def work():
+            with tracer.span("prepare", project="a"):
+                pass
+
+        threads = [threading.Thread(target=work, name=f"render_{i}") for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with tracer.span("discover"):
+            pass
+        tracer.close()
+
+        events = _events(path)
+        lanes = _lane_names(events)
+        spans = [e for e in events if e["ph"] == "X"]
+        assert sorted(lanes[e["tid"]] for e in spans if e["name"] == "prepare") == ["render_0", "render_1", "render_2"]
+        assert lanes[next(e["tid"] for e in spans if e["name"] == "discover")] == threading.current_thread().name
+        assert all(e["dur"] >= 0 for e in spans)
+
+    def test_flushes_in_batches(self, tmp_path):
+        path = tmp_path / "trace.json"
+        tracer = Tracer(path, flush_events=10)
+        for index in range(25):
+            tracer.instant("found", lane="discovery", args={"index": index})
+        tracer._file.flush()
+        # Written before the end of the run, as a still open JSON array
+        assert 10 <= path.read_text().count('"found"') < 25
+        tracer.close()
+
+        found = [e for e in _events(path) if e["name"] == "found"]
+        assert [e["args"]["index"] for e in found] == list(range(25))
+        assert all(e["ph"] == "i" for e in found)
+
+    def test_close_is_idempotent(self, tmp_path):
+        path = tmp_path / "trace.json"
+        tracer = Tracer(path)
+        tracer.close()
+        tracer.close()
+        assert [e["ph"] for e in _events(path)] == ["M"]
+
+
+class TestNullTracer:
+    def test_records_nothing(self):
+        tracer = NullTracer()
+        with tracer.span("render", project="a"):
+            tracer.complete("spawn", 0, 1)
+            tracer.instant("found")
+        tracer.close()
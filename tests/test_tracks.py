@@ -0,0 +1,118 @@
+"""Tests for reaper_preview.tracks module."""
+
+import pytest
+
+from reaper_preview.tracks import TrackSelectionError, parse_track_selectors, select_tracks
+
+# 1 Drums (folder) > 2 Kick, 3 Snare; 4 Vox sends to 6 Verb; 5 Keys; 6 Verb
+FOLDER_RPP = """\
+<REAPER_PROJECT 0.1 "7.0"
+  <TRACK {1}
+    NAME Drums
+    MUTESOLO 0 0 0
+    ISBUS 1 1
+    <ITEM
+      POSITION 0
+      MUTE 0 0
+    >
+  >
+  <TRACK {2}
+    NAME Kick
+    MUTESOLO 0 2 0
+    ISBUS 0 0
+  >
+  <TRACK {3}
+    NAME Snare
+    MUTESOLO 1 0 0
+    ISBUS 2 -1
+  >
+  <TRACK {4}
+    NAME Vox
+    MUTESOLO 0 0 0
+    ISBUS 0 0
+  >
+  <TRACK {5}
+    NAME Keys
+    MUTESOLO 0 0 0
+    ISBUS 0 0
+    <FXCHAIN
+      <VST "VSTi: Kontakt (Native Instruments)" Kontakt.dll 0 ""
+      >
+    >
+  >
+  <TRACK {6}
+    NAME Verb
+    MUTESOLO 0 0 0
+    ISBUS 0 0
+    AUXRECV 3 0 1 0 0 0 0 0 0 -1:U 0 -1 ''
+  >
+>
+"""
+
+
+def _track(text, name):
+    start = text.index(f"    NAME {name}\n")
+    return text[text.rindex("  <TRACK", 0, start):text.index("\n  >", start)]
+
+
+class TestParseTrackSelectors:
+    def test_indexes_and_patterns(self):
+        selectors = parse_track_selectors(["2", "^vox"])
+        assert selectors[0] == 2
+        assert selectors[1].search("Vox Lead")
+
+    def test_rejects_invalid_pattern(self):
+        with pytest.raises(TrackSelectionError):
+            parse_track_selectors(["("])
+
+    def test_rejects_index_zero(self):
+        with pytest.raises(TrackSelectionError):
+            parse_track_selectors(["0"])
+
+
+class TestSelectTracks:
+    def test_selected_folder_keeps_children_and_drops_the_rest(self):
+        selected, dropped = [], []
+        text = select_tracks(FOLDER_RPP, parse_track_selectors(["drums"]), selected, dropped)
+
+        assert selected == ["Drums", "Kick", "Snare"]
+        assert dropped == ["Vox", "Keys", "Verb"]
+        assert "Kontakt" not in text
+        # Unmuted and unsoloed
+        assert "    MUTESOLO 0 0 0\n    ISBUS 0 0" in _track(text, "Kick")
+        assert "MUTESOLO 0 0 0" in _track(text, "Snare")
+        # The folder still closes on its last track
+        assert "ISBUS 1 1" in _track(text, "Drums")
+        assert "ISBUS 2 -1" in _track(text, "Snare")
+        assert text.endswith("  >\n>\n")
+
+    def test_folder_of_selected_track_is_kept_with_items_muted(self):
+        selected, dropped = [], []
+        text = select_tracks(FOLDER_RPP, parse_track_selectors(["2"]), selected, dropped)
+
+        assert selected == ["Kick"]
+        assert dropped == ["Snare", "Vox", "Keys", "Verb"]
+        drums = _track(text, "Drums")
+        assert "MUTESOLO 0 0 0" in drums
+        assert "      MUTE 1 0" in drums
+        # Kick is now the last track of the folder
+        assert "ISBUS 2 -1" in _track(text, "Kick")
+
+    def test_muted_track_with_send_is_kept_and_receive_renumbered(self):
+        selected, dropped = [], []
+        text = select_tracks(FOLDER_RPP, parse_track_selectors(["verb"]), selected, dropped)
+
+        assert selected == ["Verb"]
+        assert dropped == ["Drums", "Kick", "Snare", "Keys"]
+        assert "MUTESOLO 1 0 0" in _track(text, "Vox")
+        # Vox is the first track left
+        assert "    AUXRECV 0 0 1 0" in _track(text, "Verb")
+
+    def test_nothing_dropped_when_every_track_is_needed(self):
+        text = select_tracks(FOLDER_RPP, parse_track_selectors([".*"]))
+        assert text.count("  <TRACK") == 6
+        assert "MUTESOLO 0 2 0" not in text
+
+    def test_no_match(self):
+        with pytest.raises(TrackSelectionError):
+            select_tracks(FOLDER_RPP, parse_track_selectors(["bass"]))
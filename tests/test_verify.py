@@ -0,0 +1,58 @@
+"""Tests for reaper_preview.verify module."""
+
+import pytest
+
+from reaper_preview.verify import OutputError, audio_duration, verify_output
+from tests.wav_helpers import MP3_FRAME_SECONDS, write_mp3, write_silent_wav
+
+
+class TestAudioDuration:
+    def test_wav_duration_from_header(self, tmp_path):
+        assert audio_duration(write_silent_wav(tmp_path / "a.wav", 2.0)) == pytest.approx(2.0)
+
+    def test_truncated_wav_reports_what_is_on_disk(self, tmp_path):
+        path = write_silent_wav(tmp_path / "a.wav", 2.0)
+        path.write_bytes(path.read_bytes()[: 44 + 44100 * 4])
+        assert audio_duration(path) == pytest.approx(1.0)
+
+    def test_cbr_mp3_duration_from_size_and_bitrate(self, tmp_path):
+        assert audio_duration(write_mp3(tmp_path / "a.mp3", 3.0)) == pytest.approx(3.0, abs=MP3_FRAME_SECONDS)
+
+    def test_mp3_after_id3_tag(self, tmp_path):
+        path = write_mp3(tmp_path / "a.mp3", 3.0)
+        tag = b"ID3\x04\x00\x00\x00\x00\x00\x14" + bytes(20)
+        path.write_bytes(tag + path.read_bytes())
+        assert audio_duration(path) == pytest.approx(3.0, abs=MP3_FRAME_SECONDS)
+
+    def test_xing_frame_count(self, tmp_path):
+        assert audio_duration(write_mp3(tmp_path / "a.mp3", 3.0, xing=True)) == pytest.approx(3.0, abs=MP3_FRAME_SECONDS)
+
+    def test_truncated_xing_mp3_is_shorter(self, tmp_path):
+        path = write_mp3(tmp_path / "a.mp3", 4.0, xing=True, truncate_to=417 * 78)
+        assert audio_duration(path) == pytest.approx(2.0, abs=0.2)
+
+    def test_empty_file(self, tmp_path):
+        (tmp_path / "a.mp3").write_bytes(b"")
+        with pytest.raises(OutputError, match="empty"):
+            audio_duration(tmp_path / "a.mp3")
+
+    def test_not_audio(self, tmp_path):
+        (tmp_path / "a.mp3").write_text("fake audio")
+        (tmp_path / "a.wav").write_text("fake audio")
+        with pytest.raises(OutputError):
+            audio_duration(tmp_path / "a.mp3")
+        with pytest.raises(OutputError):
+            audio_duration(tmp_path / "a.wav")
+
+
+class TestVerifyOutput:
+    def test_accepts_expected_duration(self, tmp_path):
+        assert verify_output(write_silent_wav(tmp_path / "a.wav", 30.0), 30.0) == pytest.approx(30.0)
+
+    def test_rejects_short_file(self, tmp_path):
+        with pytest.raises(OutputError, match="expected 30.0 s"):
+            verify_output(write_silent_wav(tmp_path / "a.wav", 12.0), 30.0)
+
+    def test_rejects_header_without_audio(self, tmp_path):
+        with pytest.raises(OutputError, match="no audio"):
+            verify_output(write_silent_wav(tmp_path / "a.wav", 0.0))
@@ -0,0 +1,54 @@
+"""Tests for reaper_preview.wavfile module."""
+
+import struct
+
+import numpy as np
+import pytest
+
+from tests.wav_helpers import sine, write_wav
+from reaper_preview.wavfile import WavError, read_samples, read_wav_info
+
+
+class TestReadWavInfo:
+    def test_header_fields(self, tmp_path):
+        path = write_wav(tmp_path / "a.wav", sine(1.0, sample_rate=48000), sample_rate=48000, bits=24)
+        info = read_wav_info(path)
+        assert info.channels == 2
+        assert info.sample_rate == 48000
+        assert info.bits_per_sample == 24
+        assert info.frames == 48000
+        assert info.duration == pytest.approx(1.0)
+
+    def test_skips_unknown_chunks(self, tmp_path):
+        path = write_wav(tmp_path / "a.wav", sine(0.1))
+        data = path.read_bytes()
+        # Insert an odd-sized LIST chunk (plus pad byte) after the fmt chunk
+        extra = b"LIST" + struct.pack("<I", 3) + b"abc\x00"
+        path.write_bytes(data[:36] + extra + data[36:])
+        assert read_wav_info(path).frames == 4410
+
+    def test_truncated_data_clamped(self, tmp_path):
+        path = write_wav(tmp_path / "a.wav", sine(1.0))
+        path.write_bytes(path.read_bytes()[:44 + 400])
+        assert read_wav_info(path).frames == 100
+
+    def test_not_a_wav(self, tmp_path):
+        path = tmp_path / "a.wav"
+        path.write_bytes(b"ID3\x03" + bytes(100))
+        with pytest.raises(WavError):
+            read_wav_info(path)
+
+
+class TestReadSamples:
+    @pytest.mark.parametrize("bits", [16, 24, 32])
+    def test_round_trip(self, tmp_path, bits):
+        original = sine(0.1, amplitude=0.8)
+        path = write_wav(tmp_path / "a.wav", original, bits=bits)
+        samples = read_samples(path)
+        assert samples.shape == original.shape
+        assert samples.dtype == np.float32
+        np.testing.assert_allclose(samples, original, atol=1e-4)
+
+    def test_negative_24_bit_values_keep_sign(self, tmp_path):
+        path = write_wav(tmp_path / "a.wav", np.array([[-0.5], [0.5]]), bits=24)
+        np.testing.assert_allclose(read_samples(path)[:, 0], [-0.5, 0.5], atol=1e-6)
@@ -0,0 +1,68 @@
+"""Helpers for writing WAV and MP3 fixtures in tests."""
+
+import struct
+from pathlib import Path
+
+import numpy as np
+
+
+def write_wav(path: Path, samples, sample_rate: int = 44100, bits: int = 16) -> Path:
+    """Write float samples in [-1, 1] of shape (frames, channels) as a PCM/float WAV."""
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    channels = samples.shape[1]
+    if bits == 16:
+        data = (np.clip(samples, -1.0, 32767 / 32768) * 32768).astype("<i2").tobytes()
+        format_tag = 1
+    elif bits == 24:
+        ints = (np.clip(samples, -1.0, (2**23 - 1) / 2**23) * 2**23).astype("<i4")
+        data = ints.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+        format_tag = 1
+    elif bits == 32:
+        data = samples.astype("<f4").tobytes()
+        format_tag = 3
+    else:
+        raise ValueError(bits)
+    block_align = channels * bits // 8
+    header = b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE"
+    header += b"fmt " + struct.pack("<IHHIIHH", 16, format_tag, channels, sample_rate,
+                                    sample_rate * block_align, block_align, bits)
+    header += b"data" + struct.pack("<I", len(data))
+    path.write_bytes(header + data)
+    return path
+
+
+def sine(seconds: float, sample_rate: int = 44100, freq: float = 440.0, amplitude: float = 0.5, channels: int = 2):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    mono = amplitude * np.sin(2 * np.pi * freq * t)
+    return np.repeat(mono[:, None], channels, axis=1)
+
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, stereo, no padding: 417-byte frames
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x00"
+MP3_FRAME_BYTES = 417
+MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def write_mp3(path: Path, seconds: float, xing: bool = False, truncate_to: int | None = None) -> Path:
+    """Write silent CBR frames, optionally after a Xing header frame, as an MP3 file."""
+    frames = round(seconds / MP3_FRAME_SECONDS)
+    frame = MP3_FRAME_HEADER + bytes(MP3_FRAME_BYTES - 4)
+    data = frame * frames
+    if xing:
+        info = b"Xing" + struct.pack(">III", 3, frames, (frames + 1) * MP3_FRAME_BYTES)
+        header = MP3_FRAME_HEADER + bytes(32) + info
+        data = header + bytes(MP3_FRAME_BYTES - len(header)) + data
+    path.write_bytes(data[:truncate_to])
+    return path
+
+
+def write_silent_wav(path: Path, seconds: float, sample_rate: int = 44100) -> Path:
+    """Write a silent 16-bit stereo WAV without needing NumPy arrays."""
+    data = bytes(int(seconds * sample_rate) * 4)
+    header = b"RIFF" + struct.pack("<I", 36 + len(data)) + b"WAVE"
+    header += b"fmt " + struct.pack("<IHHIIHH", 16, 1, 2, sample_rate, sample_rate * 4, 4, 16)
+    header += b"data" + struct.pack("<I", len(data))
+    path.write_bytes(header + data)
+    return path